@@ -0,0 +1,64 @@
+"""
+Time the tracing of contour lines and filled contours with one and
+more threads, over a range of grid sizes and numbers of levels.
+
+The *threads* kwarg of contour and contourf (or the
+contour.trace_threads rc setting) sets how many threads trace the
+levels; the contours are the same whatever the number of threads.
+Only the tracing is timed here, not the drawing.
+
+usage: python contour_trace_benchmark.py [max_threads]
+"""
+import sys
+from timeit import default_timer as clock
+
+import numpy as np
+from matplotlib import _cntr
+from matplotlib.cbook import cpu_count
+
+def field(n):
+    y, x = np.mgrid[-3:3:n*1j, -3:3:n*1j]
+    z = np.sin(3*x) * np.cos(2*y) + np.exp(-(x**2 + y**2)) + 0.1*x*y
+    return x, y, z
+
+def best_time(func, repeat=3):
+    best = None
+    for i in range(repeat):
+        t0 = clock()
+        func()
+        t = clock() - t0
+        if best is None or t < best:
+            best = t
+    return best
+
+if len(sys.argv) > 1:
+    max_threads = int(sys.argv[1])
+else:
+    max_threads = cpu_count()
+threads = [1]
+while threads[-1] * 2 <= max_threads:
+    threads.append(threads[-1] * 2)
+if threads[-1] != max_threads:
+    threads.append(max_threads)
+
+print '%6s %7s %7s' % ('grid', 'levels', 'kind'),
+for n in threads:
+    print '%10s' % ('%d thr (s)' % n),
+print
+
+for n in 250, 500, 1000, 2000:
+    x, y, z = field(n)
+    c = _cntr.Cntr(x, y, z)
+    for nlevels in 10, 50, 100:
+        levels = np.linspace(z.min(), z.max(), nlevels + 2)[1:-1]
+        for kind in 'lines', 'filled':
+            print '%6s %7d %7s' % ('%dx%d' % (n, n), nlevels, kind),
+            for nthreads in threads:
+                if kind == 'lines':
+                    func = lambda: c.trace_levels(levels, threads=nthreads)
+                else:
+                    func = lambda: c.trace_levels(levels[:-1], levels[1:],
+                                                  threads=nthreads)
+                print '%10.3f' % best_time(func),
+                sys.stdout.flush()
+            print
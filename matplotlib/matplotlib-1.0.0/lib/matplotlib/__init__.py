@@ -908,13 +908,21 @@ default_test_modules = [
     'matplotlib.tests.test_agg',
     'matplotlib.tests.test_backend_svg',
     'matplotlib.tests.test_basic',
+    'matplotlib.tests.test_batch',
     'matplotlib.tests.test_cbook',
+    'matplotlib.tests.test_colors',
+    'matplotlib.tests.test_contour',
     'matplotlib.tests.test_mlab',
     'matplotlib.tests.test_transforms',
     'matplotlib.tests.test_axes',
     'matplotlib.tests.test_dates',
+    'matplotlib.tests.test_font_manager',
+    'matplotlib.tests.test_gridindex',
     'matplotlib.tests.test_spines',
     'matplotlib.tests.test_image',
+    'matplotlib.tests.test_legend',
+    'matplotlib.tests.test_import',
+    'matplotlib.tests.test_lines',
     'matplotlib.tests.test_simplification',
     'matplotlib.tests.test_mathtext'
     ]
@@ -16,7 +16,6 @@ import matplotlib.cbook as cbook
 import matplotlib.collections as mcoll
 import matplotlib.colors as mcolors
 import matplotlib.contour as mcontour
-import matplotlib.dates as mdates
 from matplotlib import docstring
 import matplotlib.font_manager as font_manager
 import matplotlib.image as mimage
@@ -5837,7 +5836,7 @@ class Axes(martist.Artist):
                     cmap=None, norm=None, vmin=None, vmax=None,
                     alpha=None, linewidths=None, edgecolors='none',
                     reduce_C_function = np.mean, mincnt=None, marginals=False,
-                    **kwargs):
+                    chunksize=None, **kwargs):
         """
         call signature::
 
@@ -5845,8 +5844,8 @@ class Axes(martist.Artist):
                  xscale = 'linear', yscale = 'linear',
                  cmap=None, norm=None, vmin=None, vmax=None,
                  alpha=None, linewidths=None, edgecolors='none'
-                 reduce_C_function = np.mean, mincnt=None, marginals=True
-                 **kwargs)
+                 reduce_C_function = np.mean, mincnt=None, marginals=True,
+                 chunksize=None, **kwargs)
 
         Make a hexagonal binning plot of *x* versus *y*, where *x*,
         *y* are 1-D sequences of the same length, *N*. If *C* is None
@@ -5858,7 +5857,10 @@ class Axes(martist.Artist):
         bin and then reduced according to *reduce_C_function*, which
         defaults to numpy's mean function (np.mean). (If *C* is
         specified, it must also be a 1-D sequence of the same length
-        as *x* and *y*.)
+        as *x* and *y*.)  The sum, mean, min, max and median (numpy's
+        or the builtin functions) and :func:`len` are computed for all
+        hexagons at once; any other *reduce_C_function* is called once
+        per non-empty hexagon.
 
         *x*, *y* and/or *C* may be masked arrays, in which case only
         unmasked points will be plotted.
@@ -5906,6 +5908,14 @@ class Axes(martist.Artist):
             The limits of the bins. The default assigns the limits
             based on gridsize, x, y, xscale and yscale.
 
+          *chunksize*: [ None | integer ]
+            If not None, read *x*, *y* and *C* in slices of *chunksize*
+            points, so that data larger than memory, e.g. memory
+            mapped arrays, can be binned.  The data are read twice if
+            *extent* is None, and the values of *C* are kept in memory
+            if *reduce_C_function* is the median or not one of the
+            functions computed for all hexagons at once.
+
         Other keyword arguments controlling color mapping and normalization
         arguments:
 
@@ -5969,8 +5979,8 @@ class Axes(martist.Artist):
         self._process_unit_info(xdata=x, ydata=y, kwargs=kwargs)
 
 
-        x, y, C = cbook.delete_masked_points(x, y, C)
-
+        if chunksize is None:
+            chunksize = max(len(x), 1)
 
         # Set the size of the hexagon grid
         if iterable(gridsize):
@@ -5978,24 +5988,46 @@ class Axes(martist.Artist):
         else:
             nx = gridsize
             ny = int(nx/math.sqrt(3))
-        # Count the number of data in each hexagon
-        x = np.array(x, float)
-        y = np.array(y, float)
-        if xscale=='log':
-            if np.any(x <= 0.0):
-                raise ValueError("x contains non-positive values, so can not be log-scaled")
-            x = np.log10(x)
-        if yscale=='log':
-            if np.any(y <= 0.0):
-                raise ValueError("y contains non-positive values, so can not be log-scaled")
-            y = np.log10(y)
+
+        def chunks():
+            # the data in slices of chunksize points, without masked
+            # points and with the log scales applied
+            for start in xrange(0, len(x), chunksize):
+                xc = x[start:start+chunksize]
+                yc = y[start:start+chunksize]
+                Cc = None
+                if C is not None:
+                    Cc = C[start:start+chunksize]
+                xc, yc, Cc = cbook.delete_masked_points(xc, yc, Cc)
+                xc = np.array(xc, float)
+                yc = np.array(yc, float)
+                if xscale=='log':
+                    if np.any(xc <= 0.0):
+                        raise ValueError("x contains non-positive values, so can not be log-scaled")
+                    xc = np.log10(xc)
+                if yscale=='log':
+                    if np.any(yc <= 0.0):
+                        raise ValueError("y contains non-positive values, so can not be log-scaled")
+                    yc = np.log10(yc)
+                yield xc, yc, Cc
+
+        if chunksize < len(x):
+            data = chunks       # read the data again on every pass
+        else:
+            cached = list(chunks())
+            data = lambda: cached
+
         if extent is not None:
             xmin, xmax, ymin, ymax = extent
         else:
-            xmin = np.amin(x)
-            xmax = np.amax(x)
-            ymin = np.amin(y)
-            ymax = np.amax(y)
+            xmin = ymin = np.inf
+            xmax = ymax = -np.inf
+            for xc, yc, Cc in data():
+                if len(xc):
+                    xmin = min(xmin, np.amin(xc))
+                    xmax = max(xmax, np.amax(xc))
+                    ymin = min(ymin, np.amin(yc))
+                    ymax = max(ymax, np.amax(yc))
         # In the x-direction, the hexagons exactly cover the region from
         # xmin to xmax. Need some padding to avoid roundoff errors.
         padding = 1.e-9 * (xmax - xmin)
@@ -6004,101 +6036,62 @@ class Axes(martist.Artist):
         sx = (xmax-xmin) / nx
         sy = (ymax-ymin) / ny
 
-        if marginals:
-            xorig = x.copy()
-            yorig = y.copy()
-
-        x = (x-xmin)/sx
-        y = (y-ymin)/sy
-        ix1 = np.round(x).astype(int)
-        iy1 = np.round(y).astype(int)
-        ix2 = np.floor(x).astype(int)
-        iy2 = np.floor(y).astype(int)
-
         nx1 = nx + 1
         ny1 = ny + 1
         nx2 = nx
         ny2 = ny
         n = nx1*ny1+nx2*ny2
 
-        d1 = (x-ix1)**2 + 3.0 * (y-iy1)**2
-        d2 = (x-ix2-0.5)**2 + 3.0 * (y-iy2-0.5)**2
-        bdist = (d1<d2)
+        # the values of each hexagon are reduced by an mlab.BinReducer,
+        # which does the common reductions for all hexagons at once;
+        # the hexagons of the two lattices are numbered as in accum
         if C is None:
-            accum = np.zeros(n)
-            # Create appropriate views into "accum" array.
-            lattice1 = accum[:nx1*ny1]
-            lattice2 = accum[nx1*ny1:]
-            lattice1.shape = (nx1,ny1)
-            lattice2.shape = (nx2,ny2)
-
-            for i in xrange(len(x)):
-                if bdist[i]:
-                    if ((ix1[i] >= 0) and (ix1[i] < nx1) and
-                        (iy1[i] >= 0) and (iy1[i] < ny1)):
-                        lattice1[ix1[i], iy1[i]]+=1
-                else:
-                    if ((ix2[i] >= 0) and (ix2[i] < nx2) and
-                        (iy2[i] >= 0) and (iy2[i] < ny2)):
-                        lattice2[ix2[i], iy2[i]]+=1
+            reducer = mlab.BinReducer(n, len)
+        else:
+            reducer = mlab.BinReducer(n, reduce_C_function)
+        if marginals:
+            xcoarse = np.linspace(xmin, xmax, gridsize)
+            ycoarse = np.linspace(ymin, ymax, gridsize)
+            xreducer = mlab.BinReducer(len(xcoarse), reduce_C_function)
+            yreducer = mlab.BinReducer(len(ycoarse), reduce_C_function)
+
+        for xc, yc, Cc in data():
+            if marginals:
+                xreducer.add(
+                    xcoarse.searchsorted(xc).clip(0, len(xcoarse)-1), Cc)
+                yreducer.add(
+                    ycoarse.searchsorted(yc).clip(0, len(ycoarse)-1), Cc)
+
+            xc = (xc-xmin)/sx
+            yc = (yc-ymin)/sy
+            ix1 = np.round(xc).astype(int)
+            iy1 = np.round(yc).astype(int)
+            ix2 = np.floor(xc).astype(int)
+            iy2 = np.floor(yc).astype(int)
+
+            d1 = (xc-ix1)**2 + 3.0 * (yc-iy1)**2
+            d2 = (xc-ix2-0.5)**2 + 3.0 * (yc-iy2-0.5)**2
+            bdist = (d1<d2)
+            inside = np.where(bdist,
+                              (ix1 >= 0) & (ix1 < nx1) &
+                              (iy1 >= 0) & (iy1 < ny1),
+                              (ix2 >= 0) & (ix2 < nx2) &
+                              (iy2 >= 0) & (iy2 < ny2))
+            ind = np.where(bdist, ix1*ny1 + iy1, nx1*ny1 + ix2*ny2 + iy2)
+            ind[~inside] = -1
+            reducer.add(ind, Cc)
 
+        if C is None:
+            accum = reducer.result(0)
             # threshold
             if mincnt is not None:
-                for i in xrange(nx1):
-                    for j in xrange(ny1):
-                        if lattice1[i,j]<mincnt:
-                            lattice1[i,j] = np.nan
-                for i in xrange(nx2):
-                    for j in xrange(ny2):
-                        if lattice2[i,j]<mincnt:
-                            lattice2[i,j] = np.nan
-            accum = np.hstack((
-                lattice1.astype(float).ravel(), lattice2.astype(float).ravel()))
-            good_idxs = ~np.isnan(accum)
-
+                accum[accum<mincnt] = np.nan
         else:
             if mincnt is None:
                 mincnt = 0
-
-            # create accumulation arrays
-            lattice1 = np.empty((nx1,ny1),dtype=object)
-            for i in xrange(nx1):
-                for j in xrange(ny1):
-                    lattice1[i,j] = []
-            lattice2 = np.empty((nx2,ny2),dtype=object)
-            for i in xrange(nx2):
-                for j in xrange(ny2):
-                    lattice2[i,j] = []
-
-            for i in xrange(len(x)):
-                if bdist[i]:
-                    if ((ix1[i] >= 0) and (ix1[i] < nx1) and
-                        (iy1[i] >= 0) and (iy1[i] < ny1)):
-                        lattice1[ix1[i], iy1[i]].append( C[i] )
-                else:
-                    if ((ix2[i] >= 0) and (ix2[i] < nx2) and
-                        (iy2[i] >= 0) and (iy2[i] < ny2)):
-                        lattice2[ix2[i], iy2[i]].append( C[i] )
-
-
-            for i in xrange(nx1):
-                for j in xrange(ny1):
-                    vals = lattice1[i,j]
-                    if len(vals)>mincnt:
-                        lattice1[i,j] = reduce_C_function( vals )
-                    else:
-                        lattice1[i,j] = np.nan
-            for i in xrange(nx2):
-                for j in xrange(ny2):
-                    vals = lattice2[i,j]
-                    if len(vals)>mincnt:
-                        lattice2[i,j] = reduce_C_function( vals )
-                    else:
-                        lattice2[i,j] = np.nan
-
-            accum = np.hstack((
-                lattice1.astype(float).ravel(), lattice2.astype(float).ravel()))
-            good_idxs = ~np.isnan(accum)
+            accum = reducer.result()
+            accum[reducer.counts<=mincnt] = np.nan
+        good_idxs = ~np.isnan(accum)
 
         px = xmin + sx * np.array([ 0.5, 0.5, 0.0, -0.5, -0.5,  0.0])
         py = ymin + sy * np.array([-0.5, 0.5, 1.0,  0.5, -0.5, -1.0]) / 3.0
@@ -6183,20 +6176,12 @@ class Axes(martist.Artist):
             return collection
 
 
-        if C is None:
-            C = np.ones(len(x))
-
-        def coarse_bin(x, y, coarse):
-            ind = coarse.searchsorted(x).clip(0, len(coarse)-1)
-            mus = np.zeros(len(coarse))
-            for i in range(len(coarse)):
-                mu = reduce_C_function(y[ind==i])
-                mus[i] = mu
-            return mus
-
-        coarse = np.linspace(xmin, xmax, gridsize)
-
-        xcoarse = coarse_bin(xorig, C, coarse)
+        # the marginals were binned along with the hexagons, in the
+        # log scaled coordinates if any; empty bins are not drawn
+        coarse = xcoarse
+        if xscale=='log':
+            coarse = 10**coarse
+        xcoarse = xreducer.result()
         valid = ~np.isnan(xcoarse)
         verts, values = [], []
         for i,val in enumerate(xcoarse):
@@ -6225,8 +6210,10 @@ class Axes(martist.Artist):
         hbar.update(kwargs)
         self.add_collection(hbar)
 
-        coarse = np.linspace(ymin, ymax, gridsize)
-        ycoarse = coarse_bin(yorig, C, coarse)
+        coarse = ycoarse
+        if yscale=='log':
+            coarse = 10**coarse
+        ycoarse = yreducer.result()
         valid = ~np.isnan(ycoarse)
         verts, values = [], []
         for i,val in enumerate(ycoarse):
@@ -21,25 +21,49 @@ TODO:
   * integrate screen dpi w/ ppi and text
 """
 from __future__ import division
+import weakref
 
 import numpy as np
 
 from matplotlib import verbose, rcParams
 from matplotlib.backend_bases import RendererBase,\
      FigureManagerBase, FigureCanvasBase
-from matplotlib.cbook import is_string_like, maxdict
+from matplotlib.cbook import is_string_like, maxdict, LazyModule
 from matplotlib.figure import Figure
 from matplotlib.font_manager import findfont
 from matplotlib.ft2font import FT2Font, LOAD_FORCE_AUTOHINT, LOAD_NO_HINTING
-from matplotlib.mathtext import MathTextParser
 from matplotlib.path import Path
 from matplotlib.transforms import Bbox, BboxBase
 
 from _backend_agg import RendererAgg as _RendererAgg
 from matplotlib import _png
 
+mathtext = LazyModule('matplotlib.mathtext')
+
 backend_version = 'v2.2'
 
+def _rgba_index(c):
+    i = 'rgba'.find(c.lower())
+    if i < 0:
+        raise ValueError('unknown channel %r; use letters from "rgba"' % c)
+    return i
+
+def _channel_slice(ind):
+    """
+    Return the slice of the last axis of an RGBA array that selects
+    the channel indices *ind* in order, or None if there is none.
+    """
+    if len(ind) == 1:
+        return slice(ind[0], ind[0] + 1)
+    step = ind[1] - ind[0]
+    for i in range(2, len(ind)):
+        if ind[i] - ind[i-1] != step:
+            return None
+    stop = ind[-1] + step
+    if stop < 0:
+        stop = None
+    return slice(ind[0], stop, step)
+
 class RendererAgg(RendererBase):
     """
     The renderer handles all the drawing primitives using a graphics
@@ -58,17 +82,25 @@ class RendererAgg(RendererBase):
         if __debug__: verbose.report('RendererAgg.__init__ width=%s, height=%s'%(width, height), 'debug-annoying')
         self._renderer = _RendererAgg(int(width), int(height), dpi, debug=False)
         self._filter_renderers = []
+        # set once buffer_array has returned a view of the frame buffer
+        self._exported = False
 
         if __debug__: verbose.report('RendererAgg.__init__ _RendererAgg done',
                                      'debug-annoying')
 
         self._update_methods()
-        self.mathtext_parser = MathTextParser('Agg')
+        self._mathtext_parser = None
 
         self.bbox = Bbox.from_bounds(0, 0, self.width, self.height)
         if __debug__: verbose.report('RendererAgg.__init__ done',
                                      'debug-annoying')
 
+    def _get_mathtext_parser(self):
+        if self._mathtext_parser is None:
+            self._mathtext_parser = mathtext.MathTextParser('Agg')
+        return self._mathtext_parser
+    mathtext_parser = property(_get_mathtext_parser)
+
     def _get_hinting_flag(self):
         if rcParams['text.hinting']:
             return LOAD_FORCE_AUTOHINT
@@ -252,6 +284,56 @@ class RendererAgg(RendererBase):
                                      'debug-annoying')
         return self._renderer.buffer_rgba(x,y)
 
+    def buffer_array(self, channels='rgba', inplace=False):
+        """
+        Return the rendered pixels as a height x width x len(*channels*)
+        uint8 array sharing memory with the renderer, so that no copy
+        of the frame is made.  The array is only valid until the next
+        draw, and keeps the renderer alive.
+
+        *channels* is a string of letters from 'rgba' giving the
+        channel order, e.g. 'rgb', 'argb' or 'bgra'.  Orders that can
+        be expressed as a strided view of the RGBA buffer, e.g.
+        'rgba', 'rgb', 'bgr' or 'abgr', are always returned as views.
+        Other orders are copied, unless *inplace* is True, in which
+        case the channels of the buffer itself are swizzled in place
+        and a view of them is returned; this leaves the renderer's
+        pixels in the new order until it is next cleared.
+
+        A renderer that has returned a view is never put back in
+        :data:`renderer_pool`, so that the view can not show the pixels
+        of another figure drawn into a reused renderer.
+        """
+        arr = self._buffer_array(channels, inplace)
+        if not arr.flags.owndata:
+            self._exported = True
+        return arr
+
+    def _buffer_array(self, channels='rgba', inplace=False):
+        """
+        :meth:`buffer_array`, for callers that are done with the array
+        before the renderer can be reused.
+        """
+        buf = np.frombuffer(self._renderer, np.uint8)
+        buf = buf.reshape(int(self.height), int(self.width), 4)
+        ind = [_rgba_index(c) for c in channels]
+        if len(set(ind)) != len(ind):
+            raise ValueError('repeated channel in %r' % channels)
+
+        view = _channel_slice(ind)
+        if view is not None:
+            return buf[..., view]
+        if not inplace:
+            return buf[..., ind]
+
+        ind += [i for i in range(4) if i not in ind]
+        # swizzle a block of rows at a time to bound the temporary
+        nrows = max(1, 65536 // (buf.shape[1] + 1))
+        for row in xrange(0, buf.shape[0], nrows):
+            block = buf[row:row+nrows]
+            block[...] = block[..., ind]
+        return buf[..., :len(channels)]
+
     def clear(self):
         self._renderer.clear()
 
@@ -351,6 +433,88 @@ class RendererAgg(RendererBase):
                                       image)
 
 
+class RendererAggPool:
+    """
+    A pool of :class:`RendererAgg` instances, so that canvases
+    needing a renderer of a size and dpi that was used before reuse its
+    frame buffer instead of allocating a new one.
+
+    A canvas owns the renderer it got from :meth:`get_renderer` until
+    it asks for one of a different size or is garbage collected; the
+    renderer then becomes idle.  Idle renderers are handed out again,
+    cleared, for the same (width, height, dpi); the least recently
+    used are discarded when they take more than
+    ``rcParams['agg.renderer_pool.memory']`` megabytes.
+
+    Renderers whose frame buffer was handed out as an array by
+    :meth:`RendererAgg.buffer_array` are not made idle, as the array
+    would show whatever is drawn next into a reused renderer.
+    """
+    def __init__(self):
+        self._idle = []    # (key, renderer, nbytes), oldest first
+        self._nbytes = 0
+        self._owners = {}  # id(owner) -> (weakref to owner, renderer)
+
+    def get_renderer(self, owner, width, height, dpi):
+        """
+        Return a renderer of the given size and dpi for *owner*,
+        releasing the one *owner* held before, if any.
+        """
+        key = id(owner)
+        entry = self._owners.pop(key, None)
+        if entry is not None:
+            self.release(entry[1])
+
+        renderer = self._take((width, height, dpi))
+        if renderer is None:
+            renderer = RendererAgg(width, height, dpi)
+
+        def collected(ref, key=key):
+            entry = self._owners.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._owners[key]
+                self.release(entry[1])
+        self._owners[key] = (weakref.ref(owner, collected), renderer)
+        return renderer
+
+    def _take(self, key):
+        for i in range(len(self._idle)-1, -1, -1):
+            if self._idle[i][0] == key:
+                key, renderer, nbytes = self._idle.pop(i)
+                self._nbytes -= nbytes
+                renderer.clear()
+                return renderer
+        return None
+
+    def release(self, renderer):
+        """
+        Make *renderer* available for reuse, unless arrays of its
+        frame buffer may still be in use.
+        """
+        if renderer._exported:
+            return
+        maxbytes = rcParams['agg.renderer_pool.memory'] * 1024 * 1024
+        # the rgba frame buffer dominates
+        nbytes = int(renderer.width) * int(renderer.height) * 4
+        if nbytes > maxbytes:
+            return
+        key = renderer.width, renderer.height, renderer.dpi
+        self._idle.append((key, renderer, nbytes))
+        self._nbytes += nbytes
+        while self._nbytes > maxbytes:
+            key, renderer, nbytes = self._idle.pop(0)
+            self._nbytes -= nbytes
+
+    def clear(self):
+        """
+        Discard all idle renderers.
+        """
+        self._idle = []
+        self._nbytes = 0
+
+renderer_pool = RendererAggPool()
+
+
 def new_figure_manager(num, *args, **kwargs):
     """
     Create a new figure manager instance
@@ -401,7 +565,8 @@ class FigureCanvasAgg(FigureCanvasBase):
         else:  need_new_renderer = (self._lastKey != key)
 
         if need_new_renderer:
-            self.renderer = RendererAgg(w, h, self.figure.dpi)
+            self.renderer = renderer_pool.get_renderer(self, w, h,
+                                                       self.figure.dpi)
             self._lastKey = key
         return self.renderer
 
@@ -420,6 +585,32 @@ class FigureCanvasAgg(FigureCanvasBase):
                                      'debug-annoying')
         return self.renderer.buffer_rgba(x,y)
 
+    def buffer_array(self, channels='rgba', inplace=False):
+        """
+        Return the rendered pixels as a uint8 array without copying
+        them; see :meth:`RendererAgg.buffer_array`.  The renderer is
+        then not reused by other canvases.
+        """
+        if __debug__: verbose.report('FigureCanvasAgg.buffer_array',
+                                     'debug-annoying')
+        return self.renderer.buffer_array(channels, inplace)
+
+    def frame_writer(self, sink, artists=(), fps=25, buffered=True,
+                     **kwargs):
+        """
+        Return a :class:`~matplotlib.framesink.FrameWriter` that
+        renders frames of the figure into *sink*, redrawing only
+        *artists* between frames.
+
+        *sink* is a :class:`~matplotlib.framesink.FrameSink`, or a
+        filename: a pattern like 'frame%05d.png' writes a PNG per
+        frame, any other name is encoded as a video by ffmpeg.  *fps*
+        and *kwargs* are passed to the sink made from a filename.
+        """
+        from matplotlib.framesink import FrameWriter, make_sink
+        return FrameWriter(self, make_sink(sink, fps, **kwargs), artists,
+                           buffered)
+
     def get_default_filetype(self):
         return 'png'
 
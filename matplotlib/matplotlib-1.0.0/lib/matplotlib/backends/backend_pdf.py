@@ -30,7 +30,7 @@ from matplotlib.backend_bases import RendererBase, GraphicsContextBase,\
      FigureManagerBase, FigureCanvasBase
 from matplotlib.backends.backend_mixed import MixedModeRenderer
 from matplotlib.cbook import Bunch, is_string_like, reverse_dict, \
-    get_realpath_and_stat, is_writable_file_like, maxdict
+    get_realpath_and_stat, is_writable_file_like, maxdict, LazyModule
 from matplotlib.mlab import quad2cubic
 from matplotlib.figure import Figure
 from matplotlib.font_manager import findfont, is_opentype_cff_font
@@ -39,11 +39,12 @@ import matplotlib.type1font as type1font
 import matplotlib.dviread as dviread
 from matplotlib.ft2font import FT2Font, FIXED_WIDTH, ITALIC, LOAD_NO_SCALE, \
     LOAD_NO_HINTING, KERNING_UNFITTED
-from matplotlib.mathtext import MathTextParser
 from matplotlib.transforms import Affine2D, Bbox, BboxBase, TransformedPath
 from matplotlib.path import Path
 from matplotlib import ttconv
 
+mathtext = LazyModule('matplotlib.mathtext')
+
 # Overview
 #
 # The low-level knowledge about pdf syntax lies mainly in the pdfRepr
@@ -1342,10 +1343,16 @@ class RendererPdf(RendererBase):
         RendererBase.__init__(self)
         self.file = file
         self.gc = self.new_gc()
-        self.mathtext_parser = MathTextParser("Pdf")
+        self._mathtext_parser = None
         self.image_dpi = image_dpi
         self.tex_font_map = None
 
+    def _get_mathtext_parser(self):
+        if self._mathtext_parser is None:
+            self._mathtext_parser = mathtext.MathTextParser("Pdf")
+        return self._mathtext_parser
+    mathtext_parser = property(_get_mathtext_parser)
+
     def finalize(self):
         self.file.output(*self.gc.finalize())
 
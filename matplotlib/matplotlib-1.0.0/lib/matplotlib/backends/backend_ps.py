@@ -20,14 +20,13 @@ from matplotlib.backend_bases import RendererBase, GraphicsContextBase,\
      FigureManagerBase, FigureCanvasBase
 
 from matplotlib.cbook import is_string_like, get_realpath_and_stat, \
-    is_writable_file_like, maxdict
+    is_writable_file_like, maxdict, LazyModule
 from matplotlib.mlab import quad2cubic
 from matplotlib.figure import Figure
 
 from matplotlib.font_manager import findfont, is_opentype_cff_font
 from matplotlib.ft2font import FT2Font, KERNING_DEFAULT, LOAD_NO_HINTING
 from matplotlib.ttconv import convert_ttf_to_ps
-from matplotlib.mathtext import MathTextParser
 from matplotlib._mathtext_data import uni2type1
 from matplotlib.text import Text
 from matplotlib.path import Path
@@ -39,6 +38,8 @@ from matplotlib.backends.backend_mixed import MixedModeRenderer
 import numpy as np
 import binascii
 import re
+
+mathtext = LazyModule('matplotlib.mathtext')
 try:
     set
 except NameError:
@@ -168,11 +169,17 @@ class RendererPS(RendererBase):
         self._path_collection_id = 0
 
         self.used_characters = {}
-        self.mathtext_parser = MathTextParser("PS")
+        self._mathtext_parser = None
 
         self._afm_font_dir = os.path.join(
             rcParams['datapath'], 'fonts', 'afm')
 
+    def _get_mathtext_parser(self):
+        if self._mathtext_parser is None:
+            self._mathtext_parser = mathtext.MathTextParser("PS")
+        return self._mathtext_parser
+    mathtext_parser = property(_get_mathtext_parser)
+
     def track_characters(self, font, s):
         """Keeps track of which characters are required from
         each font."""
@@ -13,18 +13,20 @@ from matplotlib import verbose, __version__, rcParams
 from matplotlib.backend_bases import RendererBase, GraphicsContextBase,\
      FigureManagerBase, FigureCanvasBase
 from matplotlib.backends.backend_mixed import MixedModeRenderer
-from matplotlib.cbook import is_string_like, is_writable_file_like, maxdict
+from matplotlib.cbook import is_string_like, is_writable_file_like, maxdict, \
+     LazyModule
 from matplotlib.colors import rgb2hex
 from matplotlib.figure import Figure
 from matplotlib.font_manager import findfont, FontProperties
 from matplotlib.ft2font import FT2Font, KERNING_DEFAULT, LOAD_NO_HINTING
-from matplotlib.mathtext import MathTextParser
 from matplotlib.path import Path
 from matplotlib.transforms import Affine2D
 from matplotlib import _png
 
 from xml.sax.saxutils import escape as escape_xml_text
 
+mathtext = LazyModule('matplotlib.mathtext')
+
 backend_version = __version__
 
 def new_figure_manager(num, *args, **kwargs):
@@ -57,13 +59,19 @@ class RendererSVG(RendererBase):
         self._imaged = {}
         self._hatchd = {}
         self._n_gradients = 0
-        self.mathtext_parser = MathTextParser('SVG')
+        self._mathtext_parser = None
 
         RendererBase.__init__(self)
         self._glyph_map = dict()
 
         svgwriter.write(svgProlog%(width,height,width,height))
 
+    def _get_mathtext_parser(self):
+        if self._mathtext_parser is None:
+            self._mathtext_parser = mathtext.MathTextParser('SVG')
+        return self._mathtext_parser
+    mathtext_parser = property(_get_mathtext_parser)
+
     def _draw_svg_element(self, element, details, gc, rgbFace):
         clipid = self._get_gc_clip_svg(gc)
         if clipid is None:
@@ -0,0 +1,167 @@
+"""
+Render many figures to files or strings, in parallel.
+
+:func:`render_many` takes a sequence of :class:`FigureSpec` instances,
+each naming a function that draws into a fresh
+:class:`~matplotlib.figure.Figure`, and prints the figures in a pool of
+worker processes.  It only uses the object oriented
+:class:`~matplotlib.figure.Figure` and
+:class:`~matplotlib.backends.backend_agg.FigureCanvasAgg` API, never
+:mod:`~matplotlib.pyplot` and its global figure manager, so the figures
+are independent of each other and of the calling program::
+
+    import matplotlib.batch as batch
+
+    def draw(fig, data):
+        ax = fig.add_subplot(111)
+        ax.plot(data)
+
+    specs = [batch.FigureSpec(draw, (data,), filename='report%d.pdf' % i)
+             for i, data in enumerate(datasets)]
+    for i, result in batch.render_many(specs, workers=4):
+        print 'wrote', result
+
+Each worker copies the rc settings of the calling process and renders
+a small figure with text and math text when it starts, so that the font
+lookup and mathtext parser caches are warm before the first real
+figure.
+
+Parallel rendering needs the :mod:`multiprocessing` module (python 2.6
+or later); without it the figures are rendered one after the other in
+the calling process.
+"""
+
+import cStringIO
+
+import matplotlib
+from matplotlib import rcParams
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None
+
+
+class FigureSpec(object):
+    """
+    The description of one figure for :func:`render_many`.
+
+    *func* is called as ``func(fig, *args, **kwargs)`` with a new
+    :class:`~matplotlib.figure.Figure` and should draw into it.  To be
+    sent to the worker processes, *func* must be a module level
+    function and *args* and *kwargs* must be picklable.
+
+    *filename*
+        the file to write the figure to; if None, the rendered file is
+        returned as a string instead
+
+    *format*
+        the file format, e.g., 'png' or 'pdf'; if None, it is taken
+        from the *filename* extension, defaulting to 'png'
+
+    *figsize*, *dpi*
+        passed to the :class:`~matplotlib.figure.Figure`
+
+    *savefig_kw*
+        other keyword arguments to
+        :meth:`~matplotlib.backend_bases.FigureCanvasBase.print_figure`,
+        e.g., *facecolor* or *bbox_inches*
+    """
+    def __init__(self, func, args=(), kwargs=None, filename=None,
+                 format=None, figsize=None, dpi=None, savefig_kw=None):
+        self.func = func
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.filename = filename
+        if format is None and filename is None:
+            format = 'png'
+        self.format = format
+        self.figsize = figsize
+        self.dpi = dpi
+        self.savefig_kw = savefig_kw or {}
+
+    def render(self):
+        """
+        Build and print the figure.  Returns the filename, or the
+        contents of the file if :attr:`filename` is None.
+        """
+        fig = Figure(figsize=self.figsize, dpi=self.dpi)
+        canvas = FigureCanvasAgg(fig)
+        self.func(fig, *self.args, **self.kwargs)
+
+        kw = dict(self.savefig_kw)
+        kw.setdefault('dpi', self.dpi)
+        if self.filename is None:
+            out = cStringIO.StringIO()
+            canvas.print_figure(out, format=self.format, **kw)
+            return out.getvalue()
+        canvas.print_figure(self.filename, format=self.format, **kw)
+        return self.filename
+
+
+def _warm_up():
+    """
+    Render a small figure with text and math text to fill the font
+    and mathtext caches.
+    """
+    fig = Figure(figsize=(1, 1))
+    fig.text(0.5, 0.5, r'warm up $\alpha^2$')
+    FigureCanvasAgg(fig).draw()
+
+def _init_worker(rc):
+    rcParams.update(rc)
+    try:
+        _warm_up()
+    except Exception, msg:
+        matplotlib.verbose.report('batch worker warm up failed: %s' % msg)
+
+def _render_job(job):
+    i, spec = job
+    return i, spec.render()
+
+
+def render_many(specs, workers=None, ordered=True):
+    """
+    Render the figures described by the :class:`FigureSpec` instances
+    in *specs*, using *workers* processes (by default one per CPU).
+
+    Returns an iterator over ``(index, result)`` pairs, where *index*
+    is the position of the spec in *specs* and *result* is what
+    :meth:`FigureSpec.render` returned, i.e. the filename or the file
+    contents.  Results are produced as they are rendered; if *ordered*
+    is False, in the order they finish rather than the order of
+    *specs*.  An exception raised while rendering a figure is re-raised
+    when its result is reached.
+
+    If *workers* is 1, or :mod:`multiprocessing` is not available, the
+    figures are rendered in the calling process.
+    """
+    jobs = list(enumerate(specs))
+    if workers is None:
+        if multiprocessing is None:
+            workers = 1
+        else:
+            workers = multiprocessing.cpu_count()
+    workers = min(workers, len(jobs))
+
+    if workers <= 1 or multiprocessing is None:
+        return (_render_job(job) for job in jobs)
+    return _render_parallel(jobs, workers, ordered)
+
+def _render_parallel(jobs, workers, ordered):
+    pool = multiprocessing.Pool(workers, _init_worker, (dict(rcParams),))
+    try:
+        if ordered:
+            results = pool.imap(_render_job, jobs)
+        else:
+            results = pool.imap_unordered(_render_job, jobs)
+        for result in results:
+            yield result
+    except:
+        pool.terminate()
+        pool.join()
+        raise
+    pool.close()
+    pool.join()
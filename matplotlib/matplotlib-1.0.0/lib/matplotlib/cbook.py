@@ -365,6 +365,37 @@ class Bunch:
         keys = self.__dict__.keys()
         return 'Bunch(%s)'%', '.join(['%s=%s'%(k,self.__dict__[k]) for k in keys])
 
+class LazyModule(object):
+    """
+    A stand-in for the module *name* that only imports it when one of
+    its attributes is first accessed.  Use it for dependencies that are
+    costly to import and not needed by most programs, e.g.::
+
+        mathtext = LazyModule('matplotlib.mathtext')
+
+    so that importing the dependent module stays cheap.
+    """
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            __import__(self._name)
+            module = sys.modules[self._name]
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        return '<lazy module %r>' % self._name
+
 def unique(x):
     'Return a list of unique elements of *x*'
     return dict([ (val, 1) for val in x]).keys()
@@ -1104,6 +1135,75 @@ class maxdict(dict):
         dict.__setitem__(self, k, v)
 
 
+class LRUCache(object):
+    """
+    A mapping of at most *maxsize* items that, when full, forgets the
+    least recently used item to make room for a new one.  Lookups
+    with :meth:`get` are counted in the *hits* and *misses*
+    attributes.  *maxsize* may be changed at any time; the cache
+    shrinks at the next insertion.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = {}
+        # a circular doubly linked list of [prev, next, key, value],
+        # most recently used last
+        self._root = root = []
+        root[:] = [root, root, None, None]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        """
+        Return the value of *key*, marking it as the most recently
+        used, or *default* if it is not in the cache.
+        """
+        link = self._items.get(key)
+        if link is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._unlink(link)
+        self._append(link)
+        return link[3]
+
+    def __setitem__(self, key, value):
+        link = self._items.get(key)
+        if link is not None:
+            self._unlink(link)
+        else:
+            link = self._items[key] = [None, None, key, None]
+        link[3] = value
+        self._append(link)
+        while len(self._items) > max(self.maxsize, 0):
+            oldest = self._root[1]
+            self._unlink(oldest)
+            del self._items[oldest[2]]
+
+    def clear(self):
+        "forget all items and reset the counters"
+        self._items.clear()
+        root = self._root
+        root[:] = [root, root, None, None]
+        self.hits = self.misses = 0
+
+    def _unlink(self, link):
+        prev, next = link[0], link[1]
+        prev[1] = next
+        next[0] = prev
+
+    def _append(self, link):
+        root = self._root
+        last = root[0]
+        link[0], link[1] = last, root
+        last[1] = root[0] = link
+
 
 class Stack(object):
     """
@@ -1230,6 +1330,18 @@ def report_memory(i=0):  # argument may go away
 
     return mem
 
+_ncpus = None
+def cpu_count():
+    'return the number of CPUs, or 1 if it cannot be determined'
+    global _ncpus
+    if _ncpus is None:
+        try:
+            import multiprocessing
+            _ncpus = multiprocessing.cpu_count()
+        except (ImportError, NotImplementedError):
+            _ncpus = 1
+    return _ncpus
+
 _safezip_msg = 'In safezip, len(args[0])=%d but len(args[%d])=%d'
 def safezip(*args):
     'make sure *args* are equal len before zipping'
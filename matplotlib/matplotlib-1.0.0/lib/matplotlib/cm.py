@@ -189,6 +189,12 @@ class ScalarMappable:
         except AttributeError:
             pass
         x = ma.asarray(x)
+        if (x.ndim and hasattr(self.norm, 'lut_index') and
+            self.cmap.__class__.__call__ == colors.Colormap.__call__):
+            # normalize straight to colormap indices; see
+            # colors.Normalize.lut_index
+            ind, mask = self.norm.lut_index(x, self.cmap.N)
+            return self.cmap.lookup(ind, mask, alpha=alpha, bytes=bytes)
         x = self.norm(x)
         x = self.cmap(x, alpha=alpha, bytes=bytes)
         return x
@@ -22,6 +22,7 @@ from matplotlib.artist import allow_rasterization
 import matplotlib.backend_bases as backend_bases
 import matplotlib.path as mpath
 import matplotlib.mlab as mlab
+import matplotlib.gridindex as gridindex
 
 class Collection(artist.Artist, cm.ScalarMappable):
     """
@@ -61,6 +62,7 @@ class Collection(artist.Artist, cm.ScalarMappable):
     _offsets = np.array([], np.float_)
     _transOffset = transforms.IdentityTransform()
     _transforms = []
+    _hit_cache = None
 
     zorder = 1
     def __init__(self,
@@ -231,6 +233,10 @@ class Collection(artist.Artist, cm.ScalarMappable):
         if callable(self._contains): return self._contains(self,mouseevent)
         if not self.get_visible(): return False,{}
 
+        index = self._get_hit_index()
+        if index is not None:
+            return self._contains_indexed(mouseevent, index)
+
         transform, transOffset, offsets, paths = self._prepare_points()
 
         ind = mpath.point_in_path_collection(
@@ -239,6 +245,98 @@ class Collection(artist.Artist, cm.ScalarMappable):
             offsets, transOffset, len(self._facecolors)>0)
         return len(ind)>0,dict(ind=ind)
 
+    def _get_hit_index(self):
+        """
+        Return a :class:`~matplotlib.gridindex.GridIndex` of the
+        display space extents of the items, or None if the collection
+        is too small or too irregular to index.  Only collections with
+        at least :data:`matplotlib.gridindex.min_items` offsets, and
+        one path and transform or one per offset, are indexed.  The
+        index is cached until the offsets, paths, transforms or the
+        transforms to display space change.
+        """
+        offsets = self._offsets
+        paths = self.get_paths()
+        trans = self.get_transforms()
+        transform = self.get_transform()
+        N = len(offsets)
+        if (N < gridindex.min_items or self.have_units() or
+            not transform.is_affine or
+            len(paths) not in (1, N) or len(trans) not in (0, 1, N)):
+            return None
+
+        cache = self._hit_cache
+        if (cache is None or cache[0] is not offsets or
+            cache[1] is not self._transOffset):
+            # the non-affine part of the offsets transform is applied
+            # only when it changes, as for Line2D paths
+            offset_path = transforms.TransformedPath(mpath.Path(offsets),
+                                                     self._transOffset)
+            cache = [offsets, self._transOffset, offset_path, None, None]
+            self._hit_cache = cache
+        points, affine = cache[2].get_transformed_points_and_affine()
+
+        master = transform.get_matrix()
+        key = (points, paths, trans, affine.get_matrix(), master)
+        if cache[3] is not None and self._same_hit_key(cache[3], key):
+            return cache[4]
+
+        # each item lies within a square around its transformed
+        # offset, of half side the norm of its linear transform times
+        # the largest distance of its path's vertices from the origin
+        mats = []
+        for t in trans:
+            if isinstance(t, transforms.Transform):
+                t = t.get_matrix()
+            mats.append(t)
+        if not len(mats):
+            mats = [np.eye(3)]
+        mats = np.asarray(mats, np.float_)
+        linear = np.dot(master[:2, :2], mats[:, :2, :2])
+        scale = np.sqrt((linear**2).sum(axis=2).sum(axis=0))
+        reach = np.zeros(len(paths))
+        for i, path in enumerate(paths):
+            if len(path.vertices):
+                reach[i] = np.sqrt((path.vertices**2).sum(axis=1)).max()
+        shift = np.dot(mats[:, :2, 2], master[:2, :2].T) + master[:2, 2]
+        xy = affine.transform(points.vertices) + shift
+        index = gridindex.GridIndex(gridindex.point_extents(
+            xy[:, 0], xy[:, 1], scale * reach))
+        cache[3], cache[4] = key, index
+        return index
+
+    def _same_hit_key(self, old, new):
+        return (old[0] is new[0] and old[1] is new[1] and old[2] is new[2]
+                and (old[3] == new[3]).all() and (old[4] == new[4]).all())
+
+    def _contains_indexed(self, mouseevent, index):
+        """
+        :meth:`contains`, testing only the items that the grid *index*
+        finds near the event.
+        """
+        x, y, r = mouseevent.x, mouseevent.y, self._pickradius
+        near = index.query(x - r, y - r, x + r, y + r)
+        if not len(near):
+            return False, dict(ind=[])
+
+        transOffset = self._transOffset
+        offsets = np.asarray(self._offsets, np.float_)[near]
+        paths = self.get_paths()
+        if len(paths) > 1:
+            paths = [paths[i] for i in near]
+        trans = self.get_transforms()
+        if len(trans) > 1:
+            trans = [trans[i] for i in near]
+        if not transOffset.is_affine:
+            offsets = transOffset.transform_non_affine(offsets)
+            transOffset = transOffset.get_affine()
+
+        ind = mpath.point_in_path_collection(
+            x, y, r, self.get_transform().frozen(), paths, trans,
+            offsets, transOffset, len(self._facecolors)>0)
+        ind = list(near[np.asarray(ind, np.int_)])
+        return len(ind)>0,dict(ind=ind)
+
     def set_pickradius(self,pickradius): self.pickradius = 5
     def get_pickradius(self): return self.pickradius
 
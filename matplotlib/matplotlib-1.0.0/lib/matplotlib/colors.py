@@ -462,6 +462,37 @@ def makeMappingArray(N, data, gamma=1.0):
     return lut
 
 
+def _to_lut_index(xa, N):
+    """
+    Convert the float array *xa* of normalized values to integer
+    indices into a colormap of *N* colors, with -1 for values below 0
+    and *N* for values above 1.  *xa* is overwritten.
+    """
+    np.putmask(xa, xa==1.0, 0.9999999) #Treat 1.0 as slightly less than 1.
+    # The following clip is fast, and prevents possible
+    # conversion of large positive values to negative integers.
+
+    xa *= N
+    if NP_CLIP_OUT:
+        np.clip(xa, -1, N, out=xa)
+    else:
+        xa = np.clip(xa, -1, N)
+    return xa.astype(int)
+
+def _norm_to_lut_index(X, N):
+    """
+    Return the integer indices into a colormap of *N* colors of the
+    normalized values or indices *X*, and the mask of *X*.
+    """
+    # force a copy here -- the ma.array and filled functions
+    # do force a cop of the data by default - JDH
+    xma = ma.array(X, copy=True)
+    xa = xma.filled(0)
+    if xa.dtype.char in np.typecodes['Float']:
+        xa = _to_lut_index(xa, N)
+    return xa, ma.getmask(xma)
+
+
 class Colormap:
     """Base class for all scalar to rgb mappings
 
@@ -487,6 +518,7 @@ class Colormap:
         self._i_over = N+1
         self._i_bad = N+2
         self._isinit = False
+        self._lut_bytes = None
 
 
     def __call__(self, X, alpha=None, bytes=False):
@@ -502,42 +534,54 @@ class Colormap:
         0-1 scale; if True, they will be uint8, 0-255.
         """
 
-        if not self._isinit: self._init()
         mask_bad = None
         if not cbook.iterable(X):
             vtype = 'scalar'
             xa = np.array([X])
+            if xa.dtype.char in np.typecodes['Float']:
+                xa = _to_lut_index(xa, self.N)
         else:
             vtype = 'array'
-            # force a copy here -- the ma.array and filled functions
-            # do force a cop of the data by default - JDH
-            xma = ma.array(X, copy=True)
-            xa = xma.filled(0)
-            mask_bad = ma.getmask(xma)
-        if xa.dtype.char in np.typecodes['Float']:
-            np.putmask(xa, xa==1.0, 0.9999999) #Treat 1.0 as slightly less than 1.
-            # The following clip is fast, and prevents possible
-            # conversion of large positive values to negative integers.
-
-            if NP_CLIP_OUT:
-                np.clip(xa * self.N, -1, self.N, out=xa)
-            else:
-                xa = np.clip(xa * self.N, -1, self.N)
-            xa = xa.astype(int)
+            xa, mask_bad = _norm_to_lut_index(X, self.N)
+        rgba = self.lookup(xa, mask_bad, alpha, bytes)
+        if vtype == 'scalar':
+            rgba = tuple(rgba[0,:])
+        return rgba
+
+    def lookup(self, ind, mask=None, alpha=None, bytes=False):
+        """
+        Return the rgba colors of the integer indices *ind* into the
+        colormap, as an array of shape ``ind.shape+(4,)``.  Indices
+        below 0 get the under color, indices above N-1 the over color
+        and those where the boolean array *mask* is True the bad
+        color.  *ind* is overwritten.  *alpha* and *bytes* are as for
+        :meth:`__call__`.
+
+        :meth:`Normalize.lut_index` maps data straight to such
+        indices; together they color an array without making the
+        normalized or float rgba arrays.
+        """
+        if not self._isinit: self._init()
+        xa = ind
         # Set the over-range indices before the under-range;
         # otherwise the under-range values get converted to over-range.
         np.putmask(xa, xa>self.N-1, self._i_over)
         np.putmask(xa, xa<0, self._i_under)
-        if mask_bad is not None and mask_bad.shape == xa.shape:
-            np.putmask(xa, mask_bad, self._i_bad)
+        if mask is not None and mask.shape == xa.shape:
+            np.putmask(xa, mask, self._i_bad)
         if bytes:
-            lut = (self._lut * 255).astype(np.uint8)
+            if self._lut_bytes is None:
+                self._lut_bytes = (self._lut * 255).astype(np.uint8)
+            lut = self._lut_bytes
         else:
-            lut = self._lut.copy() # Don't let alpha modify original _lut.
+            lut = self._lut
 
         if alpha is not None:
+            lut = lut.copy() # Don't let alpha modify original _lut.
             alpha = min(alpha, 1.0) # alpha must be between 0 and 1
             alpha = max(alpha, 0.0)
+            if bytes:
+                alpha = int(alpha * 255)
             if (lut[-1] == 0).all():
                 lut[:-1, -1] = alpha
                 # All zeros is taken as a flag for the default bad
@@ -553,8 +597,6 @@ class Colormap:
                     #  twice as fast as lut[xa];
                     #  using the clip or wrap mode and providing an
                     #  output array speeds it up a little more.
-        if vtype == 'scalar':
-            rgba = tuple(rgba[0,:])
         return rgba
 
     def set_bad(self, color = 'k', alpha = None):
@@ -578,6 +620,7 @@ class Colormap:
         if self._isinit: self._set_extremes()
 
     def _set_extremes(self):
+        self._lut_bytes = None
         if self._rgba_under:
             self._lut[self._i_under] = self._rgba_under
         else:
@@ -822,6 +865,42 @@ class Normalize:
             result = result[0]
         return result
 
+    def lut_index(self, value, N):
+        """
+        Map the array *value* to integer indices into a colormap of *N*
+        colors, with -1 for values below the range and *N* for values
+        above it.  Returns the indices and the mask of *value*, for
+        :meth:`Colormap.lookup`.
+
+        The result is that of passing the normalized values to the
+        colormap, but the normalization is done in place in a single
+        float copy of *value*, without the intermediate masked arrays.
+        A subclass that only overrides :meth:`__call__` gets the
+        unfused version.
+        """
+        if self.__class__.__call__ != Normalize.__call__:
+            return _norm_to_lut_index(self(value), N)
+
+        val = ma.asarray(value)
+        self.autoscale_None(val)
+        vmin, vmax = self.vmin, self.vmax
+        if vmin > vmax:
+            raise ValueError("minvalue must be less than or equal to maxvalue")
+        xa = np.array(ma.getdata(val), np.float)
+        mask = ma.getmask(val)
+        if vmin==vmax:
+            xa *= 0.0
+        else:
+            vmin = float(vmin)
+            vmax = float(vmax)
+            if self.clip:
+                np.clip(xa, vmin, vmax, out=xa)
+            xa -= vmin
+            xa /= vmax - vmin
+            # masked array division masks the invalid results, e.g., nan
+            mask = ma.mask_or(mask, ~np.isfinite(xa))
+        return _to_lut_index(xa, N), mask
+
     def inverse(self, value):
         if not self.scaled():
             raise ValueError("Not invertible until scaled")
@@ -885,6 +964,33 @@ class LogNorm(Normalize):
             result = result[0]
         return result
 
+    def lut_index(self, value, N):
+        if self.__class__.__call__ != LogNorm.__call__:
+            return _norm_to_lut_index(self(value), N)
+
+        val = ma.asarray(value)
+        xa = np.array(ma.getdata(val), np.float)
+        mask = ma.mask_or(ma.getmask(val), xa <= 0)
+        self.autoscale_None(ma.array(xa, mask=mask))
+        vmin, vmax = self.vmin, self.vmax
+        if vmin > vmax:
+            raise ValueError("minvalue must be less than or equal to maxvalue")
+        elif vmin<=0:
+            raise ValueError("values must all be positive")
+        elif vmin==vmax:
+            xa *= 0.0
+        else:
+            if self.clip:
+                np.clip(xa, vmin, vmax, out=xa)
+            # the masked values are not colored; keep them out of log
+            if mask is not ma.nomask:
+                np.putmask(xa, mask, vmin)
+            np.log(xa, xa)
+            xa -= np.log(vmin)
+            xa /= np.log(vmax)-np.log(vmin)
+            mask = ma.mask_or(mask, ~np.isfinite(xa))
+        return _to_lut_index(xa, N), mask
+
     def inverse(self, value):
         if not self.scaled():
             raise ValueError("Not invertible until scaled")
@@ -965,9 +1071,12 @@ class BoundaryNorm(Normalize):
         xx = x.filled(self.vmax+1)
         if clip:
             np.clip(xx, self.vmin, self.vmax)
-        iret = np.zeros(x.shape, dtype=np.int16)
-        for i, b in enumerate(self.boundaries):
-            iret[xx>=b] = i
+        # the index of the last boundary <= each value
+        iret = np.array(self.boundaries.searchsorted(xx, 'right'), np.int16)
+        iret -= 1
+        iret[xx<self.vmin] = 0
+        if xx.dtype.char in np.typecodes['Float']:
+            iret[np.isnan(xx)] = 0
         if self._interp:
             iret = (iret * (float(self.Ncmap-1)/(self.N-2))).astype(np.int16)
         iret[xx<self.vmin] = -1
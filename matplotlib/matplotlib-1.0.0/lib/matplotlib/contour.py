@@ -17,8 +17,10 @@ import matplotlib.font_manager as font_manager
 import matplotlib.text as text
 import matplotlib.cbook as cbook
 import matplotlib.mlab as mlab
-import matplotlib.mathtext as mathtext
-import matplotlib.texmanager as texmanager
+import matplotlib.gridindex as gridindex
+# only needed for math text and TeX labels
+mathtext = cbook.LazyModule('matplotlib.mathtext')
+texmanager = cbook.LazyModule('matplotlib.texmanager')
 
 # Import needed for adding manual selection capability to clabel
 from matplotlib.blocking_input import BlockingContourLabeler
@@ -194,6 +196,8 @@ class ContourLabeler:
         #self.labelTexts = []   # Initialized in ContourSet.__init__
         #self.labelCValues = [] # same
         self.labelXYs = []
+        self.labelInline = inline
+        self.labelInlineSpacing = inline_spacing
 
         if self.labelManual:
             print 'Select label locations manually using first mouse button.'
@@ -236,15 +240,29 @@ class ContourLabeler:
 
     def too_close(self, x,y, lw):
         "if there's a label already nearby, find a better place"
-        if self.labelXYs != []:
-            dist = [np.sqrt((x-loc[0]) ** 2 + (y-loc[1]) ** 2)
-                    for loc in self.labelXYs]
-            for d in dist:
-                if d < 1.2*lw:
-                    return 1
-                else: return 0
+        r = 1.2 * lw
+        near = self._get_label_grid(r).query(x - r, y - r, x + r, y + r)
+        if np.any((near[:,0] - x) ** 2 + (near[:,1] - y) ** 2 < r * r):
+            return 1
         else: return 0
 
+    def _get_label_grid(self, cellsize):
+        """
+        Return a :class:`~matplotlib.gridindex.PointGrid` of the
+        positions in labelXYs, for finding the labels near a point.
+        A new grid with cells of side *cellsize* is made when labelXYs
+        has been replaced or has lost points; otherwise the points
+        added since the last call are added to the grid.
+        """
+        cache = getattr(self, '_label_grid', None)
+        if (cache is None or cache[0] is not self.labelXYs or
+            cache[1].n > len(self.labelXYs)):
+            cache = self._label_grid = (self.labelXYs,
+                                        gridindex.PointGrid(cellsize))
+        grid = cache[1]
+        grid.extend(self.labelXYs[grid.n:])
+        return grid
+
     def get_label_coords(self, distances, XX, YY, ysize, lw):
         """ labels are ploted at a location with the smallest
         dispersion of the contour from a straight line
@@ -257,12 +275,21 @@ class ContourLabeler:
         hysize = int(ysize/2)
         adist = np.argsort(distances)
 
-        for ind in adist:
-            x, y = XX[ind][hysize], YY[ind][hysize]
-            if self.too_close(x,y, lw):
-                continue
-            else:
-                return x,y, ind
+        # test all the candidates at once against the labels near
+        # the contour
+        xs, ys = XX[adist, hysize], YY[adist, hysize]
+        r = 1.2 * lw
+        near = self._get_label_grid(r).query(xs.min() - r, ys.min() - r,
+                                             xs.max() + r, ys.max() + r)
+        if not len(near):
+            return xs[0], ys[0], adist[0]
+        free = np.ones(len(adist), bool)
+        for nx, ny in near:
+            free &= (xs - nx) ** 2 + (ys - ny) ** 2 >= r * r
+        ifree = np.nonzero(free)[0]
+        if len(ifree):
+            i = ifree[0]
+            return xs[i], ys[i], adist[i]
 
         ind = adist[0]
         x, y = XX[ind][hysize], YY[ind][hysize]
@@ -273,6 +300,15 @@ class ContourLabeler:
         if not cbook.is_string_like(lev):
             lev = self.get_text(lev, fmt)
 
+        # math text and TeX are rendered to measure them, so the
+        # widths are kept for the next labels of the same text
+        key = lev, fsize, hash(self.labelFontProps)
+        cache = self.__dict__.setdefault('_label_widths', {})
+        if key not in cache:
+            cache[key] = self._get_label_width(lev, fsize)
+        return cache[key]
+
+    def _get_label_width(self, lev, fsize):
         lev, ismath = text.Text.is_math_text(lev)
         if ismath == 'TeX':
             if not hasattr(self, '_TeX_manager'):
@@ -334,7 +370,23 @@ class ContourLabeler:
         part of the contour) and the angle of rotation for the
         text object
         """
+        dist, XX, YY, ysize = self._label_scores(linecontour, labelwidth)
+        x,y,ind = self.get_label_coords(dist, XX, YY, ysize, labelwidth)
+
+        return x, y, self._vertex_at(linecontour, x, y)
+
+    def _vertex_at(self, linecontour, x, y):
+        "index of the first vertex of *linecontour* at *x*, *y*"
+        return np.nonzero((linecontour[:,0] == x) &
+                          (linecontour[:,1] == y))[0][0]
 
+    def _label_scores(self, linecontour, labelwidth):
+        """
+        Split *linecontour* into candidate label positions, and return
+        the dispersion of each from a straight line, the x and y of
+        the vertices of each candidate, and the number of vertices of
+        a candidate: the arguments of :meth:`get_label_coords`.
+        """
         nsize= len(linecontour)
         if labelwidth > 1:
             xsize = int(np.ceil(nsize/labelwidth))
@@ -347,24 +399,58 @@ class ContourLabeler:
 
         XX = np.resize(linecontour[:,0],(xsize, ysize))
         YY = np.resize(linecontour[:,1],(xsize, ysize))
-        #I might have fouled up the following:
-        yfirst = YY[:,0].reshape(xsize, 1)
-        ylast = YY[:,-1].reshape(xsize, 1)
-        xfirst = XX[:,0].reshape(xsize, 1)
-        xlast = XX[:,-1].reshape(xsize, 1)
-        s = (yfirst-YY) * (xlast-xfirst) - (xfirst-XX) * (ylast-yfirst)
-        L = np.sqrt((xlast-xfirst)**2+(ylast-yfirst)**2).ravel()
-        dist = np.add.reduce(([(abs(s)[i]/L[i]) for i in range(xsize)]),-1)
-        x,y,ind = self.get_label_coords(dist, XX, YY, ysize, labelwidth)
-        #print 'ind, x, y', ind, x, y
-
-        # There must be a more efficient way...
-        lc = [tuple(l) for l in linecontour]
-        dind = lc.index((x,y))
-        #print 'dind', dind
-        #dind = list(linecontour).index((x,y))
+        return self._dispersion(XX, YY), XX, YY, ysize
 
-        return x, y, dind
+    def _label_scores_all(self, linecontours, labelwidth):
+        """
+        Return what :meth:`_label_scores` returns for each of the
+        *linecontours*, computing the dispersions of the candidates on
+        all of them at once.
+        """
+        nsizes = np.array([len(lc) for lc in linecontours], np.int_)
+        if labelwidth > 1:
+            xsizes = np.ceil(nsizes / labelwidth).astype(np.int_)
+        else:
+            xsizes = np.ones_like(nsizes)
+        ysize = int(labelwidth)
+        scores = [None] * len(linecontours)
+        # a contour with a single candidate has one as long as itself
+        for i in np.nonzero(xsizes <= 1)[0]:
+            scores[i] = self._label_scores(linecontours[i], labelwidth)
+        batch = np.nonzero(xsizes > 1)[0]
+        if not len(batch):
+            return scores
+
+        # as np.resize does in _label_scores, candidate k of a contour
+        # is made of its vertices k*ysize to (k+1)*ysize-1, wrapping
+        # round to the start of the contour
+        xy = np.concatenate([linecontours[i] for i in batch])
+        n, xs = nsizes[batch], xsizes[batch]
+        offset = np.cumsum(n) - n
+        owner = np.repeat(np.arange(len(batch)), xs)
+        first = np.cumsum(xs) - xs
+        cand = np.arange(len(owner)) - first[owner]
+        vert = ((cand[:,np.newaxis] * ysize + np.arange(ysize)) %
+                n[owner][:,np.newaxis] + offset[owner][:,np.newaxis])
+        XX, YY = xy[vert, 0], xy[vert, 1]
+        dist = self._dispersion(XX, YY)
+        for k, i in enumerate(batch):
+            rows = slice(first[k], first[k] + xs[k])
+            scores[i] = dist[rows], XX[rows], YY[rows], ysize
+        return scores
+
+    def _dispersion(self, XX, YY):
+        """
+        Sum of the distances of the points in each row of *XX*, *YY*
+        from the line through the first and last of them.
+        """
+        yfirst = YY[:,:1]
+        ylast = YY[:,-1:]
+        xfirst = XX[:,:1]
+        xlast = XX[:,-1:]
+        s = (yfirst-YY) * (xlast-xfirst) - (xfirst-XX) * (ylast-yfirst)
+        L = np.sqrt((xlast-xfirst)**2+(ylast-yfirst)**2)
+        return (abs(s) / L).sum(axis=-1)
 
     def calc_label_rot_and_inline( self, slc, ind, lw, lc=None, spacing=5 ):
         """
@@ -541,29 +627,52 @@ class ContourLabeler:
         else:
             add_label = self.add_label
 
-        for icon, lev, fsize, cvalue in zip(
-            self.labelIndiceList, self.labelLevelList, self.labelFontSizeList,
+        # the widths of the labels of all levels, measured once
+        widths = [self.get_label_width(lev, self.labelFmt, fsize)
+                  for lev, fsize in zip(self.labelLevelList,
+                                        self.labelFontSizeList)]
+
+        for icon, lev, lw, cvalue in zip(
+            self.labelIndiceList, self.labelLevelList, widths,
             self.labelCValueList ):
 
             con = self.collections[icon]
-            lw = self.get_label_width(lev, self.labelFmt, fsize)
             additions = []
             paths = con.get_paths()
-            for segNum, linepath in enumerate(paths):
-                lc = linepath.vertices # Line contour
-                slc0 = trans.transform(lc) # Line contour in screen coords
+            if not len(paths):
+                continue
 
-                # For closed polygons, add extra point to avoid division by
-                # zero in print_label and locate_label.  Other than these
-                # functions, this is not necessary and should probably be
-                # eventually removed.
+            # Line contours in screen coords, transformed together
+            lcs = [linepath.vertices for linepath in paths]
+            nverts = np.cumsum([len(lc) for lc in lcs])
+            slc0s = np.split(trans.transform(np.concatenate(lcs)),
+                             nverts[:-1])
+
+            # For closed polygons, add extra point to avoid division by
+            # zero in print_label and locate_label.  Other than these
+            # functions, this is not necessary and should probably be
+            # eventually removed.
+            slcs = []
+            for lc, slc0 in zip(lcs, slc0s):
                 if mlab.is_closed_polygon( lc ):
-                    slc = np.r_[ slc0, slc0[1:2,:] ]
+                    slcs.append(np.r_[ slc0, slc0[1:2,:] ])
                 else:
-                    slc = slc0
+                    slcs.append(slc0)
+
+            # Check which are long enough for a label, and score the
+            # candidate label positions on all of those at once
+            printable = [i for i, slc in enumerate(slcs)
+                         if self.print_label(slc,lw)]
+            scores = dict(zip(printable, self._label_scores_all(
+                [slcs[i] for i in printable], lw)))
+
+            for segNum, linepath in enumerate(paths):
+                lc, slc0, slc = lcs[segNum], slc0s[segNum], slcs[segNum]
 
-                if self.print_label(slc,lw): # Check if long enough for a label
-                    x,y,ind  = self.locate_label(slc, lw)
+                if segNum in scores:
+                    dist, XX, YY, ysize = scores[segNum]
+                    x,y,ind = self.get_label_coords(dist, XX, YY, ysize, lw)
+                    ind = self._vertex_at(slc, x, y)
 
                     if inline: lcarg = lc
                     else: lcarg = None
@@ -664,6 +773,7 @@ class ContourSet(cm.ScalarMappable, ContourLabeler):
         self.extend = kwargs.get('extend', 'neither')
         self.antialiased = kwargs.get('antialiased', True)
         self.nchunk = kwargs.get('nchunk', 0)
+        self.threads = kwargs.get('threads', None)
         self.locator = kwargs.get('locator', None)
         if (isinstance(norm, colors.LogNorm)
                 or isinstance(self.locator, ticker.LogLocator)):
@@ -707,22 +817,29 @@ class ContourSet(cm.ScalarMappable, ContourLabeler):
 
         self.allsegs, self.allkinds = self._get_allsegs_and_allkinds()
 
-        if self.filled:
-            if self.linewidths is not None:
-                warnings.warn('linewidths is ignored by contourf')
-
-            # Lower and upper contour levels.
-            lowers, uppers = self._get_lowers_and_uppers()
+        if self.filled and self.linewidths is not None:
+            warnings.warn('linewidths is ignored by contourf')
+        self._zorder = kwargs.get('zorder', None)
+        self._make_collections()
+        self.changed() # set the colors
 
+    def _make_collections(self):
+        """
+        Make a collection for each level (each pair of levels for
+        filled contours) from allsegs and allkinds, and add it to the
+        axes.
+        """
+        if self.filled:
             # Ensure allkinds can be zipped below.
             if self.allkinds is None:
                 self.allkinds = [None]*len(self.allsegs)
 
-            for level, level_upper, segs, kinds in \
-                    zip(lowers, uppers, self.allsegs, self.allkinds):
+            # Default zorder taken from Collection
+            zorder = self._zorder
+            if zorder is None:
+                zorder = 1
+            for segs, kinds in zip(self.allsegs, self.allkinds):
                 paths = self._make_paths(segs, kinds)
-                # Default zorder taken from Collection
-                zorder = kwargs.get('zorder', 1)
                 col = collections.PathCollection(paths,
                                      antialiaseds = (self.antialiased,),
                                      edgecolors= 'none',
@@ -734,10 +851,12 @@ class ContourSet(cm.ScalarMappable, ContourLabeler):
             tlinewidths = self._process_linewidths()
             self.tlinewidths = tlinewidths
             tlinestyles = self._process_linestyles()
-            for level, width, lstyle, segs in \
-                    zip(self.levels, tlinewidths, tlinestyles, self.allsegs):
-                # Default zorder taken from LineCollection
-                zorder = kwargs.get('zorder', 2)
+            # Default zorder taken from LineCollection
+            zorder = self._zorder
+            if zorder is None:
+                zorder = 2
+            for width, lstyle, segs in \
+                    zip(tlinewidths, tlinestyles, self.allsegs):
                 col = collections.LineCollection(segs,
                                      linewidths = width,
                                      linestyle = lstyle,
@@ -746,7 +865,28 @@ class ContourSet(cm.ScalarMappable, ContourLabeler):
                 col.set_label('_nolegend_')
                 self.ax.add_collection(col, False)
                 self.collections.append(col)
-        self.changed() # set the colors
+
+    def _update_collections(self):
+        """
+        Give the collections the paths in allsegs and allkinds, after
+        the contours were traced again.  There must be as many levels
+        as there are collections.
+        """
+        if self.filled:
+            if self.allkinds is None:
+                self.allkinds = [None]*len(self.allsegs)
+            for col, segs, kinds in \
+                    zip(self.collections, self.allsegs, self.allkinds):
+                col.set_paths(self._make_paths(segs, kinds))
+        else:
+            tlinewidths = self._process_linewidths()
+            self.tlinewidths = tlinewidths
+            tlinestyles = self._process_linestyles()
+            for col, width, lstyle, segs in zip(self.collections,
+                    tlinewidths, tlinestyles, self.allsegs):
+                col.set_segments(segs)
+                col.set_linewidth(width)
+                col.set_linestyle(lstyle)
 
     def _process_args(self, *args, **kwargs):
         """
@@ -932,7 +1072,9 @@ class ContourSet(cm.ScalarMappable, ContourLabeler):
             self.set_norm(colors.NoNorm())
         else:
             self.cvalues = self.layers
-        if not self.norm.scaled():
+        # remember whether the limits of the norm follow the levels
+        self._scale_norm = not self.norm.scaled()
+        if self._scale_norm:
             self.set_clim(self.vmin, self.vmax)
         if self.extend in ('both', 'max', 'min'):
             self.norm.clip = False
@@ -1018,17 +1160,23 @@ class ContourSet(cm.ScalarMappable, ContourLabeler):
 
         """
 
-        # This function uses a method that is probably quite
-        # inefficient based on converting each contour segment to
-        # pixel coordinates and then comparing the given point to
-        # those coordinates for each contour.  This will probably be
-        # quite slow for complex contours, but for normal use it works
-        # sufficiently well that the time is not noticeable.
-        # Nonetheless, improvements could probably be made.
+        # The vertices of all the contours are converted to pixel
+        # coordinates and put in a grid index, which is kept until
+        # the contours or the transform change, so that only the
+        # vertices near the point are compared to it.
 
         if indices==None:
             indices = range(len(self.levels))
 
+        index = self._get_vertex_index(indices, pixel)
+        if index is not None:
+            vertex_index, xy, owner = index
+            i, d = vertex_index.nearest(x, y)
+            if i is None:
+                return (None, None, None, None, None, 1e10)
+            conmin, segmin, imin = owner[i]
+            return (conmin, segmin, imin, xy[i, 0], xy[i, 1], d)
+
         dmin = 1e10
         conmin = None
         segmin = None
@@ -1057,12 +1205,63 @@ class ContourSet(cm.ScalarMappable, ContourLabeler):
 
         return (conmin,segmin,imin,xmin,ymin,dmin)
 
+    def _get_vertex_index(self, indices, pixel):
+        """
+        Return a :class:`~matplotlib.gridindex.GridIndex` of the
+        vertices of the contours in the levels *indices*, their
+        coordinates and, for each vertex, its (level, path, vertex)
+        numbers; or None if there are fewer than
+        :data:`matplotlib.gridindex.min_items` vertices.
+        """
+        paths = [(icon, self.collections[icon].get_paths())
+                 for icon in indices]
+        if pixel:
+            trans = self.ax.transData
+            matrix = trans.get_affine().get_matrix()
+            scales = self.ax.get_xscale(), self.ax.get_yscale()
+        else:
+            trans = None
+            matrix = scales = None
+        cache = getattr(self, '_vertex_index', None)
+        if (cache is not None and cache[0] == scales and
+            len(cache[1]) == len(paths) and
+            np.all(cache[2] == matrix)):
+            for (icon, segs), (ocon, osegs) in zip(paths, cache[1]):
+                if (icon != ocon or len(segs) != len(osegs) or
+                    [s for s, o in zip(segs, osegs) if s is not o]):
+                    break
+            else:
+                return cache[3]
+
+        vertices = [path.vertices for icon, segs in paths for path in segs]
+        if sum([len(v) for v in vertices]) < gridindex.min_items:
+            index = None
+        else:
+            owner = []
+            for icon, segs in paths:
+                for segNum, path in enumerate(segs):
+                    o = np.empty((len(path.vertices), 3), np.int_)
+                    o[:, 0] = icon
+                    o[:, 1] = segNum
+                    o[:, 2] = np.arange(len(o))
+                    owner.append(o)
+            owner = np.concatenate(owner)
+            xy = np.concatenate(vertices)
+            if pixel:
+                xy = trans.transform(xy)
+            index = (gridindex.GridIndex(
+                gridindex.point_extents(xy[:, 0], xy[:, 1])), xy, owner)
+        self._vertex_index = (scales, [(icon, list(segs))
+                                       for icon, segs in paths],
+                              matrix, index)
+        return index
+
 
 class QuadContourSet(ContourSet):
     """
     Create and store a set of contour lines or filled regions.
 
-    User-callable method: clabel
+    User-callable methods: clabel, set_z
 
     Useful attributes:
       ax:
@@ -1094,6 +1293,7 @@ class QuadContourSet(ContourSet):
             C = args[0].Cntr
             if self.levels is None:
                 self.levels = args[0].levels
+            self._auto = False
             self.zmin = args[0].zmin
             self.zmax = args[0].zmax
         else:
@@ -1115,12 +1315,15 @@ class QuadContourSet(ContourSet):
         """
         Create and return allsegs and allkinds by calling underlying C code.
         """
+        threads = self._trace_threads()
         allsegs = []
         if self.filled:
             lowers, uppers = self._get_lowers_and_uppers()
             allkinds = []
-            for level, level_upper in zip(lowers, uppers):
-                nlist = self.Cntr.trace(level, level_upper, nchunk = self.nchunk)
+            nlists = self.Cntr.trace_levels(lowers, uppers,
+                                            nchunk=self.nchunk,
+                                            threads=threads)
+            for nlist in nlists:
                 nseg = len(nlist)//2
                 segs = nlist[:nseg]
                 kinds = nlist[nseg:]
@@ -1128,13 +1331,97 @@ class QuadContourSet(ContourSet):
                 allkinds.append(kinds)
         else:
             allkinds = None
-            for level in self.levels:
-                nlist = self.Cntr.trace(level)
+            nlists = self.Cntr.trace_levels(self.levels, threads=threads)
+            for nlist in nlists:
                 nseg = len(nlist)//2
                 segs = nlist[:nseg]
                 allsegs.append(segs)
         return allsegs, allkinds
 
+    def set_z(self, z, freeze_levels=False):
+        """
+        Contour new values *z* on the same grid, updating the contours
+        in place; e.g., to animate a field that changes with time::
+
+            cs = ax.contourf(x, y, z0, 20)
+            for z in frames:
+                cs.set_z(z)
+                fig.canvas.draw()
+
+        *z* must have the shape of the original *z*, and may be a
+        masked array.  The grid, and the work arrays of the contour
+        engine, are reused rather than set up again.
+
+        If the levels were chosen automatically, they are chosen again
+        for the range of the new *z*, unless *freeze_levels* is True.
+        With frozen levels (and levels that were given), the colors,
+        line widths and styles stay the same, so that a colorbar of the
+        set stays valid.
+
+        If the set was labelled by :meth:`clabel`, the labels are
+        placed again on the new contours with the same settings; labels
+        placed by hand, or labels of levels that changed, are removed.
+        """
+        z = ma.asarray(z, dtype=np.float64)
+        z, zmin, zmax = self._process_z(z)
+        _mask = ma.getmask(z)
+        if _mask is ma.nomask:
+            _mask = None
+        self.Cntr.set_z(z.filled(), _mask)
+        self.zmin, self.zmax = zmin, zmax
+
+        old_levels = self.levels
+        if self._auto and not freeze_levels:
+            # the locator chosen for the first levels is used again
+            self.levels = self._autolev(z, None)
+            if self.filled and len(self.levels) < 2:
+                raise ValueError(
+                    "Filled contours require at least 2 levels.")
+        self._process_levels()
+        relevel = (len(self.levels) != len(old_levels) or
+                   np.any(self.levels != old_levels))
+        if relevel:
+            if self.colors is not None:
+                ncolors = len(self.levels)
+                if self.filled:
+                    ncolors -= 1
+                self.cmap = colors.ListedColormap(self.colors, N=ncolors)
+            if self._scale_norm:
+                self.norm.vmin = self.norm.vmax = None
+            self._process_colors()
+
+        self.allsegs, self.allkinds = self._get_allsegs_and_allkinds()
+        if len(self.collections) == len(self.allsegs):
+            self._update_collections()
+        else:
+            for col in self.collections:
+                col.remove()
+            del self.collections[:]
+            self._make_collections()
+
+        for t in self.labelTexts:
+            t.remove()
+        del self.labelTexts[:]
+        del self.labelCValues[:]
+        if hasattr(self, 'labelXYs'):
+            del self.labelXYs[:]
+            if not self.labelManual and not relevel:
+                self.labels(self.labelInline, self.labelInlineSpacing)
+        self.changed()
+
+    def _trace_threads(self):
+        """
+        Return the number of threads the levels are traced with: the
+        *threads* kwarg, or rcParams['contour.trace_threads'] if it is
+        None; 0 means one per CPU.
+        """
+        n = self.threads
+        if n is None:
+            n = mpl.rcParams['contour.trace_threads']
+        if n > 0:
+            return n
+        return cbook.cpu_count()
+
     def _contour_args(self, args, kwargs):
         if self.filled: fn = 'contourf'
         else:           fn = 'contour'
@@ -1148,15 +1435,23 @@ class QuadContourSet(ContourSet):
             args = args[3:]
         else:
             raise TypeError("Too many arguments to %s; see help(%s)" % (fn,fn))
+        z, self.zmin, self.zmax = self._process_z(z)
+        self._contour_level_args(z, args)
+        return (x, y, z)
+
+    def _process_z(self, z):
+        """
+        Return *z* with its invalid values (and, on a log scale, the
+        values <= 0) masked, and its minimum and maximum.
+        """
         z = ma.masked_invalid(z, copy=False)
-        self.zmax = ma.maximum(z)
-        self.zmin = ma.minimum(z)
-        if self.logscale and self.zmin <= 0:
+        zmax = ma.maximum(z)
+        zmin = ma.minimum(z)
+        if self.logscale and zmin <= 0:
             z = ma.masked_where(z <= 0, z)
             warnings.warn('Log scale: values of z <= 0 have been masked')
-            self.zmin = z.min()
-        self._contour_level_args(z, args)
-        return (x, y, z)
+            zmin = z.min()
+        return z, zmin, zmax
 
     def _check_xyz(self, args, kwargs):
         '''
@@ -1357,6 +1652,13 @@ class QuadContourSet(ContourSet):
             Override axis units by specifying an instance of a
             :class:`matplotlib.units.ConversionInterface`.
 
+          *threads*: [ None | integer ]
+            The number of threads tracing the levels; 0 for one per
+            CPU.  If None, ``contour.trace_threads`` in ``matplotlibrc``
+            is used.  The contours are the same whatever the number of
+            threads; with many levels on a large grid, more threads
+            trace them faster.
+
 
         contour-only keyword arguments:
 
@@ -42,7 +42,7 @@ License   : matplotlib license (PSF compatible)
             see license/LICENSE_TTFQUERY.
 """
 
-import os, sys, glob, subprocess, warnings
+import os, sys, glob, subprocess, warnings, atexit
 try:
     set
 except NameError:
@@ -356,6 +356,36 @@ def findSystemFonts(fontpaths=None, fontext='ttf'):
 
     return [fname for fname in fontfiles.keys() if os.path.exists(fname)]
 
+def font_dir_mtimes(fontpaths):
+    """
+    Return a sorted list of (directory, mtime) pairs for the font
+    directories in *fontpaths*, the standard system font directories,
+    and all their subdirectories.  Adding or removing a font changes
+    the mtime of the directory holding it, so this serves as a cheap
+    signature of the set of installed fonts.
+    """
+    dirs = list(fontpaths)
+    if sys.platform == 'win32':
+        try:
+            dirs.append(win32FontDirectory())
+        except KeyError:
+            pass
+    else:
+        dirs.extend(x11FontDirectory())
+        if sys.platform == 'darwin':
+            dirs.extend(OSXFontDirectory())
+
+    mtimes = {}
+    for top in set(dirs):
+        for path, subdirs, files in os.walk(top):
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                pass
+    result = mtimes.items()
+    result.sort()
+    return result
+
 def weight_as_number(weight):
     """
     Return the weight property as a numeric value.  String values
@@ -963,6 +993,106 @@ def pickle_load(filename):
         fh.close()
     return data
 
+class FontLookupCache:
+    """
+    A :meth:`FontManager.findfont` result cache stored on disk, so
+    that the results are shared by every process using the same
+    configuration directory instead of being recomputed by each one.
+
+    The cache is tagged with a *signature* -- the font directory
+    mtimes of the :class:`FontManager` -- and is discarded when the
+    signature no longer matches.  New results are written out by
+    :meth:`flush`, which is called once *batch* results are pending
+    and at exit.  Writes merge with what other processes have stored
+    in the meantime and replace the file atomically where the
+    platform allows it.
+    """
+    def __init__(self, filename, signature, batch=32):
+        self.filename = filename
+        self.signature = signature
+        self.batch = batch
+        self._results = None
+        self._pending = {}
+
+    def _read(self):
+        try:
+            data = pickle_load(self.filename)
+        except:
+            return {}
+        if (not isinstance(data, dict) or
+            data.get('signature') != self.signature):
+            return {}
+        return data.get('results', {})
+
+    def get(self, key):
+        """
+        Return the cached result for *key*, or None.
+        """
+        if self._results is None:
+            self._results = self._read()
+        return self._results.get(key)
+
+    def set(self, key, value):
+        """
+        Store *value* for *key*; it is written to disk with the next
+        :meth:`flush`.
+        """
+        if self._results is None:
+            self._results = self._read()
+        self._results[key] = value
+        self._pending[key] = value
+        if len(self._pending) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the results stored since the last flush to disk, merged
+        with those other processes have written.
+        """
+        if not self._pending:
+            return
+        results = self._read()
+        results.update(self._results)
+        self._results = results
+        self._pending = {}
+
+        tmpname = '%s.%d' % (self.filename, os.getpid())
+        try:
+            pickle_dump({'signature': self.signature, 'results': results},
+                        tmpname)
+            try:
+                os.rename(tmpname, self.filename)
+            except OSError:
+                # win32 can not rename over an existing file
+                os.remove(self.filename)
+                os.rename(tmpname, self.filename)
+        except (IOError, OSError):
+            verbose.report('could not write font lookup cache %s' %
+                           self.filename)
+
+def get_font_search_paths():
+    """
+    Return the directories searched for fonts in addition to the
+    system font directories: the fonts shipped with matplotlib and
+    those listed in the :envvar:`TTFPATH` and :envvar:`AFMPATH`
+    environment variables.
+    """
+    paths = [os.path.join(rcParams['datapath'], 'fonts', 'ttf'),
+             os.path.join(rcParams['datapath'], 'fonts', 'afm'),
+             os.path.join(rcParams['datapath'], 'fonts', 'pdfcorefonts')]
+
+    #  Create list of font paths
+    for pathname in ['TTFPATH', 'AFMPATH']:
+        if pathname in os.environ:
+            ttfpath = os.environ[pathname]
+            if ttfpath.find(';') >= 0: #win32 style
+                paths.extend(ttfpath.split(';'))
+            elif ttfpath.find(':') >= 0: # unix style
+                paths.extend(ttfpath.split(':'))
+            else:
+                paths.append(ttfpath)
+    return paths
+
 class FontManager:
     """
     On import, the :class:`FontManager` singleton instance creates a
@@ -975,7 +1105,11 @@ class FontManager:
     # Increment this version number whenever the font cache data
     # format or behavior has changed and requires a existing font
     # cache files to be rebuilt.
-    __version__ = 7
+    __version__ = 8
+
+    # optional :class:`FontLookupCache` consulted by :meth:`findfont`;
+    # set on the module-level instance, not pickled with it
+    lookup_store = None
 
     def __init__(self, size=None, weight='normal'):
         self._version = self.__version__
@@ -983,20 +1117,8 @@ class FontManager:
         self.__default_weight = weight
         self.default_size = size
 
-        paths = [os.path.join(rcParams['datapath'], 'fonts', 'ttf'),
-                 os.path.join(rcParams['datapath'], 'fonts', 'afm'),
-                 os.path.join(rcParams['datapath'], 'fonts', 'pdfcorefonts')]
-
-        #  Create list of font paths
-        for pathname in ['TTFPATH', 'AFMPATH']:
-            if pathname in os.environ:
-                ttfpath = os.environ[pathname]
-                if ttfpath.find(';') >= 0: #win32 style
-                    paths.extend(ttfpath.split(';'))
-                elif ttfpath.find(':') >= 0: # unix style
-                    paths.extend(ttfpath.split(':'))
-                else:
-                    paths.append(ttfpath)
+        paths = get_font_search_paths()
+        self._dir_mtimes = font_dir_mtimes(paths)
 
         verbose.report('font search path %s'%(str(paths)))
         #  Load TrueType fonts and create font dictionary.
@@ -1026,6 +1148,64 @@ class FontManager:
         self.ttf_lookup_cache = {}
         self.afm_lookup_cache = {}
 
+        self.family_index = {
+            'ttf': self._build_family_index(self.ttflist),
+            'afm': self._build_family_index(self.afmlist)}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('lookup_store', None)
+        return state
+
+    def _build_family_index(self, fontlist):
+        """
+        Map each lower-cased family name to the positions of its fonts
+        in *fontlist*.
+        """
+        index = {}
+        for i, font in enumerate(fontlist):
+            index.setdefault(font.name.lower(), []).append(i)
+        return index
+
+    def _family_candidates(self, families, fontext):
+        """
+        Return, in font list order, the fonts whose family scores
+        better than a complete mismatch against *families* in
+        :meth:`score_family`.  No other font can be chosen by
+        :meth:`findfont`, so only these need to be scored.
+        """
+        names = set()
+        for family in families:
+            family = family.lower()
+            if family in font_family_aliases:
+                if family in ('sans', 'sans serif'):
+                    family = 'sans-serif'
+                names.update([x.lower() for x in rcParams['font.' + family]])
+            else:
+                names.add(family)
+
+        if fontext == 'afm':
+            fontlist = self.afmlist
+        else:
+            fontlist = self.ttflist
+        index = self.family_index[fontext]
+        positions = []
+        for name in names:
+            positions.extend(index.get(name, []))
+        positions.sort()
+        return [fontlist[i] for i in positions]
+
+    def _lookup_key(self, prop, fontext):
+        """
+        Return a string identifying the result of :meth:`findfont` for
+        *prop*, stable across processes.  The generic family lists in
+        rcParams are included since they change the outcome.
+        """
+        l = [(k, getattr(prop, "get" + k)()) for k in sorted(prop.__dict__)]
+        aliases = [(k, rcParams['font.' + k]) for k in
+                   ('serif', 'sans-serif', 'cursive', 'fantasy', 'monospace')]
+        return repr((fontext, l, aliases))
+
     def get_default_weight(self):
         """
         Return the default font weight.
@@ -1183,8 +1363,11 @@ class FontManager:
         `directory`, is specified, will only return fonts from the
         given directory (or subdirectory of that directory).
 
-        The result is cached, so subsequent lookups don't have to
-        perform the O(n) nearest neighbor search.
+        Only fonts whose family can match are scored, using a
+        precomputed family index.  The result is cached, so subsequent
+        lookups don't have to perform the nearest neighbor search; if
+        :attr:`lookup_store` is set, results are also shared with
+        other processes through it.
 
         If `fallback_to_default` is True, will fallback to the default
         font family (usually "Bitstream Vera Sans" or "Helvetica") if
@@ -1208,15 +1391,22 @@ class FontManager:
             font_cache = self.ttf_lookup_cache
             fontlist = self.ttflist
 
+        store = self.lookup_store
         if directory is None:
             cached = font_cache.get(hash(prop))
             if cached:
                 return cached
+            if store is not None:
+                key = self._lookup_key(prop, fontext)
+                cached = store.get(key)
+                if cached and os.path.exists(cached):
+                    font_cache[hash(prop)] = cached
+                    return cached
 
         best_score = 1e64
         best_font = None
 
-        for font in fontlist:
+        for font in self._family_candidates(prop.get_family(), fontext):
             if (directory is not None and
                 os.path.commonprefix([font.fname, directory]) != directory):
                 continue
@@ -1259,6 +1449,8 @@ class FontManager:
 
         if directory is None:
             font_cache[hash(prop)] = result
+            if store is not None:
+                store.set(key, result)
         return result
 
 
@@ -1318,6 +1510,7 @@ if USE_FONTCONFIG and sys.platform != 'win32':
 
 else:
     _fmcache = os.path.join(get_configdir(), 'fontList.cache')
+    _lookupcache = os.path.join(get_configdir(), 'fontLookup.cache')
 
     fontManager = None
 
@@ -1332,12 +1525,21 @@ else:
         if (not hasattr(fontManager, '_version') or
             fontManager._version != FontManager.__version__):
             _rebuild()
+        elif (fontManager._dir_mtimes !=
+              font_dir_mtimes(get_font_search_paths())):
+            verbose.report("font directories changed; rebuilding %s" %
+                           _fmcache)
+            _rebuild()
         else:
             fontManager.default_size = None
             verbose.report("Using fontManager instance from %s" % _fmcache)
     except:
         _rebuild()
 
+    fontManager.lookup_store = FontLookupCache(
+        _lookupcache, (FontManager.__version__, fontManager._dir_mtimes))
+    atexit.register(fontManager.lookup_store.flush)
+
     def findfont(prop, **kw):
         global fontManager
         font = fontManager.findfont(prop, **kw)
@@ -20,8 +20,6 @@ information.
 # when the traits-based config framework is not used.
 
 import re
-from matplotlib.pyparsing import Literal, ZeroOrMore, \
-    Optional, Regex, StringEnd, ParseException, Suppress
 
 family_punc = r'\\\-:,'
 family_unescape = re.compile(r'\\([%s])' % family_punc).sub
@@ -67,6 +65,10 @@ class FontconfigPatternParser:
         }
 
     def __init__(self):
+        # pyparsing is only loaded when a pattern is first parsed
+        from matplotlib.pyparsing import Literal, ZeroOrMore, \
+            Optional, Regex, StringEnd, ParseException, Suppress
+
         family      = Regex(r'([^%s]|(\\[%s]))*' %
                             (family_punc, family_punc)) \
                       .setParseAction(self._family)
@@ -160,7 +162,17 @@ class FontconfigPatternParser:
             self._properties.setdefault(key, []).extend(val)
         return []
 
-parse_fontconfig_pattern = FontconfigPatternParser().parse
+_parser = None
+
+def parse_fontconfig_pattern(pattern):
+    """
+    Parse the fontconfig *pattern* with a shared
+    :class:`FontconfigPatternParser`, made on the first call.
+    """
+    global _parser
+    if _parser is None:
+        _parser = FontconfigPatternParser()
+    return _parser.parse(pattern)
 
 def generate_fontconfig_pattern(d):
     """
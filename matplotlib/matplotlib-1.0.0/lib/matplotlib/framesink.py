@@ -0,0 +1,333 @@
+"""
+Write the frames of an animated figure to a video encoder or to a
+sequence of image files, without going through a file per frame.
+
+A :class:`FrameWriter` is usually made with
+:meth:`~matplotlib.backends.backend_agg.FigureCanvasAgg.frame_writer`.
+Each call to :meth:`FrameWriter.grab_frame` renders the figure and
+hands the raw RGBA pixels to a :class:`FrameSink`::
+
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    line, = ax.plot(x, np.sin(x))
+
+    writer = canvas.frame_writer('sine.mp4', artists=[line], fps=30)
+    for phase in np.linspace(0, 2*np.pi, 100):
+        line.set_ydata(np.sin(x + phase))
+        writer.grab_frame()
+    writer.close()
+
+Only the *artists* passed to the writer are redrawn between frames:
+they are marked animated, the rest of the figure is drawn once and
+saved with :meth:`~matplotlib.backends.backend_agg.RendererAgg.copy_from_bbox`,
+and every frame starts by restoring that background.  If anything else
+in the figure changes, call :meth:`FrameWriter.invalidate` to have it
+drawn again.  As with blitting in the GUI backends, the animated
+artists have to be in an :class:`~matplotlib.axes.Axes`, which is what
+leaves them out of the background.
+
+Frames are double buffered: the pixels are copied into one of two
+buffers and written out by a background thread while the next frame
+is drawn.
+"""
+
+import subprocess
+import tempfile
+import threading
+import Queue
+import sys
+
+import numpy as np
+
+from matplotlib import verbose
+from matplotlib import _png
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+
+class FrameSink(object):
+    """
+    Base class of the destinations of the frames of a
+    :class:`FrameWriter`.
+
+    :meth:`open` is called with the frame size before the first frame,
+    :meth:`write` with each frame, as a height x width x 4 uint8 RGBA
+    array, and :meth:`close` after the last one.  The array passed to
+    :meth:`write` is reused for later frames, so a sink that keeps
+    frames has to copy them.
+    """
+    def __init__(self, fps=25):
+        self.fps = fps
+        self.width = self.height = None
+
+    def open(self, width, height):
+        self.width, self.height = width, height
+
+    def write(self, frame):
+        raise NotImplementedError('Derived must override')
+
+    def close(self):
+        pass
+
+
+class ImageSequenceSink(FrameSink):
+    """
+    Write each frame to a PNG file named by ``pattern % frame_number``,
+    e.g., 'frame%05d.png'.
+    """
+    def __init__(self, pattern, fps=25, dpi=None, start=0):
+        FrameSink.__init__(self, fps)
+        self.pattern = pattern
+        self.dpi = dpi
+        self.count = start
+
+    def write(self, frame):
+        fh = file(self.pattern % self.count, 'wb')
+        args = (frame, self.width, self.height, fh)
+        if self.dpi is not None:
+            args += (self.dpi,)
+        try:
+            _png.write_png(*args)
+        finally:
+            fh.close()
+        self.count += 1
+
+
+class EncoderSink(FrameSink):
+    """
+    Pipe the raw RGBA frames into the standard input of a video
+    encoder; by default ffmpeg, writing *filename*.
+
+    *codec* and *bitrate* (in kbit/s) are passed to ffmpeg if given,
+    and *extra_args* is a list of further arguments put before the
+    output filename.  To use another encoder, override
+    :meth:`get_command`.
+    """
+    def __init__(self, filename, fps=25, codec=None, bitrate=None,
+                 extra_args=None, executable='ffmpeg'):
+        FrameSink.__init__(self, fps)
+        self.filename = filename
+        self.codec = codec
+        self.bitrate = bitrate
+        self.extra_args = extra_args or []
+        self.executable = executable
+        self._proc = None
+        self._error = None
+
+    def get_command(self):
+        """
+        Return the encoder command line as a list of arguments.
+        """
+        cmd = [self.executable, '-y',
+               '-f', 'rawvideo', '-pix_fmt', 'rgba',
+               '-s', '%dx%d' % (self.width, self.height),
+               '-r', str(self.fps), '-i', '-']
+        if self.codec is not None:
+            cmd += ['-vcodec', self.codec]
+        if self.bitrate is not None:
+            cmd += ['-b', '%dk' % self.bitrate]
+        return cmd + list(self.extra_args) + [self.filename]
+
+    def open(self, width, height):
+        FrameSink.open(self, width, height)
+        cmd = self.get_command()
+        verbose.report('EncoderSink: %s' % ' '.join(cmd), 'helpful')
+        # the encoder's chatter goes to a file, so that a full stderr
+        # pipe can never block it
+        self._log = tempfile.TemporaryFile()
+        try:
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                          stdout=self._log,
+                                          stderr=self._log)
+        except OSError, msg:
+            raise RuntimeError('could not run the encoder %r: %s' %
+                               (self.executable, msg))
+
+    def write(self, frame):
+        if self._error is not None:
+            raise RuntimeError(self._error)
+        try:
+            self._proc.stdin.write(np.ascontiguousarray(frame).data)
+        except IOError:
+            self._fail()
+
+    def close(self):
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+        except IOError:
+            pass
+        if self._proc.wait() != 0:
+            self._fail()
+        self._log.close()
+        self._proc = None
+
+    def _fail(self):
+        # a failed encoder is done with: later writes raise the same
+        # error and close does nothing, so the encoder's output is
+        # what gets reported
+        proc, self._proc = self._proc, None
+        try:
+            proc.stdin.close()
+        except IOError:
+            pass
+        proc.wait()
+        self._log.seek(0)
+        output = self._log.read()
+        self._log.close()
+        self._error = ('%s exited with status %d:\n%s' %
+                       (self.executable, proc.returncode, output))
+        raise RuntimeError(self._error)
+
+
+def make_sink(target, fps=25, **kwargs):
+    """
+    Return *target* if it is a :class:`FrameSink`.  Otherwise *target*
+    is a filename: a pattern with a '%' makes an
+    :class:`ImageSequenceSink`, anything else an :class:`EncoderSink`.
+    """
+    if isinstance(target, FrameSink):
+        return target
+    if '%' in target:
+        return ImageSequenceSink(target, fps=fps, **kwargs)
+    return EncoderSink(target, fps=fps, **kwargs)
+
+
+class FrameWriter(object):
+    """
+    Render frames of the figure of an Agg canvas into a
+    :class:`FrameSink`.
+
+    *artists* are the artists that change from frame to frame; only
+    they are redrawn for each frame.  If empty, every frame is a full
+    draw of the figure.
+
+    If *buffered* is True, frames are written by a background thread
+    while the next one is drawn; otherwise :meth:`grab_frame` writes
+    the renderer's buffer directly and returns when the sink is done.
+    """
+    def __init__(self, canvas, sink, artists=(), buffered=True):
+        self.canvas = canvas
+        self.sink = sink
+        self.artists = list(artists)
+        self.buffered = buffered
+
+        self._animated = [a.get_animated() for a in self.artists]
+        for a in self.artists:
+            a.set_animated(True)
+        self._background = None
+        self._renderer = None
+        self._size = None
+        self._thread = None
+        self._error = None
+        self.frames = 0
+
+    def invalidate(self):
+        """
+        Draw the whole figure again for the next frame, e.g., after
+        changing artists that are not animated.
+        """
+        self._background = None
+
+    def _draw(self):
+        canvas = self.canvas
+        renderer = canvas.get_renderer()
+        if self._background is None or renderer is not self._renderer:
+            FigureCanvasAgg.draw(canvas)
+            renderer = canvas.renderer
+            if self.artists:
+                self._background = renderer.copy_from_bbox(
+                    canvas.figure.bbox)
+            self._renderer = renderer
+        else:
+            renderer.restore_region(self._background)
+
+        dsu = [(a.get_zorder(), a) for a in self.artists]
+        dsu.sort()
+        for zorder, a in dsu:
+            a.draw(renderer)
+        return renderer
+
+    def grab_frame(self):
+        """
+        Render the current state of the figure and write it to the
+        sink.
+        """
+        self._check_error()
+        renderer = self._draw()
+        # the frame is copied or written out before the renderer can
+        # be drawn into again, so it need not keep it out of the pool
+        frame = renderer._buffer_array()
+
+        size = frame.shape[1], frame.shape[0]
+        if self._size is None:
+            self._size = size
+            self.sink.open(*size)
+            if self.buffered:
+                self._start(frame)
+        elif size != self._size:
+            raise ValueError('frame size changed from %dx%d to %dx%d' %
+                             (self._size + size))
+
+        if self.buffered:
+            buf = self._free.get()
+            self._check_error()
+            buf[...] = frame
+            self._ready.put(buf)
+        else:
+            self.sink.write(frame)
+        self.frames += 1
+
+    def _start(self, frame):
+        self._free = Queue.Queue()
+        self._ready = Queue.Queue()
+        for i in range(2):
+            self._free.put(np.empty_like(frame))
+        self._thread = threading.Thread(target=self._run)
+        self._thread.setDaemon(True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            buf = self._ready.get()
+            if buf is None:
+                break
+            if self._error is None:
+                try:
+                    self.sink.write(buf)
+                except:
+                    self._error = sys.exc_info()
+            self._free.put(buf)
+
+    def _check_error(self):
+        if self._error is not None:
+            exc_type, value, tb = self._error
+            self._error = None
+            raise exc_type, value, tb
+
+    def close(self):
+        """
+        Wait for the pending frames to be written and close the sink.
+        The artists get back their animated state.
+        """
+        for a, animated in zip(self.artists, self._animated):
+            a.set_animated(animated)
+        if self._thread is not None:
+            self._ready.put(None)
+            self._thread.join()
+            self._thread = None
+        try:
+            self._check_error()
+        finally:
+            if self._size is not None:
+                self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
@@ -0,0 +1,229 @@
+"""
+A uniform grid index over axis aligned bounding boxes, used to speed
+up hit testing of artists with many parts (the points and segments of
+a :class:`~matplotlib.lines.Line2D`, the items of a
+:class:`~matplotlib.collections.Collection`, the vertices of a
+:class:`~matplotlib.contour.ContourSet`).
+
+The index is built once for a set of boxes in display space and then
+answers "which boxes may overlap this rectangle" by looking only at
+the grid cells the rectangle covers, instead of testing every box::
+
+    index = GridIndex(extents)      # extents is N x 4: x0, y0, x1, y1
+    ind = index.query(x - r, y - r, x + r, y + r)
+
+The owners of an index are responsible for rebuilding it when the
+boxes move, e.g., when the transform to display space changes.
+
+:class:`PointGrid` is a simpler grid of points that can be added to
+after it is made.
+"""
+
+from __future__ import division
+
+import numpy as np
+
+#: artists with fewer parts than this are hit tested without an index
+min_items = 1000
+
+
+class GridIndex(object):
+    """
+    An index of N boxes on a uniform grid.
+
+    *extents* is an N x 4 array of ``x0, y0, x1, y1`` (with x0 <= x1
+    and y0 <= y1); for points, x1 == x0 and y1 == y0.  Boxes with
+    non-finite extents are never returned by a query.
+
+    *cellsize* is the side of the grid cells; by default it is chosen
+    so that there are about *per_cell* boxes in each cell, but no
+    smaller than the typical box.
+    """
+    def __init__(self, extents, cellsize=None, per_cell=4):
+        extents = np.asarray(extents, np.float_).reshape((-1, 4))
+        self.extents = extents
+        self.n = len(extents)
+
+        finite = np.isfinite(extents).all(axis=1)
+        items = np.nonzero(finite)[0]
+        ext = extents[items]
+        if not len(ext):
+            self.x0 = self.y0 = 0.0
+            self.cellsize = 1.0
+            self.nx = self.ny = 1
+            self.big = items
+            self._set_cells(items, np.zeros(0, np.int_))
+            return
+
+        self.x0, self.y0 = ext[:, 0].min(), ext[:, 1].min()
+        width = ext[:, 2].max() - self.x0
+        height = ext[:, 3].max() - self.y0
+        if cellsize is None:
+            size = np.maximum(ext[:, 2] - ext[:, 0], ext[:, 3] - ext[:, 1])
+            cellsize = max(np.sqrt(width * height * per_cell / len(ext)),
+                           np.median(size))
+        cellsize = max(cellsize, max(width, height) / 1024.0, 1e-12)
+        self.cellsize = cellsize
+        self.nx = int(width // cellsize) + 1
+        self.ny = int(height // cellsize) + 1
+
+        cx0, cy0 = self._cell(ext[:, 0], ext[:, 1])
+        cx1, cy1 = self._cell(ext[:, 2], ext[:, 3])
+        ncells = (cx1 - cx0 + 1) * (cy1 - cy0 + 1)
+
+        # boxes covering many cells would swamp the grid; they are
+        # kept on a list that every query tests
+        big = ncells > max(16, 4 * ncells.mean())
+        self.big = items[big]
+        small = ~big
+        items, ncells = items[small], ncells[small]
+        cx0, cy0, cx1 = cx0[small], cy0[small], cx1[small]
+
+        # one entry per (box, cell) pair
+        owner = np.repeat(np.arange(len(items)), ncells)
+        first = np.cumsum(ncells) - ncells
+        k = np.arange(len(owner)) - first[owner]
+        ncols = (cx1 - cx0 + 1)[owner]
+        cell = (cy0[owner] + k // ncols) * self.nx + cx0[owner] + k % ncols
+        self._set_cells(items[owner], cell)
+
+    def _set_cells(self, items, cell):
+        order = np.argsort(cell, kind='mergesort')
+        self._items = items[order]
+        self._start = np.searchsorted(cell[order],
+                                      np.arange(self.nx * self.ny + 1))
+
+    def _cell(self, x, y):
+        cx = np.floor((np.asarray(x) - self.x0) / self.cellsize)
+        cy = np.floor((np.asarray(y) - self.y0) / self.cellsize)
+        cx = np.clip(cx, 0, self.nx - 1).astype(np.int_)
+        cy = np.clip(cy, 0, self.ny - 1).astype(np.int_)
+        return cx, cy
+
+    def query(self, x0, y0, x1, y1):
+        """
+        Return the sorted indices of the boxes that overlap the
+        rectangle *x0*, *y0*, *x1*, *y1*.
+        """
+        (cx0, cx1), (cy0, cy1) = self._cell([x0, x1], [y0, y1])
+        # the cells of a row of the grid are contiguous in _items
+        found = [self.big]
+        for cy in xrange(cy0, cy1 + 1):
+            row = cy * self.nx
+            found.append(self._items[self._start[row + cx0]:
+                                     self._start[row + cx1 + 1]])
+        ind = np.unique(np.concatenate(found))
+        ext = self.extents[ind]
+        hit = ((ext[:, 0] <= x1) & (ext[:, 2] >= x0) &
+               (ext[:, 1] <= y1) & (ext[:, 3] >= y0))
+        return ind[hit]
+
+    def nearest(self, x, y):
+        """
+        Return the index of the box nearest to the point *x*, *y*,
+        and the squared distance to it, or (None, None) if the index
+        is empty.  Distances are measured to the box, so for boxes
+        that are points this is the nearest point.
+        """
+        if not len(self._items) and not len(self.big):
+            return None, None
+        # grow a square around the point until it holds a box; the
+        # nearest box is then within the distance to that box
+        r = self.cellsize
+        ind = self.query(x - r, y - r, x + r, y + r)
+        while not len(ind):
+            r *= 2
+            ind = self.query(x - r, y - r, x + r, y + r)
+        d = self._distance_sq(ind, x, y)
+        best = ind[d.argmin()]
+        r = np.sqrt(d.min())
+        ind = np.union1d(self.query(x - r, y - r, x + r, y + r), [best])
+        d = self._distance_sq(ind, x, y)
+        i = d.argmin()
+        return ind[i], d[i]
+
+    def _distance_sq(self, ind, x, y):
+        ext = self.extents[ind]
+        dx = np.maximum(np.maximum(ext[:, 0] - x, x - ext[:, 2]), 0)
+        dy = np.maximum(np.maximum(ext[:, 1] - y, y - ext[:, 3]), 0)
+        return dx * dx + dy * dy
+
+
+class PointGrid(object):
+    """
+    A grid of points that grows as points are added one at a time,
+    e.g., the positions of contour labels as they are placed; a
+    :class:`GridIndex` would have to be built again for each.
+
+    *cellsize* is the side of the grid cells; queries of any size
+    work, but are fastest for rectangles of about that size.
+    """
+    def __init__(self, cellsize):
+        self.cellsize = max(float(cellsize), 1e-12)
+        self.n = 0
+        self._cells = {}
+
+    def add(self, x, y):
+        """
+        Add the point *x*, *y*.  Points with non-finite coordinates
+        are counted but never returned by a query.
+        """
+        self.n += 1
+        if not (np.isfinite(x) and np.isfinite(y)):
+            return
+        s = self.cellsize
+        key = int(np.floor(x / s)), int(np.floor(y / s))
+        self._cells.setdefault(key, []).append((x, y))
+
+    def extend(self, xys):
+        """
+        Add each point of the sequence *xys* of (x, y) pairs.
+        """
+        for x, y in xys:
+            self.add(x, y)
+
+    def query(self, x0, y0, x1, y1):
+        """
+        Return an M x 2 array of the points in the rectangle *x0*,
+        *y0*, *x1*, *y1*.
+        """
+        s = self.cellsize
+        cx0, cx1 = int(np.floor(x0 / s)), int(np.floor(x1 / s))
+        cy0, cy1 = int(np.floor(y0 / s)), int(np.floor(y1 / s))
+        found = []
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self._cells):
+            # a big rectangle: visit the occupied cells instead
+            for (cx, cy), points in self._cells.iteritems():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.extend(points)
+        else:
+            for cx in xrange(cx0, cx1 + 1):
+                for cy in xrange(cy0, cy1 + 1):
+                    found.extend(self._cells.get((cx, cy), ()))
+        xy = np.array(found, np.float_).reshape((-1, 2))
+        inside = ((xy[:, 0] >= x0) & (xy[:, 0] <= x1) &
+                  (xy[:, 1] >= y0) & (xy[:, 1] <= y1))
+        return xy[inside]
+
+
+def point_extents(x, y, radius=0):
+    """
+    Return the N x 4 extents of squares of half side *radius* (a
+    scalar or array) around the points *x*, *y*.
+    """
+    x = np.asarray(x, np.float_)
+    y = np.asarray(y, np.float_)
+    return np.column_stack((x - radius, y - radius, x + radius, y + radius))
+
+
+def segment_extents(x, y):
+    """
+    Return the N-1 x 4 extents of the segments of the polyline with
+    vertices *x*, *y*.
+    """
+    x = np.asarray(x, np.float_)
+    y = np.asarray(y, np.float_)
+    x0, x1 = x[:-1], x[1:]
+    y0, y1 = y[:-1], y[1:]
+    return np.column_stack((np.minimum(x0, x1), np.minimum(y0, y1),
+                            np.maximum(x0, x1), np.maximum(y0, y1)))
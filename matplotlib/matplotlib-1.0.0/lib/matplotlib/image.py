@@ -27,6 +27,16 @@ from matplotlib._image import *
 from matplotlib.transforms import BboxBase, Bbox
 import matplotlib.transforms as mtransforms
 
+def _resize_threads():
+    """
+    Return the number of threads images are resized with, from
+    rcParams['image.resize_threads']; 0 means one per CPU.
+    """
+    n = rcParams['image.resize_threads']
+    if n > 0:
+        return n
+    return cbook.cpu_count()
+
 class _AxesImageBase(martist.Artist, cm.ScalarMappable):
     zorder = 0
     # map interpolation strings to module constants
@@ -96,6 +106,7 @@ class _AxesImageBase(martist.Artist, cm.ScalarMappable):
         self.axes = ax
 
         self._imcache = None
+        self._rgbakey = None
 
         # this is an expetimental attribute, if True, unsampled image
         # will be drawn using the affine transform that are
@@ -134,6 +145,50 @@ class _AxesImageBase(martist.Artist, cm.ScalarMappable):
     def make_image(self, magnification=1.0):
         raise RuntimeError('The make_image method must be overridden.')
 
+    def _rgba_key(self):
+        'the state besides the data and cmap that the colors depend on'
+        return (self._alpha, self.norm.vmin, self.norm.vmax,
+                getattr(self.norm, 'clip', None))
+
+    def _rgba_stale(self):
+        """
+        Return True if the norm limits or alpha changed since the
+        colors of the image were last computed.
+        """
+        if self._A.dtype == np.uint8 and self._A.ndim == 3:
+            return False
+        return self._rgbakey != self._rgba_key()
+
+    def _get_rgba(self, yslice=slice(None), xslice=slice(None)):
+        """
+        Return the rgba bytes of ``A[yslice, xslice]`` for the image
+        array A.
+
+        The colors of the whole array are kept, so that the draws after
+        a pan or a zoom only slice and resample them.  They are computed
+        again when :meth:`changed` is called, which happens when the
+        data, cmap or norm are set, and when the norm limits or alpha
+        change.  Arrays whose colors would take more than
+        rcParams['image.rgba_cache.memory'] megabytes are colormapped a
+        slice at a time instead.
+        """
+        if self._rgbacache is not None and not self._rgba_stale():
+            return self._rgbacache[yslice, xslice]
+        self._rgbacache = None
+        numrows, numcols = self._A.shape[:2]
+        budget = rcParams['image.rgba_cache.memory'] * 1024 * 1024
+        if 4 * numrows * numcols > budget:
+            # scale the norm to the whole array, not to the slice
+            if self._A.ndim == 2 and not self.norm.scaled():
+                self.norm.autoscale_None(self._A)
+            x = self.to_rgba(self._A[yslice, xslice], self._alpha,
+                             bytes=True)
+        else:
+            self._rgbacache = self.to_rgba(self._A, self._alpha, bytes=True)
+            x = self._rgbacache[yslice, xslice]
+        self._rgbakey = self._rgba_key()
+        return x
+
 
     def _get_unsampled_image(self, A, image_extents, viewlim):
         """
@@ -181,7 +236,8 @@ class _AxesImageBase(martist.Artist, cm.ScalarMappable):
         else:
             yslice = slice(0, numrows)
 
-        if xslice != self._oldxslice or yslice != self._oldyslice:
+        if (xslice != self._oldxslice or yslice != self._oldyslice or
+            self._rgba_stale()):
             self._imcache = None
             self._oldxslice = xslice
             self._oldyslice = yslice
@@ -191,12 +247,7 @@ class _AxesImageBase(martist.Artist, cm.ScalarMappable):
                 im = _image.frombyte(self._A[yslice,xslice,:], 0)
                 im.is_grayscale = False
             else:
-                if self._rgbacache is None:
-                    x = self.to_rgba(self._A, self._alpha)
-                    self._rgbacache = x
-                else:
-                    x = self._rgbacache
-                im = _image.fromarray(x[yslice,xslice], 0)
+                im = _image.frombyte(self._get_rgba(yslice, xslice), 0)
                 if len(self._A.shape) == 2:
                     im.is_grayscale = self.cmap.is_gray()
                 else:
@@ -310,9 +361,9 @@ class _AxesImageBase(martist.Artist, cm.ScalarMappable):
         im.reset_matrix()
         numrows, numcols = im.get_size()
 
-        im.resize(numcols, numrows) # just to create im.bufOut that
-                                    # is required by backends. There
-                                    # may be better solution -JJL
+        # just to create im.bufOut that is required by backends. There
+        # may be better solution -JJL
+        im.resize(numcols, numrows, threads=_resize_threads())
 
         im._url = self.get_url()
 
@@ -410,6 +461,7 @@ class _AxesImageBase(martist.Artist, cm.ScalarMappable):
 
         self._imcache =None
         self._rgbacache = None
+        self._rgbakey = None
         self._oldxslice = None
         self._oldyslice = None
 
@@ -589,7 +641,8 @@ class AxesImage(_AxesImageBase):
         ry = heightDisplay  / numrows
         im.apply_scaling(rx*sx, ry*sy)
         im.resize(int(widthDisplay+0.5), int(heightDisplay+0.5),
-                  norm=self._filternorm, radius=self._filterrad)
+                  norm=self._filternorm, radius=self._filterrad,
+                  threads=_resize_threads())
         return im
 
 
@@ -755,6 +808,393 @@ class NonUniformImage(AxesImage):
             raise RuntimeError('Cannot change colors after loading data')
         cm.ScalarMappable.set_cmap(self, cmap)
 
+class ColumnRingImage(AxesImage):
+    """
+    An image of the last *ncols* columns of *nrows* values added with
+    :meth:`append_columns`, e.g., the columns of a
+    :class:`~matplotlib.mlab.SpectrogramStream`.
+
+    Each column is mapped to colors once, when it is appended, and kept
+    as RGBA bytes in a ring buffer, so an update costs the colormapping
+    of the new columns only.  Changing the cmap or norm later affects
+    only the columns appended after the change.  The norm should have
+    its limits set, or it is autoscaled to the first columns.
+
+    If *scroll* is True, the newest column is on the right and the
+    image moves left as columns are appended.  Otherwise the columns
+    are written in place, sweeping from left to right and wrapping
+    around, and a redraw changes only the area of the new columns,
+    which :meth:`get_update_bbox` returns for blitting::
+
+        im = ColumnRingImage(ax, len(stream.freqs), 600, scroll=False,
+                             norm=Normalize(-120, 0), extent=extent,
+                             animated=True)
+        ax.add_image(im)
+        ...
+        Pxx, t = stream.add(block)
+        im.append_columns(10*np.log10(Pxx))
+        ax.draw_artist(im)
+        canvas.blit(im.get_update_bbox())
+
+    Other arguments are as for :class:`AxesImage`.
+    """
+    def __init__(self, ax, nrows, ncols, scroll=True, **kwargs):
+        AxesImage.__init__(self, ax, **kwargs)
+        self.scroll = scroll
+        self._ring = np.zeros((nrows, ncols, 4), np.uint8)
+        self._next = 0
+        # the columns appended since the last draw, and those drawn
+        # by it, as (first, count)
+        self._appended = (0, 0)
+        self._drawn = (0, 0)
+        self.set_data(self._ring)
+
+    def append_columns(self, C):
+        """
+        Append the columns of the *nrows* x k array *C*, or a single
+        column if *C* is 1-D.
+        """
+        C = np.asarray(C)
+        if C.ndim == 1:
+            C = C[:, np.newaxis]
+        nrows, ncols = self._ring.shape[:2]
+        if C.ndim != 2 or C.shape[0] != nrows:
+            raise ValueError('columns must have %d rows' % nrows)
+        C = C[:, -ncols:]
+        k = C.shape[1]
+        if not k:
+            return
+
+        cols = (self._next + np.arange(k)) % ncols
+        self._ring[:, cols] = self.to_rgba(C, self._alpha, bytes=True)
+        first, count = self._appended
+        if not count:
+            first = self._next
+        self._appended = first, min(count + k, ncols)
+        self._next = (self._next + k) % ncols
+
+        if self.scroll:
+            self._A = np.concatenate((self._ring[:, self._next:],
+                                      self._ring[:, :self._next]), axis=1)
+        else:
+            self._A = self._ring
+        self._imcache = None
+
+    def draw(self, renderer, *args, **kwargs):
+        AxesImage.draw(self, renderer, *args, **kwargs)
+        self._drawn = self._appended
+        self._appended = (0, 0)
+
+    def get_update_bbox(self):
+        """
+        Return the display space :class:`~matplotlib.transforms.Bbox`
+        of the area changed by the columns the last draw added: the
+        whole image when scrolling or if the new columns wrap around,
+        else the new columns and one column on either side.
+        """
+        ncols = self._ring.shape[1]
+        first, count = self._drawn
+        x0, x1, y0, y1 = self.get_extent()
+        if not self.scroll and first + count < ncols:
+            width = (x1 - x0) / ncols
+            x0, x1 = (x0 + max(first - 1, 0) * width,
+                      x0 + min(first + count + 1, ncols) * width)
+        xy = self.get_transform().transform([(x0, y0), (x1, y1)])
+        l, b, r, t = self.axes.bbox.extents
+        return Bbox.from_extents(
+            max(np.floor(xy[:, 0].min()), l), max(np.floor(xy[:, 1].min()), b),
+            min(np.ceil(xy[:, 0].max()), r), min(np.ceil(xy[:, 1].max()), t))
+
+def _downsample(A):
+    """
+    Return the means of the 2 x 2 blocks of rows and columns of *A*,
+    ignoring nan and masked values, as floats; blocks without any
+    valid value are nan.  An odd last row or column makes blocks of its
+    own.
+    """
+    A = ma.asarray(A)
+    if A.dtype.char not in np.typecodes['Float']:
+        A = A.astype(np.float32)
+    A = A.filled(np.nan)
+    if A.shape[0] % 2:
+        A = np.concatenate((A, A[-1:]), 0)
+    if A.shape[1] % 2:
+        A = np.concatenate((A, A[:, -1:]), 1)
+    A = A.reshape((A.shape[0]//2, 2, A.shape[1]//2, 2) + A.shape[2:])
+    valid = ~np.isnan(A)
+    count = valid.sum(axis=3).sum(axis=1)
+    total = np.where(valid, A, 0).sum(axis=3).sum(axis=1)
+    mean = total / np.maximum(count, 1)
+    mean[count == 0] = np.nan
+    return mean
+
+def _strips(A):
+    'yield the slices of the strips of an even number of rows of *A*'
+    step = 2 * max(1, 2**21 // max(1, A.shape[1]))
+    for i in range(0, A.shape[0], step):
+        yield slice(i, i + step)
+
+class ImagePyramid(object):
+    """
+    Downsampled copies of a large 2-D array, or RGB or RGBA array, for
+    :class:`TiledImage`.
+
+    Level 0 is the array *A* itself, e.g., a :class:`numpy.memmap`;
+    each following level halves the rows and the columns of the one
+    before by averaging 2 x 2 blocks, ignoring nan and masked values,
+    until a level fits in a *tilesize* x *tilesize* tile.  The levels
+    are built a strip of rows at a time, so *A* is never read into
+    memory as a whole.  They are float arrays, or uint8 if *A* is a
+    uint8 RGB(A) array.
+
+    If *cache* is given, level k is written to the file *cache*.k.npy
+    and memory mapped from there.  Files that already exist with the
+    right shape and dtype are used instead of being computed again;
+    they have to be deleted when the data changes.
+    """
+    def __init__(self, A, tilesize=256, cache=None):
+        if (A.ndim not in (2, 3) or
+            (A.ndim == 3 and A.shape[-1] not in (3, 4))):
+            raise TypeError("Invalid dimensions for image data")
+        if A.dtype != np.uint8 and not np.can_cast(A.dtype, np.float):
+            raise TypeError("Image data can not convert to float")
+
+        self.tilesize = tilesize
+        self.cache = cache
+        self.levels = [A]
+        self._range = None
+        if A.ndim == 3 and A.dtype == np.uint8:
+            dtype = np.dtype(np.uint8)
+        elif A.dtype.char in np.typecodes['Float']:
+            dtype = A.dtype
+        else:
+            dtype = np.dtype(np.float32)
+        while max(A.shape[:2]) > tilesize:
+            A = self._make_level(A, dtype)
+            self.levels.append(A)
+
+    def _make_level(self, A, dtype):
+        shape = ((A.shape[0] + 1)//2, (A.shape[1] + 1)//2) + A.shape[2:]
+        if self.cache is not None:
+            fname = '%s.%d.npy' % (self.cache, len(self.levels))
+            if os.path.exists(fname):
+                level = np.load(fname, mmap_mode='r')
+                if level.shape == shape and level.dtype == dtype:
+                    return level
+            level = np.lib.format.open_memmap(fname, 'w+', dtype, shape)
+        else:
+            level = np.empty(shape, dtype)
+
+        for rows in _strips(A):
+            block = _downsample(A[rows])
+            if dtype == np.uint8:
+                block = np.round(block)
+            start = rows.start//2
+            level[start:start + len(block)] = block
+
+        if self.cache is not None:
+            level.flush()
+            del level
+            level = np.load(fname, mmap_mode='r')
+        return level
+
+    def get_range(self):
+        """
+        Return the minimum and maximum of the valid values of level 0,
+        which are found by reading it a strip at a time on the first
+        call.
+        """
+        if self._range is None:
+            A = self.levels[0]
+            vmin, vmax = np.inf, -np.inf
+            for rows in _strips(A):
+                block = cbook.safe_masked_invalid(A[rows])
+                if ma.count(block):
+                    vmin = min(vmin, block.min())
+                    vmax = max(vmax, block.max())
+            self._range = vmin, vmax
+        return self._range
+
+    def get_level(self, pixels):
+        """
+        Return the index of the coarsest level that still has at least
+        one pixel per *pixels* pixels of level 0, i.e., the level for
+        showing *pixels* data pixels in one display pixel.
+        """
+        level = 0
+        while level + 1 < len(self.levels) and 2**(level + 1) <= pixels:
+            level += 1
+        return level
+
+
+def _tile_range(a0, a1, n, tilesize, pad):
+    """
+    Return the first and last + 1 index of the tiles of *tilesize* that
+    cover *a0* to *a1*, padded by *pad*, in an axis of length *n*.  The
+    range is never empty, even if *a0* to *a1* is outside 0 to *n*.
+    """
+    i0 = int(max(0, min(a0 - pad, n - 1))) // tilesize * tilesize
+    i1 = int(np.ceil((a1 + pad) / tilesize)) * tilesize
+    return i0, min(n, max(i1, i0 + 1))
+
+class TiledImage(AxesImage):
+    """
+    An :class:`AxesImage` of an array too large to colormap as a whole,
+    e.g., a memory mapped raster of tens of thousands of pixels on a
+    side.
+
+    The data is kept as an :class:`ImagePyramid`.  Each draw uses the
+    coarsest level that is still at least as fine as the display, and
+    reads and colormaps only the *tilesize* x *tilesize* tiles of it
+    that intersect the view.  Up to *max_tiles* colormapped tiles are
+    kept, so that panning and zooming back colormap only the tiles that
+    were not seen before.
+
+    *A* is an array or an :class:`ImagePyramid`; an array is made into
+    one with *tilesize* and *cache*.  A norm without limits gets those
+    of the whole array, from :meth:`ImagePyramid.get_range`, which
+    reads it once; set them to avoid that::
+
+        A = np.load('scene.npy', mmap_mode='r')
+        im = TiledImage(ax, A, cache='scene.pyramid',
+                        norm=Normalize(0, 4000))
+        ax.add_image(im)
+        im.set_extent(im.get_extent())
+
+    Other arguments are as for :class:`AxesImage`.
+    """
+    def __init__(self, ax, A, tilesize=256, cache=None, max_tiles=256,
+                 **kwargs):
+        self.tilesize = tilesize
+        self.cache = cache
+        self.max_tiles = max_tiles
+        self._tiles = cbook.maxdict(max_tiles)
+        self._window = None
+        self._magnification = 1.0
+        AxesImage.__init__(self, ax, **kwargs)
+        self.set_data(A)
+
+    def set_data(self, A):
+        """
+        Set the image array or :class:`ImagePyramid`
+
+        ACCEPTS: numpy array or ImagePyramid
+        """
+        if not isinstance(A, ImagePyramid):
+            A = ImagePyramid(A, self.tilesize, self.cache)
+        self.pyramid = A
+        self.tilesize = A.tilesize
+        self._A = A.levels[0]
+        self._clear_tiles()
+
+    def _clear_tiles(self):
+        self._tiles = cbook.maxdict(self.max_tiles)
+        self._window = None
+        self._imcache = None
+
+    def changed(self):
+        self._clear_tiles()
+        AxesImage.changed(self)
+
+    def set_alpha(self, alpha):
+        AxesImage.set_alpha(self, alpha)
+        self._clear_tiles()
+
+    def make_image(self, magnification=1.0):
+        self._magnification = magnification
+        return AxesImage.make_image(self, magnification)
+
+    def _get_tile(self, level, i, j):
+        'return the rgba bytes of the tile at row *i*, column *j* of *level*'
+        key = level, i, j
+        tile = self._tiles.get(key)
+        if tile is None:
+            T = self.tilesize
+            A = self.pyramid.levels[level][i:i + T, j:j + T]
+            tile = self.to_rgba(cbook.safe_masked_invalid(A), self._alpha,
+                                bytes=True)
+            self._tiles[key] = tile
+            self._rgbakey = self._rgba_key()
+        return tile
+
+    def _get_unsampled_image(self, A, image_extents, viewlim):
+        """
+        Return the image of the tiles of the pyramid level that matches
+        the resolution of the display and cover *viewlim*, with its
+        extents, as :meth:`_AxesImageBase._get_unsampled_image`.
+        """
+        if self._A.ndim == 2 and not self.norm.scaled():
+            self.norm.autoscale_None(np.array(self.pyramid.get_range()))
+        if self._rgba_stale():
+            self._clear_tiles()
+
+        xmin, xmax, ymin, ymax = image_extents
+        numrows, numcols = self.get_size()
+        if xmax != xmin and ymax != ymin:
+            pixels = min(abs(numcols / (xmax - xmin)),
+                         abs(numrows / (ymax - ymin)))
+            level = self.pyramid.get_level(pixels / self._magnification)
+        else:
+            level = 0
+        L = self.pyramid.levels[level]
+        nr, nc = L.shape[:2]
+
+        # the last row and column of a level may stand for fewer than
+        # 2**level pixels; extend the extents to whole level pixels
+        xmax = xmin + (xmax - xmin) * nc * 2**level / numcols
+        if self.origin == 'upper':
+            ymin = ymax - (ymax - ymin) * nr * 2**level / numrows
+        else:
+            ymax = ymin + (ymax - ymin) * nr * 2**level / numrows
+        dxintv = xmax - xmin
+        dyintv = ymax - ymin
+
+        # the window of whole tiles covering the view, in array rows
+        # and columns of the level
+        T = self.tilesize
+        c0, c1 = _tile_range((viewlim.x0 - xmin) / dxintv * nc,
+                             (viewlim.x1 - xmin) / dxintv * nc,
+                             nc, T, self._filterrad)
+        y0 = (viewlim.y0 - ymin) / dyintv * nr
+        y1 = (viewlim.y1 - ymin) / dyintv * nr
+        if self.origin == 'upper':
+            r0, r1 = _tile_range(nr - y1, nr - y0, nr, T, self._filterrad)
+            iy0 = nr - r1
+        else:
+            r0, r1 = _tile_range(y0, y1, nr, T, self._filterrad)
+            iy0 = r0
+
+        window = level, r0, r1, c0, c1
+        if window != self._window:
+            self._imcache = None
+            self._window = window
+
+        if self._imcache is None:
+            x = np.empty((r1 - r0, c1 - c0, 4), np.uint8)
+            for i in range(r0, r1, T):
+                for j in range(c0, c1, T):
+                    tile = self._get_tile(level, i, j)
+                    x[i - r0:i - r0 + T, j - c0:j - c0 + T] = \
+                        tile[:r1 - i, :c1 - j]
+            im = _image.frombyte(x, 0)
+            if L.ndim == 2:
+                im.is_grayscale = self.cmap.is_gray()
+            else:
+                im.is_grayscale = False
+            if self.origin == 'upper':
+                im.flipud_in()
+            self._imcache = im
+        else:
+            im = self._imcache
+
+        xmin = xmin + c0 * dxintv / nc
+        ymin = ymin + iy0 * dyintv / nr
+        dxintv = (c1 - c0) * dxintv / nc
+        dyintv = (r1 - r0) * dyintv / nr
+        sx = dxintv / viewlim.width
+        sy = dyintv / viewlim.height
+        return im, xmin, ymin, dxintv, dyintv, sx, sy
+
 class PcolorImage(martist.Artist, cm.ScalarMappable):
     '''
     Make a pcolor-style plot with an irregular rectangular grid.
@@ -943,7 +1383,7 @@ class FigureImage(martist.Artist, cm.ScalarMappable):
         if self._A is None:
             raise RuntimeError('You must first set the image array')
 
-        x = self.to_rgba(self._A, self._alpha)
+        x = self.to_rgba(self._A, self._alpha, bytes=True)
         self.magnification = magnification
         # if magnification is not one, we need to resize
         ismag = magnification!=1
@@ -952,7 +1392,7 @@ class FigureImage(martist.Artist, cm.ScalarMappable):
             isoutput = 0
         else:
             isoutput = 1
-        im = _image.fromarray(x, isoutput)
+        im = _image.frombyte(x, isoutput)
         fc = self.figure.get_facecolor()
         im.set_bg( *mcolors.colorConverter.to_rgba(fc, 0) )
         im.is_grayscale = (self.cmap.name == "gray" and
@@ -963,7 +1403,7 @@ class FigureImage(martist.Artist, cm.ScalarMappable):
             numrows *= magnification
             numcols *= magnification
             im.set_interpolation(_image.NEAREST)
-            im.resize(numcols, numrows)
+            im.resize(numcols, numrows, threads=_resize_threads())
         if self.origin=='upper':
             im.flipud_out()
 
@@ -1059,17 +1499,12 @@ class BboxImage(_AxesImageBase):
         if self._A is None:
             raise RuntimeError('You must first set the image array or the image attribute')
 
-        if self._imcache is None:
+        if self._imcache is None or self._rgba_stale():
             if self._A.dtype == np.uint8 and len(self._A.shape) == 3:
                 im = _image.frombyte(self._A, 0)
                 im.is_grayscale = False
             else:
-                if self._rgbacache is None:
-                    x = self.to_rgba(self._A, self._alpha)
-                    self._rgbacache = x
-                else:
-                    x = self._rgbacache
-                im = _image.fromarray(x, 0)
+                im = _image.frombyte(self._get_rgba(), 0)
                 if len(self._A.shape) == 2:
                     im.is_grayscale = self.cmap.is_gray()
                 else:
@@ -1104,7 +1539,8 @@ class BboxImage(_AxesImageBase):
         #im.resize(int(widthDisplay+0.5), int(heightDisplay+0.5),
         #          norm=self._filternorm, radius=self._filterrad)
         im.resize(int(widthDisplay), int(heightDisplay),
-                  norm=self._filternorm, radius=self._filterrad)
+                  norm=self._filternorm, radius=self._filterrad,
+                  threads=_resize_threads())
         return im
 
 
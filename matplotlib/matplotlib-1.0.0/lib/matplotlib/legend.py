@@ -34,10 +34,185 @@ from matplotlib.patches import Patch, Rectangle, Shadow, FancyBboxPatch
 from matplotlib.collections import LineCollection, RegularPolyCollection, \
      CircleCollection
 from matplotlib.transforms import Bbox, BboxBase, TransformedBbox, BboxTransformTo, BboxTransformFrom
+from matplotlib.path import Path
+import matplotlib.gridindex as gridindex
 
 from matplotlib.offsetbox import HPacker, VPacker, TextArea, DrawingArea, DraggableOffsetBox
 
 
+def _segments_intersect_bbox(p, q, bbox):
+    """
+    Return True if any of the segments from the points *p* to the
+    points *q* (both Nx2) meets *bbox*.
+    """
+    if not len(p):
+        return False
+    x0, y0, x1, y1 = bbox.extents
+    px, py, qx, qy = p[:, 0], p[:, 1], q[:, 0], q[:, 1]
+    near = ((np.minimum(px, qx) <= x1) & (np.maximum(px, qx) >= x0) &
+            (np.minimum(py, qy) <= y1) & (np.maximum(py, qy) >= y0))
+    if not near.any():
+        return False
+    px, py, qx, qy = px[near], py[near], qx[near], qy[near]
+    dx, dy = qx - px, qy - py
+    # the segment meets the box unless all four corners lie strictly
+    # on one side of it
+    side = np.array([dx * (y - py) - dy * (x - px)
+                     for x, y in ((x0, y0), (x1, y0), (x0, y1), (x1, y1))])
+    return not ((side > 0).all(axis=0) | (side < 0).all(axis=0)).all()
+
+
+class _LineOccupancy(object):
+    """
+    Stands in for the display space path of a line with many vertices
+    when the 'best' legend location is searched: it has the
+    intersects_bbox method of a :class:`~matplotlib.path.Path`, but
+    answers most queries without looking at every vertex.
+
+    The vertices are counted on a grid of *cellsize* cells over the
+    display space *region*, and a summed-area table of the counts
+    tells in constant time if a vertex lies in the cells entirely
+    inside a box.  The vertices of the cells the box only partly
+    covers are tested against the box itself, as are the segments
+    that leave a cell and those inside the partly covered cells.  A
+    box that meets none of them can only lie inside the line taken as
+    a polygon; that is tested on a decimated path in which each run
+    of vertices in one cell is replaced by its first and last vertex,
+    corrected by the runs in the cell of the box corner.
+    """
+    def __init__(self, xy, region, cellsize):
+        x0, y0 = region.x0, region.y0
+        self.x0, self.y0, self.cellsize = x0, y0, cellsize
+        self.nx = max(int(np.ceil(region.width / cellsize)), 1)
+        self.ny = max(int(np.ceil(region.height / cellsize)), 1)
+        self.xy = xy
+
+        finite = np.isfinite(xy).all(axis=1)
+        cx = np.floor((np.where(finite, xy[:, 0], x0) - x0) / cellsize)
+        cy = np.floor((np.where(finite, xy[:, 1], y0) - y0) / cellsize)
+
+        # the indices of the vertices on the grid, sorted by cell;
+        # those of cell c are _index[_start[c]:_start[c + 1]]
+        inside = (finite & (cx >= 0) & (cx < self.nx) &
+                  (cy >= 0) & (cy < self.ny))
+        cell = (cy[inside] * self.nx + cx[inside]).astype(np.int_)
+        order = np.argsort(cell, kind='mergesort')
+        self._cell = cell[order]
+        self._index = np.nonzero(inside)[0][order]
+        self._start = np.searchsorted(self._cell,
+                                      np.arange(self.nx * self.ny + 1))
+        counts = np.diff(self._start)
+        sat = np.zeros((self.ny + 1, self.nx + 1), np.int_)
+        sat[1:, 1:] = counts.reshape((self.ny, self.nx)).cumsum(0).cumsum(1)
+        self.sat = sat
+
+        # keep the vertices where the cell changes, and the non-finite
+        # ones with their neighbours, so gaps in the line stay gaps
+        change = ((cx[1:] != cx[:-1]) | (cy[1:] != cy[:-1]) |
+                  ~finite[1:] | ~finite[:-1])
+        keep = np.ones(len(xy), bool)
+        keep[1:-1] = change[:-1] | change[1:]
+        self.path = Path(xy[keep])
+        step = np.nonzero(change)[0]
+        self._steps = xy[step], xy[step + 1]
+
+    def count_inside(self, bbox):
+        """
+        Return the number of vertices in the grid cells that lie
+        entirely in *bbox*.
+        """
+        cs = self.cellsize
+        i0 = np.ceil((bbox.x0 - self.x0) / cs)
+        i1 = np.floor((bbox.x1 - self.x0) / cs)
+        j0 = np.ceil((bbox.y0 - self.y0) / cs)
+        j1 = np.floor((bbox.y1 - self.y0) / cs)
+        i0, i1 = [int(min(max(i, 0), self.nx)) for i in (i0, i1)]
+        j0, j1 = [int(min(max(j, 0), self.ny)) for j in (j0, j1)]
+        if i1 <= i0 or j1 <= j0:
+            return 0
+        sat = self.sat
+        return sat[j1, i1] - sat[j0, i1] - sat[j1, i0] + sat[j0, i0]
+
+    def _border(self, bbox):
+        """
+        Return the positions in :attr:`_index` of the vertices in the
+        cells that *bbox* covers only in part.
+        """
+        cs, nx, start = self.cellsize, self.nx, self._start
+        fx0, fx1 = (bbox.x0 - self.x0) / cs, (bbox.x1 - self.x0) / cs
+        fy0, fy1 = (bbox.y0 - self.y0) / cs, (bbox.y1 - self.y0) / cs
+        i0, i1 = int(np.floor(fx0)), min(int(np.floor(fx1)), nx - 1)
+        j0, j1 = int(np.floor(fy0)), min(int(np.floor(fy1)), self.ny - 1)
+        # the cells entirely inside are [fi0, fi1) x [fj0, fj1)
+        fi0, fi1 = int(np.ceil(fx0)), int(np.floor(fx1))
+        fj0, fj1 = int(np.ceil(fy0)), int(np.floor(fy1))
+        full = fi0 < fi1 and fj0 < fj1
+        slices = []
+        for j in xrange(j0, j1 + 1):
+            if full and fj0 <= j < fj1:
+                spans = (i0, fi0 - 1), (fi1, i1)
+            else:
+                spans = (i0, i1),
+            for a, b in spans:
+                if a <= b:
+                    slices.append(np.arange(start[j * nx + a],
+                                            start[j * nx + b + 1]))
+        if not slices:
+            return np.zeros(0, np.int_)
+        return np.concatenate(slices)
+
+    def _corner_inside(self, bbox):
+        """
+        Return True if the lower left corner of *bbox* lies inside the
+        line taken as a polygon.
+        """
+        point = bbox.x0, bbox.y0
+        inside = self.path.contains_point(point)
+        # the decimated path differs from the line by the polygons a
+        # run makes with its chord; only those in the corner's cell
+        # can hold the corner
+        cs = self.cellsize
+        i = min(int(np.floor((bbox.x0 - self.x0) / cs)), self.nx - 1)
+        j = min(int(np.floor((bbox.y0 - self.y0) / cs)), self.ny - 1)
+        c = j * self.nx + i
+        index = self._index[self._start[c]:self._start[c + 1]]
+        for run in np.split(index, np.nonzero(np.diff(index) != 1)[0] + 1):
+            if len(run) > 2 and Path(self.xy[run]).contains_point(point):
+                inside = not inside
+        return bool(inside)
+
+    def intersects_bbox(self, bbox, filled=True):
+        cs = self.cellsize
+        if (not filled or bbox.x0 < self.x0 or bbox.y0 < self.y0 or
+            bbox.x1 >= self.x0 + self.nx * cs or
+            bbox.y1 >= self.y0 + self.ny * cs):
+            # vertices off the grid are not indexed
+            return Path(self.xy).intersects_bbox(bbox, filled)
+        if self.count_inside(bbox):
+            return True
+
+        xy = self.xy
+        x0, y0, x1, y1 = bbox.extents
+        pos = self._border(bbox)
+        index = self._index[pos]
+        x, y = xy[index, 0], xy[index, 1]
+        if ((x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)).any():
+            return True
+
+        # no vertex is in the box, so the line can only cross it, along
+        # a segment from one cell to another or one inside a cell the
+        # box partly covers
+        if _segments_intersect_bbox(self._steps[0], self._steps[1], bbox):
+            return True
+        nxt = np.minimum(pos + 1, len(self._index) - 1)
+        within = ((self._cell[nxt] == self._cell[pos]) &
+                  (self._index[nxt] == index + 1))
+        index = index[within]
+        if _segments_intersect_bbox(xy[index], xy[index + 1], bbox):
+            return True
+        return self._corner_inside(bbox)
+
+
 class DraggableLegend(DraggableOffsetBox):
     def __init__(self, legend, use_blit=False):
         self.legend=legend
@@ -338,6 +513,7 @@ in the normalized axes coordinate.
         self._last_fontsize_points = self._fontsize
 
         self._draggable = None
+        self._occupancy_cache = {}
 
     def _set_artist_props(self, a):
         """
@@ -697,7 +873,7 @@ in the normalized axes coordinate.
         """
         Returns list of vertices and extents covered by the plot.
 
-        Returns a two long list.
+        Returns a three long list.
 
         First element is a list of (x, y) vertices (in
         display-coordinates) covered by all the lines and line
@@ -705,6 +881,12 @@ in the normalized axes coordinate.
 
         Second element is a list of bounding boxes for all the patches in
         the legend's handles.
+
+        Third element is a list of the paths of the lines, in display
+        coordinates; lines with at least
+        :data:`matplotlib.gridindex.min_items` vertices are given as
+        a :class:`_LineOccupancy`, which answers intersects_bbox in
+        the same way.
         """
 
         assert self.isaxes # should always hold because function is only called internally
@@ -714,12 +896,20 @@ in the normalized axes coordinate.
         bboxes = []
         lines = []
 
+        region = self.get_bbox_to_anchor()
+        cache = {}
         for handle in ax.lines:
             assert isinstance(handle, Line2D)
             path = handle.get_path()
+            if (len(path.vertices) >= gridindex.min_items and
+                path.codes is None):
+                lines.append(self._get_line_occupancy(handle, region))
+                cache[handle] = self._occupancy_cache[handle]
+                continue
             trans = handle.get_transform()
             tpath = trans.transform_path(path)
             lines.append(tpath)
+        self._occupancy_cache = cache
 
         for handle in ax.patches:
             assert isinstance(handle, Patch)
@@ -733,6 +923,32 @@ in the normalized axes coordinate.
 
         return [vertices, bboxes, lines]
 
+    def _get_line_occupancy(self, line, region):
+        """
+        Return a :class:`_LineOccupancy` of the vertices of *line* in
+        display space, over the display space *region* in which the
+        legend is placed.  It is cached until the data, the
+        transform, the scales or the region change.
+        """
+        path = line.get_path()
+        trans = line.get_transform()
+        matrix = trans.get_affine().get_matrix()
+        ax = self.parent
+        key = (ax.get_xscale(), ax.get_yscale(), region.bounds)
+        cache = self._occupancy_cache.get(line)
+        if (cache is not None and cache[0] is path and
+            cache[1] is path.vertices and cache[2] == key and
+            (cache[3] == matrix).all()):
+            return cache[4]
+
+        xy = trans.transform(path.vertices)
+        # about 256 cells across, but none smaller than a pixel
+        cellsize = max(region.width, region.height, 1) / 256.0
+        occupancy = _LineOccupancy(xy, region, max(cellsize, 1.0))
+        self._occupancy_cache[line] = (path, path.vertices, key,
+                                       matrix.copy(), occupancy)
+        return occupancy
+
     def draw_frame(self, b):
         'b is a boolean.  Set draw frame to b'
         self.set_frame_on(b)
@@ -21,6 +21,7 @@ from matplotlib import rcParams
 from artist import allow_rasterization
 from matplotlib import docstring
 from matplotlib.font_manager import FontProperties
+from matplotlib import gridindex
 
 # special-purpose marker identifiers:
 (TICKLEFT, TICKRIGHT, TICKUP, TICKDOWN,
@@ -68,6 +69,120 @@ def segment_hits(cx, cy, x, y, radius):
     #print points,lines
     return np.concatenate((points,lines))
 
+def _segment_hits_near(cx, cy, x, y, radius, seg):
+    """
+    Like :func:`segment_hits`, but only test the segments starting at
+    the indices *seg* and their end points, e.g., the candidates found
+    with a :class:`~matplotlib.gridindex.GridIndex`.
+    """
+    pts = np.unique(np.concatenate((seg, seg + 1)))
+    points = pts[(cx - x[pts])**2 + (cy - y[pts])**2 <= radius**2]
+
+    xr, yr = x[seg], y[seg]
+    dx, dy = x[seg + 1] - xr, y[seg + 1] - yr
+    u = ((cx - xr)*dx + (cy - yr)*dy) / (dx**2 + dy**2)
+    candidates = (u >= 0) & (u <= 1)
+    # as in segment_hits, segments with an end point hit are left out
+    candidates &= (cx - xr)**2 + (cy - yr)**2 > radius**2
+    candidates &= (cx - x[seg + 1])**2 + (cy - y[seg + 1])**2 > radius**2
+    px, py = xr + u*dx, yr + u*dy
+    line_hits = candidates & ((cx - px)**2 + (cy - py)**2 <= radius**2)
+    return np.concatenate((points, seg[line_hits]))
+
+def _column_extrema(ind, y, col):
+    """
+    Reduce the sorted vertex indices *ind* to the first, last, lowest
+    and highest vertex of every pixel column.  *y* are the y values of
+    the vertices in *ind* and *col* the (monotonic) column each one
+    falls in.  Returns the kept indices, sorted.
+    """
+    n = len(ind)
+    if n == 0:
+        return ind
+    change = np.nonzero(col[1:] != col[:-1])[0] + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [n]))
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+    keep = [starts, ends - 1]
+    for reduce in (np.minimum, np.maximum):
+        extreme = reduce.reduceat(y, starts)
+        hits, = np.nonzero(y == extreme[group])
+        # only the first hit in each column, to match argmin/argmax
+        first = np.ones(len(hits), bool)
+        first[1:] = group[hits[1:]] != group[hits[:-1]]
+        keep.append(hits[first])
+    return ind[np.unique(np.concatenate(keep))]
+
+class _MinMaxPyramid:
+    """
+    Multi-resolution min/max summary of the y data of a
+    :class:`Line2D`, used when its *decimate* property is 'minmax'.
+
+    Level *k* splits the vertices into buckets of ``base*2**k`` points
+    and records the index of the lowest and the highest vertex of each
+    bucket.  Level 0 is built from the raw data and every coarser level
+    from the one below it, so the full array is scanned only once per
+    dataset however often the view is panned or zoomed.
+    """
+    base = 32
+
+    def __init__(self, y):
+        self.y = y
+        self.levels = []     # (bucketsize, imin, imax) tuples
+        # nan/inf break the argmin/argmax bookkeeping; don't decimate
+        self.valid = bool(np.isfinite(y).all())
+        b = self.base
+        nbucket = len(y) // b
+        if not self.valid or nbucket < 2:
+            return
+        blocks = y[:nbucket*b].reshape((nbucket, b))
+        offset = np.arange(nbucket) * b
+        imin = blocks.argmin(axis=1) + offset
+        imax = blocks.argmax(axis=1) + offset
+        self.levels.append((b, imin, imax))
+        while len(imin) >= 4:
+            npair = len(imin) // 2
+            lo0, lo1 = imin[0:2*npair:2], imin[1:2*npair:2]
+            hi0, hi1 = imax[0:2*npair:2], imax[1:2*npair:2]
+            # ties keep the earlier vertex
+            imin = np.where(y[lo1] < y[lo0], lo1, lo0)
+            imax = np.where(y[hi1] > y[hi0], hi1, hi0)
+            b *= 2
+            self.levels.append((b, imin, imax))
+
+    def candidates(self, i0, i1, bounds):
+        """
+        Return the sorted indices in [*i0*, *i1*) of a subset of the
+        vertices that contains the first, last, lowest and highest
+        vertex of every column; *bounds* are the indices at which the
+        columns start.
+
+        Buckets lying entirely inside one column contribute only their
+        extrema; buckets straddling a column boundary or the view edges
+        contribute all their vertices.  The bucket size is chosen to
+        balance the two.
+        """
+        target = np.sqrt((i1 - i0) / (2.0 * max(len(bounds), 1)))
+        level = None
+        for lev in self.levels:
+            if lev[0] > target:
+                break
+            level = lev
+        if level is None:
+            return np.arange(i0, i1)
+        b, imin, imax = level
+        covered = len(imin) * b
+        k0 = -(-i0 // b)
+        k1 = min(i1, covered) // b
+        parts = [imin[k0:k1], imax[k0:k1]]
+        edge = np.concatenate((bounds - 1, bounds, [i0, i1 - 1]))
+        starts = np.unique(edge[(edge >= i0) & (edge < i1)] // b) * b
+        parts.append((starts[:, np.newaxis] + np.arange(b)).ravel())
+        if covered < i1:
+            parts.append(np.arange(max(covered, i0), i1))
+        ind = np.unique(np.concatenate(parts))
+        return ind[(ind >= i0) & (ind < i1)]
+
 class Line2D(Artist):
     """
     A line - the line can have both a solid linestyle connecting all
@@ -179,6 +294,7 @@ class Line2D(Artist):
                  pickradius      = 5,
                  drawstyle       = None,
                  markevery       = None,
+                 decimate        = None,
                  **kwargs
                  ):
         """
@@ -229,6 +345,7 @@ class Line2D(Artist):
         self.set_color(color)
         self.set_marker(marker)
         self.set_markevery(markevery)
+        self.set_decimate(decimate)
         self.set_antialiased(antialiased)
         self.set_markersize(markersize)
         self._dashSeq = None
@@ -255,6 +372,9 @@ class Line2D(Artist):
         self._yorig = np.asarray([])
         self._invalidx = True
         self._invalidy = True
+        self._pyramid = None
+        self._decimated_ind = None
+        self._hit_cache = None
         self.set_data(xdata, ydata)
 
     def contains(self, mouseevent):
@@ -283,9 +403,8 @@ class Line2D(Artist):
         if len(self._xy)==0: return False,{}
 
         # Convert points to pixels
-        path, affine = self._transformed_path.get_transformed_path_and_affine()
-        path = affine.transform_path(path)
-        xy = path.vertices
+        points_only = self._linestyle in ['None',None]
+        xy, index = self._get_hit_index(points_only)
         xt = xy[:, 0]
         yt = xy[:, 1]
 
@@ -297,15 +416,28 @@ class Line2D(Artist):
             pixels = self.figure.dpi/72. * self.pickradius
 
         # Check for collision
-        if self._linestyle in ['None',None]:
+        cx, cy = mouseevent.x, mouseevent.y
+        if index is not None:
+            near = index.query(cx - pixels, cy - pixels,
+                               cx + pixels, cy + pixels)
+        if points_only:
             # If no line, return the nearby point(s)
-            d = (xt-mouseevent.x)**2 + (yt-mouseevent.y)**2
-            ind, = np.nonzero(np.less_equal(d, pixels**2))
-        else:
+            if index is None:
+                d = (xt-cx)**2 + (yt-cy)**2
+                ind, = np.nonzero(np.less_equal(d, pixels**2))
+            else:
+                d = (xt[near]-cx)**2 + (yt[near]-cy)**2
+                ind = near[np.less_equal(d, pixels**2)]
+        elif index is None:
             # If line, return the nearby segment(s)
-            ind = segment_hits(mouseevent.x,mouseevent.y,xt,yt,pixels)
+            ind = segment_hits(cx,cy,xt,yt,pixels)
+        else:
+            ind = _segment_hits_near(cx,cy,xt,yt,pixels,near)
 
-        ind += self.ind_offset
+        if self._decimated_ind is not None:
+            ind = self._decimated_ind[ind]
+        else:
+            ind += self.ind_offset
 
         # Debugging message
         if False and self._label != u'':
@@ -318,6 +450,34 @@ class Line2D(Artist):
         # Return the point(s) within radius
         return len(ind)>0,dict(ind=ind)
 
+    def _get_hit_index(self, points_only):
+        """
+        Return the vertices in display coordinates and, for lines
+        with at least :data:`matplotlib.gridindex.min_items` vertices,
+        a :class:`~matplotlib.gridindex.GridIndex` of the points (if
+        *points_only*) or segments.  Both are cached until the data or
+        the transform change.
+        """
+        path, affine = self._transformed_path.get_transformed_path_and_affine()
+        matrix = affine.get_matrix()
+        cache = self._hit_cache
+        if (cache is not None and cache[0] is path and
+            cache[1] is path.vertices and cache[2] == points_only and
+            (cache[3] == matrix).all()):
+            return cache[4], cache[5]
+
+        xy = affine.transform_path(path).vertices
+        index = None
+        if len(xy) >= gridindex.min_items:
+            if points_only:
+                extents = gridindex.point_extents(xy[:, 0], xy[:, 1])
+            else:
+                extents = gridindex.segment_extents(xy[:, 0], xy[:, 1])
+            index = gridindex.GridIndex(extents)
+        self._hit_cache = (path, path.vertices, points_only, matrix.copy(),
+                           xy, index)
+        return xy, index
+
     def get_pickradius(self):
         'return the pick radius used for containment tests'
         return self.pickradius
@@ -370,6 +530,27 @@ class Line2D(Artist):
         'return the markevery setting'
         return self._markevery
 
+    def set_decimate(self, decimate):
+        """
+        Set the decimation mode used when drawing sorted x data.  With
+        *decimate* = 'minmax', only the first, last, lowest and highest
+        vertex in each pixel column of the visible data is passed to
+        the renderer, which draws the same envelope as the full data
+        at a fraction of the cost for very long lines.  Decimation
+        only applies to solid lines without markers on linear
+        rectilinear axes, the same conditions under which the visible
+        data is sub-sliced; otherwise it is ignored.
+
+        ACCEPTS: [ None | 'minmax' ]
+        """
+        if decimate not in (None, 'minmax'):
+            raise ValueError('Unrecognized decimate mode %s' % decimate)
+        self._decimate = decimate
+
+    def get_decimate(self):
+        'return the decimate setting'
+        return self._decimate
+
     def set_picker(self,p):
         """Sets the event picker details for the line.
 
@@ -454,22 +635,109 @@ class Line2D(Artist):
             self._xy = np.concatenate((x, y), 1)
         self._x = self._xy[:, 0] # just a view
         self._y = self._xy[:, 1] # just a view
+        self._xybuf = self._xy
 
-        self._subslice = False
-        if (self.axes and len(x) > 100 and self._is_sorted(x) and
-            self.axes.name == 'rectilinear' and
-            self.axes.get_xscale() == 'linear' and
-            self._markevery is None):
-            self._subslice = True
+        self._xsorted = None
+        self._update_subslice()
         if hasattr(self, '_path'):
             interpolation_steps = self._path._interpolation_steps
         else:
             interpolation_steps = 1
         self._path = Path(self._xy, None, interpolation_steps)
         self._transformed_path = None
+        self._pyramid = None
+        self._hit_cache = None
         self._invalidx = False
         self._invalidy = False
 
+    def _update_subslice(self):
+        """
+        Decide whether drawing can be restricted to the visible slice
+        of the data.  Sortedness of x is only computed when the other
+        conditions hold, and is remembered in :attr:`_xsorted` so that
+        :meth:`append_data` can update it incrementally.
+        """
+        self._subslice = False
+        if (self.axes and len(self._x) > 100 and
+            self.axes.name == 'rectilinear' and
+            self.axes.get_xscale() == 'linear' and
+            self._markevery is None):
+            if self._xsorted is None:
+                self._xsorted = self._is_sorted(self._x)
+            self._subslice = bool(self._xsorted)
+
+    def append_data(self, x, y):
+        """
+        Append the points in sequences *x* and *y* to the line.
+
+        Unlike :meth:`set_data`, which reconverts and rechecks the
+        whole dataset on the next draw, this only processes the new
+        points: they are copied into a buffer that grows by doubling,
+        and the sortedness of x, the :class:`~matplotlib.path.Path`
+        and the data limits of the axes are all updated in place.
+        This makes it cheap to feed a long line a few samples at a
+        time, e.g., from a live data source.
+
+        Data that needs unit conversion or is masked is handled by
+        falling back to :meth:`set_data` with the concatenated data.
+        """
+        if self._invalidx or self._invalidy:
+            self.recache()
+
+        has_units = (self.axes is not None and
+                     (self.axes.xaxis.have_units() or
+                      self.axes.yaxis.have_units()))
+        if (has_units or ma.isMaskedArray(x) or ma.isMaskedArray(y) or
+            ma.isMaskedArray(self._xy)):
+            self.set_data(ma.concatenate((ma.ravel(self._xorig), ma.ravel(x))),
+                          ma.concatenate((ma.ravel(self._yorig), ma.ravel(y))))
+            return
+
+        x = np.asarray(x, float).ravel()
+        y = np.asarray(y, float).ravel()
+        if len(x) != len(y):
+            raise RuntimeError('xdata and ydata must be the same length')
+        k = len(x)
+        if k == 0:
+            return
+
+        n = len(self._xy)
+        if n + k > len(self._xybuf):
+            buf = np.empty((max(2*len(self._xybuf), n + k), 2), float)
+            buf[:n] = self._xy
+            self._xybuf = buf
+        self._xybuf[n:n+k, 0] = x
+        self._xybuf[n:n+k, 1] = y
+        if self._xsorted is not None:
+            self._xsorted = (self._xsorted and self._is_sorted(x) and
+                             (n == 0 or x[0] >= self._x[-1]))
+
+        self._xy = self._xybuf[:n+k]
+        self._x = self._xy[:, 0]
+        self._y = self._xy[:, 1]
+        self._xorig = self._x
+        self._yorig = self._y
+        self._update_subslice()
+
+        # update the existing path in place instead of rescanning the
+        # whole vertex array in Path.__init__
+        path = self._path
+        path.vertices = self._xy
+        path.has_nonfinite = (path.has_nonfinite or
+                              not np.isfinite(self._xy[n:]).all())
+        path.should_simplify = (rcParams['path.simplify'] and
+                                len(self._xy) >= 128)
+        self._transformed_path = None
+        self._pyramid = None
+
+        if self.axes is not None and self in self.axes.lines:
+            ax = self.axes
+            ax.dataLim.update_from_data_xy(self._xy[n:],
+                                           ax.ignore_existing_data_limits,
+                                           updatex=self.x_isdata,
+                                           updatey=self.y_isdata)
+            ax.ignore_existing_data_limits = False
+
     def _transform_path(self, subslice=None):
         # Masked arrays are now handled by the Path class itself
         if subslice is not None:
@@ -494,19 +762,62 @@ class Line2D(Artist):
         if len(x)<2: return 1
         return np.alltrue(x[1:]-x[0:-1]>=0)
 
+    def _decimate_slice(self, i0, i1):
+        """
+        Return the indices of the vertices in [*i0*, *i1*) to draw with
+        'minmax' decimation, or None if the line should be drawn in
+        full.
+        """
+        if (self._decimate != 'minmax' or
+            self._markerFunc != '_draw_nothing' or
+            self._linestyle != '-' or
+            self._drawstyle != 'default' or
+            ma.isMaskedArray(self._xy)):
+            return None
+        ncols = self.axes.bbox.width
+        x = self._x
+        if i1 - i0 <= 4*ncols or x[i1-1] == x[i0]:
+            return None
+        if self._pyramid is None:
+            self._pyramid = _MinMaxPyramid(self._y)
+        if not self._pyramid.valid:
+            return None
+
+        # the x scale is linear, so display x is a*x + c
+        y = self._y[i0]
+        (xa, ya), (xb, yb) = self.get_transform().transform(
+            [[x[i0], y], [x[i1-1], y]])
+        a = (xb - xa) / (x[i1-1] - x[i0])
+        c = xa - a * x[i0]
+        pixels = np.arange(np.floor(min(xa, xb)) + 1,
+                           np.floor(max(xa, xb)) + 1)
+        edges = np.sort((pixels - c) / a)
+        bounds = i0 + x[i0:i1].searchsorted(edges, 'left')
+
+        ind = self._pyramid.candidates(i0, i1, bounds)
+        col = bounds.searchsorted(ind, 'right')
+        return _column_extrema(ind, self._y[ind], col)
+
     @allow_rasterization
     def draw(self, renderer):
         if self._invalidy or self._invalidx:
             self.recache()
         self.ind_offset = 0  # Needed for contains() method.
+        self._decimated_ind = None
         if self._subslice and self.axes:
             # Need to handle monotonically decreasing case also...
             x0, x1 = self.axes.get_xbound()
             i0, = self._x.searchsorted([x0], 'left')
             i1, = self._x.searchsorted([x1], 'right')
             subslice = slice(max(i0-1, 0), i1+1)
-            self.ind_offset = subslice.start
-            self._transform_path(subslice)
+            ind = self._decimate_slice(subslice.start,
+                                       min(subslice.stop, len(self._x)))
+            if ind is not None:
+                self._decimated_ind = ind
+                self._transform_path(ind)
+            else:
+                self.ind_offset = subslice.start
+                self._transform_path(subslice)
         if self._transformed_path is None:
             self._transform_path()
 
@@ -633,6 +944,10 @@ class Line2D(Artist):
         processed data.
         """
         if orig:
+            if self._xorig is self._x:
+                # appended data lives in a buffer that later appends
+                # write to, so callers get their own copy
+                return self._x.copy()
             return self._xorig
         if self._invalidx:
             self.recache()
@@ -646,6 +961,8 @@ class Line2D(Artist):
         processed data.
         """
         if orig:
+            if self._yorig is self._y:
+                return self._y.copy()
             return self._yorig
         if self._invalidy:
             self.recache()
@@ -1549,6 +1866,7 @@ class Line2D(Artist):
         self._marker = other._marker
         self._markerFunc = other._markerFunc
         self._drawstyle = other._drawstyle
+        self._decimate = other._decimate
 
 
     def _get_rgb_face(self, alt=False):
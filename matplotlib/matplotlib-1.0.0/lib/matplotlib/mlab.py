@@ -38,6 +38,9 @@ MATLAB compatible functions
 :func:`specgram`
   Spectrogram (power spectral density over segments of time)
 
+:class:`SpectrogramStream`
+  Spectrogram of a signal that arrives block by block
+
 Miscellaneous functions
 -------------------------
 
@@ -63,6 +66,9 @@ Functions that don't exist in MATLAB, but are useful anyway:
 :meth:`cross_from_above`
     return the indices where a 1D array crosses a threshold from above
 
+:class:`BinReducer`
+    reduce the values falling in each of a set of bins, chunk by chunk
+
 
 record array helper functions
 -------------------------------
@@ -82,6 +88,9 @@ A collection of helper methods for numpyrecord arrays
 :meth:`csv2rec`
     import record array from CSV file with type inspection
 
+:meth:`csv2rec_chunks`
+    import a large CSV file as a sequence of record arrays
+
 :meth:`rec_append_fields`
     adds  field(s)/array(s) to record array
 
@@ -142,7 +151,7 @@ care--function signatures may differ):
 """
 
 from __future__ import division
-import csv, warnings, copy, os, operator
+import csv, warnings, copy, os, operator, datetime, itertools
 
 import numpy as np
 ma = np.ma
@@ -200,14 +209,63 @@ def detrend_linear(y):
     a = y.mean() - b*x.mean()
     return y - (b*x + a)
 
+#: The spectral functions transform the segments of long signals in
+#: batches whose FFTs take about this many bytes, to bound the memory
+#: used besides the result.
+spectral_batch_bytes = 1 << 24
+
+def _stride_windows(x, NFFT, step):
+    """
+    Return a 2-D view of the *NFFT* point segments of the 1-D array
+    *x* that start every *step* points, one segment per row, sharing
+    memory with *x*.
+    """
+    n = (len(x) - NFFT) // step + 1
+    stride = x.strides[0]
+    return np.lib.stride_tricks.as_strided(
+        x, shape=(n, NFFT), strides=(step*stride, stride))
+
+def _detrend_segments(segments, detrend):
+    """
+    Apply *detrend* to each row of the 2-D array *segments*.  The
+    :func:`detrend_none`, :func:`detrend_mean` and
+    :func:`detrend_linear` (of real data) detrendings are done on all
+    rows at once.
+    """
+    if detrend is detrend_none:
+        return segments
+    if detrend is detrend_mean:
+        return segments - segments.mean(axis=1)[:, np.newaxis]
+    if detrend is detrend_linear and not np.iscomplexobj(segments):
+        # the least squares line through each row, as in detrend_linear
+        x = np.arange(segments.shape[1], dtype=np.float_)
+        x -= x.mean()
+        b = np.dot(segments, x) / np.dot(x, x)
+        return (segments - segments.mean(axis=1)[:, np.newaxis]
+                - b[:, np.newaxis] * x)
+    return np.array([detrend(segment) for segment in segments])
+
+def _segment_ffts(x, NFFT, step, detrend, windowVals, pad_to, numFreqs,
+                  start, stop):
+    """
+    Return the first *numFreqs* FFT coefficients of the detrended and
+    windowed segments *start* to *stop* of *x*, one segment per row.
+    """
+    segments = _stride_windows(x, NFFT, step)[start:stop]
+    segments = windowVals * _detrend_segments(segments, detrend)
+    if not np.iscomplexobj(segments) and numFreqs == pad_to//2 + 1:
+        return np.fft.rfft(segments, n=pad_to, axis=1)
+    return np.fft.fft(segments, n=pad_to, axis=1)[:, :numFreqs]
+
 #This is a helper function that implements the commonality between the
 #psd, csd, and spectrogram.  It is *NOT* meant to be used outside of mlab
 def _spectral_helper(x, y, NFFT=256, Fs=2, detrend=detrend_none,
         window=window_hanning, noverlap=0, pad_to=None, sides='default',
-        scale_by_freq=None):
+        scale_by_freq=None, average=False):
     #The checks for if y is x are so that we can use the same function to
     #implement the core of psd(), csd(), and spectrogram() without doing
-    #extra calculations.  We return the unaveraged Pxy, freqs, and t.
+    #extra calculations.  We return the unaveraged Pxy, freqs, and t, or
+    #with *average* the mean of Pxy over the segments.
     same_data = y is x
 
     #Make sure we're dealing with a numpy array. If y and x were the same
@@ -234,8 +292,55 @@ def _spectral_helper(x, y, NFFT=256, Fs=2, detrend=detrend_none,
     if scale_by_freq is None:
         scale_by_freq = True
 
+    numFreqs, scaling_factor, centered = _spectral_sides(
+        np.iscomplexobj(x), pad_to, sides, Fs, scale_by_freq)
+    windowVals = _window_values(window, NFFT, x.dtype)
+
+    step = NFFT - noverlap
+    ind = np.arange(0, len(x) - NFFT + 1, step)
+    n = len(ind)
+    if average:
+        Pxy = np.zeros((numFreqs,1), np.complex_)
+    else:
+        Pxy = np.zeros((numFreqs,n), np.complex_)
+
+    # do the ffts of the segments, as many at a time as fit in
+    # spectral_batch_bytes
+    batch = max(1, spectral_batch_bytes // (16 * pad_to))
+    for start in range(0, n, batch):
+        stop = min(start + batch, n)
+        fx = _segment_ffts(x, NFFT, step, detrend, windowVals, pad_to,
+                           numFreqs, start, stop)
+        if same_data:
+            Pxy_batch = (fx.real**2 + fx.imag**2).T
+        else:
+            fy = _segment_ffts(y, NFFT, step, detrend, windowVals, pad_to,
+                               numFreqs, start, stop)
+            Pxy_batch = (np.conjugate(fx) * fy).T
+        if average:
+            Pxy[:,0] += Pxy_batch.sum(axis=1)
+        else:
+            Pxy[:,start:stop] = Pxy_batch
+    if average:
+        Pxy /= max(n, 1)
+
+    _scale_spectrum(Pxy, windowVals, scaling_factor, scale_by_freq, Fs)
+
+    t = 1./Fs * (ind + NFFT / 2.)
+    freqs = _spectral_freqs(Fs, pad_to, numFreqs, centered)
+    if centered:
+        Pxy = _center_spectrum(Pxy)
+
+    return Pxy, freqs, t
+
+def _spectral_sides(iscomplex, pad_to, sides, Fs, scale_by_freq):
+    """
+    Return the number of frequencies, the scaling factor of the
+    density and whether the frequencies are centered at zero for a
+    spectrum of (complex, if *iscomplex*) data with *sides*.
+    """
     # For real x, ignore the negative frequencies unless told otherwise
-    if (sides == 'default' and np.iscomplexobj(x)) or sides == 'twosided':
+    if (sides == 'default' and iscomplex) or sides == 'twosided':
         numFreqs = pad_to
         scaling_factor = 1.
     elif sides in ('default', 'onesided'):
@@ -251,31 +356,23 @@ def _spectral_helper(x, y, NFFT=256, Fs=2, detrend=detrend_none,
     if scale_by_freq:
         scaling_factor /= Fs
 
+    centered = (iscomplex and sides == 'default') or sides == 'twosided'
+    return numFreqs, scaling_factor, centered
+
+def _window_values(window, NFFT, dtype):
+    """
+    Return the *NFFT* values of *window*, a function or a vector.
+    """
     if cbook.iterable(window):
         assert(len(window) == NFFT)
-        windowVals = window
-    else:
-        windowVals = window(np.ones((NFFT,), x.dtype))
-
-    step = NFFT - noverlap
-    ind = np.arange(0, len(x) - NFFT + 1, step)
-    n = len(ind)
-    Pxy = np.zeros((numFreqs,n), np.complex_)
-
-    # do the ffts of the slices
-    for i in range(n):
-        thisX = x[ind[i]:ind[i]+NFFT]
-        thisX = windowVals * detrend(thisX)
-        fx = np.fft.fft(thisX, n=pad_to)
-
-        if same_data:
-            fy = fx
-        else:
-            thisY = y[ind[i]:ind[i]+NFFT]
-            thisY = windowVals * detrend(thisY)
-            fy = np.fft.fft(thisY, n=pad_to)
-        Pxy[:,i] = np.conjugate(fx[:numFreqs]) * fy[:numFreqs]
+        return window
+    return window(np.ones((NFFT,), dtype))
 
+def _scale_spectrum(Pxy, windowVals, scaling_factor, scale_by_freq, Fs):
+    """
+    Scale the rows of the raw spectrum *Pxy*, one row per frequency,
+    in place.
+    """
     # Scale the spectrum by the norm of the window to compensate for
     # windowing loss; see Bendat & Piersol Sec 11.5.2.
     Pxy *= 1 / (np.abs(windowVals)**2).sum()
@@ -289,15 +386,19 @@ def _spectral_helper(x, y, NFFT=256, Fs=2, detrend=detrend_none,
     if scale_by_freq:
         Pxy[[0,-1]] /= Fs
 
-    t = 1./Fs * (ind + NFFT / 2.)
+def _spectral_freqs(Fs, pad_to, numFreqs, centered):
+    """
+    Return the frequencies of the rows of a spectrum.
+    """
     freqs = float(Fs) / pad_to * np.arange(numFreqs)
-
-    if (np.iscomplexobj(x) and sides == 'default') or sides == 'twosided':
+    if centered:
         # center the frequency range at zero
         freqs = np.concatenate((freqs[numFreqs//2:] - Fs, freqs[:numFreqs//2]))
-        Pxy = np.concatenate((Pxy[numFreqs//2:, :], Pxy[:numFreqs//2, :]), 0)
+    return freqs
 
-    return Pxy, freqs, t
+def _center_spectrum(Pxy):
+    numFreqs = len(Pxy)
+    return np.concatenate((Pxy[numFreqs//2:, :], Pxy[:numFreqs//2, :]), 0)
 
 #Split out these keyword docs so that they can be used elsewhere
 docstring.interpd.update(PSD=cbook.dedent("""
@@ -416,10 +517,11 @@ def csd(x, y, NFFT=256, Fs=2, detrend=detrend_none, window=window_hanning,
         Procedures, John Wiley & Sons (1986)
     """
     Pxy, freqs, t = _spectral_helper(x, y, NFFT, Fs, detrend, window,
-        noverlap, pad_to, sides, scale_by_freq)
+        noverlap, pad_to, sides, scale_by_freq, average=True)
 
-    if len(Pxy.shape) == 2 and Pxy.shape[1]>1:
-        Pxy = Pxy.mean(axis=1)
+    # a single segment is returned as a column, as it always was
+    if len(t)>1:
+        Pxy = Pxy[:,0]
     return Pxy, freqs
 
 @docstring.dedent_interpd
@@ -463,6 +565,107 @@ def specgram(x, NFFT=256, Fs=2, detrend=detrend_none, window=window_hanning,
 
     return Pxx, freqs, t
 
+class SpectrogramStream:
+    """
+    Compute the spectrogram of a signal that arrives in blocks, e.g.,
+    from a sound card, one column per segment as soon as the samples
+    of the segment are in.
+
+    The arguments are those of :func:`specgram`, and the columns are
+    the same as those :func:`specgram` computes for the concatenated
+    blocks, except that a signal shorter than *NFFT* is not zero
+    padded: no column is produced until *NFFT* samples are in.  The
+    samples after the last complete segment, the overlap with the next
+    one, are kept for the next call to :meth:`add`::
+
+        stream = SpectrogramStream(NFFT=512, Fs=44100, noverlap=256)
+        while recording:
+            Pxx, t = stream.add(read_block())
+            image.append_columns(10*np.log10(Pxx))
+
+    See :class:`~matplotlib.image.ColumnRingImage` for an image that
+    keeps the last columns of a stream.
+
+    Attributes:
+
+      *freqs*: the frequencies of the rows of the columns.  With
+        *sides* 'default' these are the one-sided frequencies until a
+        complex block has been added.
+
+      *nsamples*: the number of samples added so far
+    """
+    def __init__(self, NFFT=256, Fs=2, detrend=detrend_none,
+                 window=window_hanning, noverlap=128, pad_to=None,
+                 sides='default', scale_by_freq=None):
+        assert(NFFT > noverlap)
+        if pad_to is None:
+            pad_to = NFFT
+        if scale_by_freq is None:
+            scale_by_freq = True
+        self.NFFT = NFFT
+        self.Fs = Fs
+        self.detrend = detrend
+        self.window = window
+        self.step = NFFT - noverlap
+        self.pad_to = pad_to
+        self.sides = sides
+        self.scale_by_freq = scale_by_freq
+        self.nsamples = 0
+        self._tail = None
+        self._start = 0         # the index of the first sample of _tail
+        self._setup(False)
+
+    def _setup(self, iscomplex):
+        self._complex = iscomplex
+        self._numFreqs, self._scaling_factor, self._centered = \
+            _spectral_sides(iscomplex, self.pad_to, self.sides, self.Fs,
+                            self.scale_by_freq)
+        self.freqs = _spectral_freqs(self.Fs, self.pad_to, self._numFreqs,
+                                     self._centered)
+        self._windowVals = None
+
+    def add(self, samples):
+        """
+        Add the next block of *samples* and return (*Pxx*, *t*), the
+        columns of the segments completed by them and the times of
+        the segment midpoints, as :func:`specgram` does.  *Pxx* has no
+        columns if no segment was completed.
+        """
+        samples = np.asarray(samples)
+        if self._tail is None:
+            x = samples
+        else:
+            x = np.concatenate((self._tail, samples))
+        self.nsamples += len(samples)
+        if np.iscomplexobj(x) and not self._complex:
+            self._setup(True)
+        if self._windowVals is None:
+            self._windowVals = _window_values(self.window, self.NFFT,
+                                              x.dtype)
+
+        n = 0
+        if len(x) >= self.NFFT:
+            n = (len(x) - self.NFFT) // self.step + 1
+        ind = np.arange(n) * self.step
+        if n:
+            fx = _segment_ffts(x, self.NFFT, self.step, self.detrend,
+                               self._windowVals, self.pad_to,
+                               self._numFreqs, 0, n)
+            Pxx = (fx.real**2 + fx.imag**2).T
+            _scale_spectrum(Pxx, self._windowVals, self._scaling_factor,
+                            self.scale_by_freq, self.Fs)
+            if self._centered:
+                Pxx = _center_spectrum(Pxx)
+        else:
+            Pxx = np.zeros((self._numFreqs, 0), np.float_)
+        t = 1./self.Fs * (self._start + ind + self.NFFT / 2.)
+
+        # keep what the next segments need of this block
+        consumed = n * self.step
+        self._tail = x[consumed:].copy()
+        self._start += consumed
+        return Pxx, t
+
 _coh_error = """Coherence is calculated by averaging over *NFFT*
 length segments.  Your signal is too short for your choice of *NFFT*.
 """
@@ -621,26 +824,22 @@ def cohere_pairs( X, ij, NFFT=256, Fs=2, detrend=detrend_none,
         windowVals = window
     else:
         windowVals = window(np.ones(NFFT, X.dtype))
-    ind = range(0, numRows-NFFT+1, NFFT-noverlap)
-    numSlices = len(ind)
+    step = NFFT-noverlap
+    numSlices = len(range(0, numRows-NFFT+1, step))
     FFTSlices = {}
     FFTConjSlices = {}
     Pxx = {}
-    slices = range(numSlices)
     normVal = np.linalg.norm(windowVals)**2
     for iCol in allColumns:
         progressCallback(i/Ncols, 'Cacheing FFTs')
-        Slices = np.zeros( (numSlices,numFreqs), dtype=np.complex_)
-        for iSlice in slices:
-            thisSlice = X[ind[iSlice]:ind[iSlice]+NFFT, iCol]
-            thisSlice = windowVals*detrend(thisSlice)
-            Slices[iSlice,:] = np.fft.fft(thisSlice)[:numFreqs]
+        Slices = _segment_ffts(X[:,iCol], NFFT, step, detrend, windowVals,
+                               NFFT, numFreqs, 0, numSlices)
 
         FFTSlices[iCol] = Slices
         if preferSpeedOverMemory:
             FFTConjSlices[iCol] = np.conjugate(Slices)
         Pxx[iCol] = np.divide(np.mean(abs(Slices)**2), normVal)
-    del Slices, ind, windowVals
+    del Slices, windowVals
 
     # compute the coherences and phases for all pairs using the
     # cached FFTs
@@ -1849,33 +2048,93 @@ def rec_groupby(r, groupby, stats):
     the the *groupby* argument, with the associated group values, and
     for each outname name in the *stats* argument, with the associated
     stat summary output.
-    """
-    # build a dictionary from groupby keys-> list of indices into r with
-    # those keys
-    rowd = dict()
-    for i, row in enumerate(r):
-        key = tuple([row[attr] for attr in groupby])
-        rowd.setdefault(key, []).append(i)
-
-    # sort the output by groupby keys
-    keys = rowd.keys()
-    keys.sort()
 
-    rows = []
-    for key in keys:
-        row = list(key)
-        # get the indices for this groupby key
-        ind = rowd[key]
-        thisr = r[ind]
-        # call each stat function for this groupby slice
-        row.extend([func(thisr[attr]) for attr, func, outname in stats])
-        rows.append(row)
+    The rows are sorted by key once, and the reductions known to
+    :class:`BinReducer` (sum, mean, min, max, median, std, var and
+    len) are computed for all groups at once; any other *func* is
+    called once per group.
+    """
+    order, starts, keys = _rec_groups(r, groupby)
+    counts = np.diff(np.append(starts, len(r)))
 
     # build the output record array with groupby and outname attributes
+    arrays = list(keys)
+    for attr, func, outname in stats:
+        values = np.asarray(r[attr])[order]
+        arrays.append(_reduce_groups(values, starts, counts, func))
     attrs, funcs, outnames = zip(*stats)
     names = list(groupby)
     names.extend(outnames)
-    return np.rec.fromrecords(rows, names=names)
+    return np.rec.fromarrays(arrays, names=names)
+
+def _rec_groups(r, groupby):
+    """
+    Sort the rows of the record array *r* by the fields *groupby*.
+    Return the sorting order, the positions in the sorted rows where
+    the groups of rows with equal keys start, and the keys of the
+    groups, as a list of one array per field.
+    """
+    cols = [np.asarray(r[attr]) for attr in groupby]
+    codes = [_sort_codes(col) for col in cols]
+    # lexsort sorts by the last key first
+    order = np.lexsort(codes[::-1])
+    first = np.zeros(len(order), bool)
+    first[:1] = True
+    for code in codes:
+        code = code[order]
+        first[1:] |= code[1:] != code[:-1]
+    starts = np.nonzero(first)[0]
+    return order, starts, [col[order[starts]] for col in cols]
+
+def _sort_codes(col):
+    """
+    Return the array *col*, or for an object array (e.g., of the
+    datetime.date values csv2rec makes) the position of each value
+    among its distinct values sorted by Python, as numpy can not
+    mergesort object arrays before version 1.8.
+    """
+    if col.dtype.kind != 'O':
+        return col
+    distinct = sorted(set(col))
+    code = dict(zip(distinct, range(len(distinct))))
+    return np.array([code[value] for value in col], np.int_)
+
+def _reduce_groups(values, starts, counts, func):
+    """
+    Reduce each group of the *values* sorted by group with *func*;
+    the groups start at *starts* and have *counts* values.
+    """
+    kind = BinReducer.reductions.get(func)
+    if kind == 'count':
+        return counts
+    if not len(starts):
+        return np.zeros(0)
+    if values.dtype.kind not in 'biuf':
+        kind = None
+    if kind == 'sum':
+        # accumulate in the type np.sum would use
+        return np.add.reduceat(values, starts, dtype=np.sum(values[:0]).dtype)
+    elif kind == 'min':
+        return np.minimum.reduceat(values, starts)
+    elif kind == 'max':
+        return np.maximum.reduceat(values, starts)
+    elif kind in ('mean', 'std', 'var'):
+        mean = np.add.reduceat(values, starts, dtype=np.float_) / counts
+        if kind == 'mean':
+            return mean
+        group = np.repeat(np.arange(len(starts)), counts)
+        var = np.add.reduceat((values - mean[group])**2, starts) / counts
+        if kind == 'var':
+            return var
+        return np.sqrt(var)
+    elif kind == 'median':
+        group = np.repeat(np.arange(len(starts)), counts)
+        values = values[np.lexsort((values, group))]
+        lo = starts + (counts - 1) // 2
+        hi = starts + counts // 2
+        return 0.5 * (values[lo] + values[hi])
+    return np.array([func(values[i0:i0 + n])
+                     for i0, n in zip(starts, counts)])
 
 
 
@@ -1910,7 +2169,9 @@ def rec_join(key, r1, r2, jointype='inner', defaults=None, r1postfix='1', r2post
     record array containing the intersection of the fields of *r1* and
     *r2*.
 
-    *r1* (also *r2*) must not have any duplicate keys.
+    A row of *r1* is joined with every row of *r2* with the same key,
+    so a key that is repeated in both arrays gives all the pairs of
+    their rows.
 
     The *jointype* keyword can be 'inner', 'outer', 'leftouter'.  To
     do a rightouter join just reverse *r1* and *r2*.
@@ -1931,30 +2192,42 @@ def rec_join(key, r1, r2, jointype='inner', defaults=None, r1postfix='1', r2post
         if name not in r2.dtype.names:
             raise ValueError('r2 does not have key field %s'%name)
 
-    def makekey(row):
-        return tuple([row[name] for name in key])
-
-    r1d = dict([(makekey(row),i) for i,row in enumerate(r1)])
-    r2d = dict([(makekey(row),i) for i,row in enumerate(r2)])
-
-    r1keys = set(r1d.keys())
-    r2keys = set(r2d.keys())
-
-    common_keys = r1keys & r2keys
-
-    r1ind = np.array([r1d[k] for k in common_keys])
-    r2ind = np.array([r2d[k] for k in common_keys])
-
-    common_len = len(common_keys)
-    left_len = right_len = 0
+    (codes1, codes2), keys = _join_codes([[r1[name] for name in key],
+                                          [r2[name] for name in key]])
+    order1 = np.argsort(codes1, kind='mergesort')
+    order2 = np.argsort(codes2, kind='mergesort')
+    sorted1 = codes1[order1]
+    sorted2 = codes2[order2]
+
+    # the rows of r2 matching each row of r1 are lo:hi in sorted order
+    lo = sorted2.searchsorted(sorted1, 'left')
+    nmatch = sorted2.searchsorted(sorted1, 'right') - lo
+    first = np.cumsum(nmatch) - nmatch
+    r1ind = [np.repeat(order1, nmatch)]
+    r2ind = [order2[np.repeat(lo - first, nmatch) +
+                    np.arange(nmatch.sum())]]
+    rowcodes = [np.repeat(sorted1, nmatch)]
+
+    # rows found on one side only have an index of -1 on the other
     if jointype == "outer" or jointype == "leftouter":
-        left_keys = r1keys.difference(r2keys)
-        left_ind = np.array([r1d[k] for k in left_keys])
-        left_len = len(left_ind)
+        left_ind = order1[nmatch == 0]
+        r1ind.append(left_ind)
+        r2ind.append(-np.ones(len(left_ind), np.int_))
+        rowcodes.append(codes1[left_ind])
     if jointype == "outer":
-        right_keys = r2keys.difference(r1keys)
-        right_ind = np.array([r2d[k] for k in right_keys])
-        right_len = len(right_ind)
+        unmatched = (sorted1.searchsorted(sorted2, 'left') ==
+                     sorted1.searchsorted(sorted2, 'right'))
+        right_ind = order2[unmatched]
+        r1ind.append(-np.ones(len(right_ind), np.int_))
+        r2ind.append(right_ind)
+        rowcodes.append(codes2[right_ind])
+
+    # sort the output by key
+    rowcodes = np.concatenate(rowcodes)
+    order = np.argsort(rowcodes, kind='mergesort')
+    rowcodes = rowcodes[order]
+    r1ind = np.concatenate(r1ind)[order]
+    r2ind = np.concatenate(r2ind)[order]
 
     def key_desc(name):
         'if name is a string key, use the larger size of r1 or r2 before merging'
@@ -1990,7 +2263,7 @@ def rec_join(key, r1, r2, jointype='inner', defaults=None, r1postfix='1', r2post
     r2desc = [(mapped_r2field(desc[0]), desc[1]) for desc in r2.dtype.descr if desc[0] not in key]
     newdtype = np.dtype(keydesc + r1desc + r2desc)
 
-    newrec = np.recarray((common_len + left_len + right_len,), dtype=newdtype)
+    newrec = np.recarray((len(rowcodes),), dtype=newdtype)
 
     if defaults is not None:
         for thiskey in defaults:
@@ -2009,24 +2282,38 @@ def rec_join(key, r1, r2, jointype='inner', defaults=None, r1postfix='1', r2post
             if k in newrec_fields:
                 newrec[k] = v
 
+    for name, values in zip(key, keys):
+        newrec[name] = values[rowcodes]
+
+    has1 = r1ind >= 0
+    r1ind = r1ind[has1]
     for field in r1.dtype.names:
-        newfield = mapped_r1field(field)
-        if common_len:
-            newrec[newfield][:common_len] = r1[field][r1ind]
-        if (jointype == "outer" or jointype == "leftouter") and left_len:
-            newrec[newfield][common_len:(common_len+left_len)] = r1[field][left_ind]
+        if field not in key:
+            newrec[mapped_r1field(field)][has1] = np.asarray(r1[field])[r1ind]
 
+    has2 = r2ind >= 0
+    r2ind = r2ind[has2]
     for field in r2.dtype.names:
-        newfield = mapped_r2field(field)
-        if field not in key and common_len:
-            newrec[newfield][:common_len] = r2[field][r2ind]
-        if jointype == "outer" and right_len:
-            newrec[newfield][-right_len:] = r2[field][right_ind]
-
-    newrec.sort(order=key)
+        if field not in key:
+            newrec[mapped_r2field(field)][has2] = np.asarray(r2[field])[r2ind]
 
     return newrec
 
+def _join_codes(keys):
+    """
+    Number the distinct keys of the rows of several record arrays in
+    sorted order.  *keys* holds one list of key columns per array.
+    Return a list with the key numbers of the rows of each array, and
+    the distinct keys, as one array per key column.
+    """
+    cols = [np.concatenate(col) for col in zip(*keys)]
+    order, starts, unique = _rec_groups(cols, range(len(cols)))
+    counts = np.diff(np.append(starts, len(order)))
+    codes = np.empty(len(order), np.int_)
+    codes[order] = np.repeat(np.arange(len(starts)), counts)
+    bounds = np.cumsum([0] + [len(k[0]) for k in keys])
+    return [codes[i0:i1] for i0, i1 in zip(bounds[:-1], bounds[1:])], unique
+
 def recs_join(key, name, recs, jointype='outer', missing=0., postfixes=None):
     """
     Join a sequence of record arrays on single column key.
@@ -2059,32 +2346,52 @@ def recs_join(key, name, recs, jointype='outer', missing=0., postfixes=None):
 
       r = recs_join("date", "close", recs=[r0, r1], missing=0.)
 
-    """
-    results = []
-    aligned_iters = cbook.align_iterators(operator.attrgetter(key), *[iter(r) for r in recs])
-
-    def extract(r):
-        if r is None: return missing
-        else: return r[name]
-
+    If a key is repeated, the n-th rows with that key in each array
+    are joined with each other.
+    """
+    keys = []
+    for r in recs:
+        k = np.asarray(r[key])
+        # number the repeats of each key, to join them in order
+        sk = _sort_codes(k)
+        order = np.argsort(sk, kind='mergesort')
+        sk = sk[order]
+        ind = np.arange(len(k))
+        first = np.ones(len(k), bool)
+        first[1:] = sk[1:] != sk[:-1]
+        repeat = np.empty(len(k), np.int_)
+        repeat[order] = ind - np.maximum.accumulate(np.where(first, ind, 0))
+        keys.append([k, repeat])
+    codes, unique = _join_codes(keys)
+    nrows = len(unique[0])
+
+    found = np.zeros(nrows, np.int_)
+    arrays = [unique[0]]
+    for r, rowcodes in zip(recs, codes):
+        values = np.asarray(r[name])
+        if len(rowcodes) == nrows:
+            column = values[np.argsort(rowcodes)]
+        else:
+            dtype = np.concatenate((values[:0], np.asarray([missing]))).dtype
+            column = np.empty(nrows, dtype)
+            column.fill(missing)
+            column[rowcodes] = values
+        found[rowcodes] += 1
+        arrays.append(column)
 
-    if jointype == "outer":
-        for rowkey, row in aligned_iters:
-            results.append([rowkey] + map(extract, row))
-    elif jointype == "inner":
-        for rowkey, row in aligned_iters:
-            if None not in row: # throw out any Nones
-                results.append([rowkey] + map(extract, row))
+    if jointype == "inner":
+        keep = found == len(recs)
+        arrays = [a[keep] for a in arrays]
 
     if postfixes is None:
         postfixes = ['%d'%i for i in range(len(recs))]
     names = ",".join([key] + ["%s%s" % (name, postfix) for postfix in postfixes])
-    return np.rec.fromrecords(results, names=names)
+    return np.rec.fromarrays(arrays, names=names)
 
 
 def csv2rec(fname, comments='#', skiprows=0, checkrows=0, delimiter=',',
             converterd=None, names=None, missing='', missingd=None,
-            use_mrecords=False):
+            use_mrecords=False, fast=False, cache=False):
     """
     Load data from comma/space/tab delimited file in *fname* into a
     numpy record array and return the record array.
@@ -2123,6 +2430,16 @@ def csv2rec(fname, comments='#', skiprows=0, checkrows=0, delimiter=',',
 
     - *use_mrecords*: if True, return an mrecords.fromrecords record array if any of the data are missing
 
+    - *fast*: if True, convert the data a column at a time, as
+      :func:`csv2rec_chunks` does; see there for how this differs
+
+    - *cache*: if True and *fname* is a filename, save the record
+      array to *fname* + '.npy', and load it from there, memory
+      mapped if it has no object fields, as long as that file is
+      newer than *fname*.  The cache does not record the other
+      arguments, so remove it after changing them.  Masked record
+      arrays are not cached.
+
       If no rows are found, *None* is returned -- see :file:`examples/loadrec.py`
     """
 
@@ -2132,6 +2449,20 @@ def csv2rec(fname, comments='#', skiprows=0, checkrows=0, delimiter=',',
     if missingd is None:
         missingd = {}
 
+    cachename = None
+    if cache and cbook.is_string_like(fname) and not use_mrecords:
+        cachename = fname + '.npy'
+        if (os.path.exists(cachename) and
+            os.path.getmtime(cachename) >= os.path.getmtime(fname)):
+            return _load_rec_cache(cachename)
+
+    if fast:
+        r = _csv2rec_fast(fname, comments, skiprows, checkrows, delimiter,
+                          converterd, names, missing, missingd, use_mrecords)
+        if r is not None and cachename is not None:
+            _save_rec_cache(cachename, r)
+        return r
+
     import dateutil.parser
     import datetime
     parsedate = dateutil.parser.parse
@@ -2230,13 +2561,6 @@ def csv2rec(fname, comments='#', skiprows=0, checkrows=0, delimiter=',',
         else: return func
 
 
-    # map column names that clash with builtins -- TODO - extend this list
-    itemd = {
-        'return' : 'return_',
-        'file' : 'file_',
-        'print' : 'print_',
-        }
-
     def get_converters(reader):
 
         converters = None
@@ -2273,25 +2597,7 @@ def csv2rec(fname, comments='#', skiprows=0, checkrows=0, delimiter=',',
             headers = row
             break
 
-        # remove these chars
-        delete = set("""~!@#$%^&*()-=+~\|]}[{';: /?.>,<""")
-        delete.add('"')
-
-        names = []
-        seen = dict()
-        for i, item in enumerate(headers):
-            item = item.strip().lower().replace(' ', '_')
-            item = ''.join([c for c in item if c not in delete])
-            if not len(item):
-                item = 'column%d'%i
-
-            item = itemd.get(item, item)
-            cnt = seen.get(item, 0)
-            if cnt>0:
-                names.append(item + '_%d'%cnt)
-            else:
-                names.append(item)
-            seen[item] = cnt+1
+        names = _csv_names(headers)
 
     else:
         if cbook.is_string_like(names):
@@ -2337,14 +2643,332 @@ def csv2rec(fname, comments='#', skiprows=0, checkrows=0, delimiter=',',
             r = mrecords.fromrecords(rows, names=names, mask=rowmasks)
     else:
         r = np.rec.fromrecords(rows, names=names)
+        if cachename is not None:
+            _save_rec_cache(cachename, r)
     return r
 
+def _csv_names(headers):
+    """
+    Make valid and unique field names of the column *headers* of a
+    csv file.
+    """
+    # map column names that clash with builtins -- TODO - extend this list
+    itemd = {
+        'return' : 'return_',
+        'file' : 'file_',
+        'print' : 'print_',
+        }
+
+    # remove these chars
+    delete = set("""~!@#$%^&*()-=+~\|]}[{';: /?.>,<""")
+    delete.add('"')
+
+    names = []
+    seen = dict()
+    for i, item in enumerate(headers):
+        item = item.strip().lower().replace(' ', '_')
+        item = ''.join([c for c in item if c not in delete])
+        if not len(item):
+            item = 'column%d'%i
+
+        item = itemd.get(item, item)
+        cnt = seen.get(item, 0)
+        if cnt>0:
+            names.append(item + '_%d'%cnt)
+        else:
+            names.append(item)
+        seen[item] = cnt+1
+    return names
+
+def _load_rec_cache(filename):
+    try:
+        r = np.load(filename, mmap_mode='r')
+    except ValueError:
+        # arrays with object fields, e.g., dates, cannot be memory mapped
+        r = np.load(filename)
+    return r.view(np.recarray)
+
+def _save_rec_cache(filename, r):
+    try:
+        np.save(filename, r)
+    except (IOError, OSError), msg:
+        verbose.report('could not write the csv2rec cache %s: %s' %
+                       (filename, msg))
+
+def csv2rec_chunks(fname, chunksize=65536, comments='#', skiprows=0,
+                   checkrows=1000, delimiter=',', converterd=None,
+                   names=None, missing='', missingd=None):
+    """
+    Iterate over the data of a csv file in record arrays of up to
+    *chunksize* rows, to process files larger than memory::
+
+        for r in csv2rec_chunks('sales.csv'):
+            total += r.price.sum()
+
+    The arguments are those of :func:`csv2rec`, but the data are
+    converted a column at a time rather than a value at a time:
+
+    - the type of each column is chosen from the first *checkrows*
+      rows (if 0, the first chunk) and then kept: a later value that
+      does not fit it raises a ValueError
+
+    - columns are bool ('True' or 'False'), int, float, dates or
+      dates and times in the ISO 8601 forms 'YYYY-MM-DD' and
+      'YYYY-MM-DD HH:MM:SS', or strings.  Other date formats need a
+      converter in *converterd*, which is called once per value.
+
+    - missing values are -1 in int columns, nan in float columns,
+      False in bool columns, date(1, 1, 1) in date columns and ''
+      in string columns
+
+    - string fields are as wide as the longest value of the chunk
+    """
+    for names, arrays, masks in _csv_blocks(fname, chunksize, comments,
+                                            skiprows, checkrows, delimiter,
+                                            converterd, names, missing,
+                                            missingd):
+        yield np.rec.fromarrays(arrays, names=names)
+
+def _csv2rec_fast(fname, comments, skiprows, checkrows, delimiter,
+                  converterd, names, missing, missingd, use_mrecords):
+    columns = masks = None
+    for names, arrays, blockmasks in _csv_blocks(fname, 65536, comments,
+                                                 skiprows, checkrows,
+                                                 delimiter, converterd,
+                                                 names, missing, missingd):
+        if columns is None:
+            columns = [[a] for a in arrays]
+            masks = [[m] for m in blockmasks]
+        else:
+            for column, a in zip(columns, arrays):
+                column.append(a)
+            for mask, m in zip(masks, blockmasks):
+                mask.append(m)
+    if columns is None:
+        return None
+    arrays = [np.concatenate(column) for column in columns]
+    masks = [np.concatenate(mask) for mask in masks]
+
+    if use_mrecords and np.any(masks):
+        try: from numpy.ma import mrecords
+        except ImportError:
+            raise RuntimeError('numpy 1.05 or later is required for masked array support')
+        r = np.rec.fromarrays(arrays, names=names)
+        return mrecords.fromrecords(r.tolist(), names=names,
+                                    mask=np.column_stack(masks).tolist())
+    return np.rec.fromarrays(arrays, names=names)
+
+def _csv_rows(fh, delimiter, comments, skiprows):
+    """
+    Iterate over the rows of the csv file *fh*, skipping the first
+    *skiprows* rows, empty rows and comments.
+    """
+    if delimiter == ' ':
+        # runs of spaces are one separator, as in csv2rec
+        fh = (' '.join(line.split()) for line in fh)
+    for i, row in enumerate(csv.reader(fh, delimiter=delimiter)):
+        if i < skiprows or not len(row) or row[0].startswith(comments):
+            continue
+        yield row
+
+def _csv_blocks(fname, chunksize, comments, skiprows, checkrows, delimiter,
+                converterd, names, missing, missingd):
+    """
+    Iterate over the blocks of rows of a csv file, yielding the field
+    names, the converted columns and the masks of the missing values
+    of each block; see :func:`csv2rec_chunks`.
+    """
+    if converterd is None:
+        converterd = {}
+    if missingd is None:
+        missingd = {}
+
+    fh = cbook.to_filehandle(fname)
+    rows = _csv_rows(fh, delimiter, comments, skiprows)
+    if names is None:
+        try:
+            names = _csv_names(rows.next())
+        except StopIteration:
+            raise ValueError('Could not find any valid data in CSV file')
+    elif cbook.is_string_like(names):
+        names = [n.strip() for n in names.split(',')]
+    ncols = len(names)
+
+    converters = None
+    nrows = 0
+    while True:
+        # the types are guessed from the first block, which holds at
+        # least checkrows rows
+        if converters is None:
+            block = list(itertools.islice(rows, max(chunksize, checkrows)))
+        else:
+            block = list(itertools.islice(rows, chunksize))
+        if not block:
+            break
+        for i, row in enumerate(block):
+            if len(row) != ncols:
+                block[i] = (row + [''] * ncols)[:ncols]
+        columns = [np.array(col) for col in zip(*block)]
+
+        masks = []
+        for name, col in zip(names, columns):
+            mask = col == ''
+            if missing:
+                mask |= col == missing
+            if missingd.get(name) is not None:
+                mask |= col == missingd[name]
+            masks.append(mask)
+
+        if converters is None:
+            converters = []
+            for j, (name, col, mask) in enumerate(zip(names, columns, masks)):
+                func = converterd.get(j)
+                if func is None:
+                    func = converterd.get(name)
+                if func is None:
+                    sample = col[:checkrows or len(col)]
+                    sample = sample[~mask[:len(sample)]]
+                    func = _csv_column_kind(sample)
+                converters.append(func)
+
+        arrays = []
+        for name, func, col, mask in zip(names, converters, columns, masks):
+            try:
+                arrays.append(_csv_convert(func, col, mask))
+            except ValueError:
+                if cbook.is_string_like(func):
+                    raise ValueError(
+                        'column %s of rows %d to %d does not fit the type '
+                        '%s guessed from the first rows; use a larger '
+                        'checkrows or a converter' %
+                        (name, nrows, nrows + len(block), func))
+                raise
+        nrows += len(block)
+        yield names, arrays, masks
+    fh.close()
+
+def _csv_column_kind(values):
+    """
+    Return the kind of the column of strings *values*: 'bool', 'int',
+    'float', 'date' or 'str'.
+    """
+    if not len(values):
+        return 'str'
+    if ((values == 'True') | (values == 'False')).all():
+        return 'bool'
+    for kind, dtype in ('int', np.int_), ('float', np.float_):
+        try:
+            values.astype(dtype)
+        except (ValueError, OverflowError):
+            pass
+        else:
+            return kind
+    if _csv_parse_dates(values) is not None:
+        return 'date'
+    return 'str'
+
+def _csv_convert(kind, col, mask):
+    """
+    Convert the column of strings *col* to *kind*, a kind returned by
+    :func:`_csv_column_kind` or a converter function, filling in the
+    values where *mask* is True with defaults.
+    """
+    values = col[~mask]
+    if kind == 'str':
+        col = col.copy()
+        col[mask] = ''
+        return col
+    elif kind == 'bool':
+        out = col == 'True'
+        if not (out | (col == 'False') | mask).all():
+            raise ValueError('invalid bool')
+        return out
+    elif kind == 'int':
+        values = values.astype(np.int_)
+        out = np.empty(len(col), np.int_)
+        out.fill(-1)
+    elif kind == 'float':
+        values = values.astype(np.float_)
+        out = np.empty(len(col), np.float_)
+        out.fill(np.nan)
+    elif kind == 'date':
+        values = _csv_parse_dates(values)
+        if values is None:
+            raise ValueError('invalid date')
+        out = np.empty(len(col), object)
+        out.fill(datetime.date(1, 1, 1))
+    else:
+        out = [None] * len(col)
+        for i in np.nonzero(~mask)[0]:
+            out[i] = kind(col[i])
+        return np.array(out)
+    out[~mask] = values
+    return out
+
+def _csv_parse_dates(strings):
+    """
+    Parse the array of ISO 8601 dates 'YYYY-MM-DD' or dates and times
+    'YYYY-MM-DD HH:MM:SS' (or with a 'T' separator) *strings* into an
+    object array of :class:`datetime.date`, or of
+    :class:`datetime.datetime` if any time is not midnight.  Returns
+    None if not all of *strings* are in one of these forms.
+    """
+    strings = np.asarray(strings)
+    out = np.empty(len(strings), object)
+    if not len(strings):
+        return out
+    # parse each distinct string once
+    (codes,), (unique,) = _join_codes([[strings]])
+    try:
+        b = unique.astype('S20').view(np.uint8).reshape((-1, 20)).astype(int)
+    except (UnicodeError, ValueError):
+        return None
+    if b[:, 19].any():
+        return None
+    digits = (b >= 48) & (b <= 57)
+    isdate = (digits[:, [0, 1, 2, 3, 5, 6, 8, 9]].all(axis=1) &
+              (b[:, 4] == 45) & (b[:, 7] == 45))
+    nodate = ~b[:, 10:].any(axis=1)
+    istime = (((b[:, 10] == 32) | (b[:, 10] == 84)) &
+              digits[:, [11, 12, 14, 15, 17, 18]].all(axis=1) &
+              (b[:, 13] == 58) & (b[:, 16] == 58))
+    if not (isdate & (nodate | istime)).all():
+        return None
+
+    def number(i0, i1):
+        n = 0
+        for i in range(i0, i1):
+            n = 10 * n + b[:, i] - 48
+        return n
+
+    fields = [number(0, 4), number(5, 7), number(8, 10)]
+    time = [np.where(istime, number(i, i + 2), 0) for i in (11, 14, 17)]
+    try:
+        if np.any(time):
+            fields.extend(time)
+            cls = datetime.datetime
+        else:
+            cls = datetime.date
+        values = [cls(*f) for f in zip(*[f.tolist() for f in fields])]
+    except ValueError:
+        return None
+    parsed = np.empty(len(unique), object)
+    parsed[:] = values
+    return parsed[codes]
+
 
 # a series of classes for describing the format intentions of various rec views
 class FormatObj:
     def tostr(self, x):
         return self.toval(x)
 
+    def tostr_column(self, values):
+        """
+        Return the list of the strings of the array *values*; derived
+        classes format the whole column at once where they can.
+        """
+        return [self.tostr(x) for x in values]
+
     def toval(self, x):
         return str(x)
 
@@ -2384,6 +3008,12 @@ class FormatFloat(FormatFormatStr):
             x = x * self.scale
         return x
 
+    def tostr_column(self, values):
+        if values.dtype.kind not in 'biuf':
+            return FormatFormatStr.tostr_column(self, values)
+        fmt = self.fmt
+        return [fmt%x for x in values.astype(np.float_) * self.scale]
+
     def fromstr(self, s):
         return float(s)/self.scale
 
@@ -2393,6 +3023,11 @@ class FormatInt(FormatObj):
     def tostr(self, x):
         return '%d'%int(x)
 
+    def tostr_column(self, values):
+        if values.dtype.kind not in 'biuf':
+            return FormatObj.tostr_column(self, values)
+        return ['%d'%x for x in values.tolist()]
+
     def toval(self, x):
         return int(x)
 
@@ -2430,6 +3065,17 @@ class FormatDate(FormatObj):
         if x is None: return 'None'
         return x.strftime(self.fmt)
 
+    def tostr_column(self, values):
+        # dates repeat a lot; format each one once
+        cache = {}
+        strings = []
+        for x in values:
+            s = cache.get(x)
+            if s is None:
+                s = cache[x] = self.tostr(x)
+            strings.append(s)
+        return strings
+
     def fromstr(self, x):
         import dateutil.parser
         return dateutil.parser.parse(x).date()
@@ -2476,7 +3122,8 @@ def csvformat_factory(format):
         format.fmt = '%r'
     return format
 
-def rec2txt(r, header=None, padding=3, precision=3, fields=None):
+def rec2txt(r, header=None, padding=3, precision=3, fields=None,
+            fname=None, chunksize=10000):
     """
     Returns a textual representation of a record array.
 
@@ -2495,6 +3142,11 @@ def rec2txt(r, header=None, padding=3, precision=3, fields=None):
     can be a list of strings like ['field1', 'field2'] or a single
     comma separated string like 'field1,field2'
 
+    *fname*: if not None, a filename or file handle to write the text
+    to instead of returning it.  The rows are then formatted and
+    written *chunksize* at a time, so that the text of a large
+    record array is never all in memory.
+
     Example::
 
       precision=[0,2,3]
@@ -2518,16 +3170,14 @@ def rec2txt(r, header=None, padding=3, precision=3, fields=None):
         except: return get_type(item,tdict[atype])
         return atype
 
-    def get_justify(colname, column, precision):
+    def get_kind(column):
         ntype = type(column[0])
 
         if ntype==np.str or ntype==np.str_ or ntype==np.string0 or ntype==np.string_:
-            length = max(len(colname),column.itemsize)
-            return 0, length+padding, "%s" # left justify
+            return 'str'
 
         if ntype==np.int or ntype==np.int16 or ntype==np.int32 or ntype==np.int64 or ntype==np.int8 or ntype==np.int_:
-            length = max(len(colname),np.max(map(len,map(str,column))))
-            return 1, length+padding, "%d" # right justify
+            return 'int'
 
         # JDH: my powerbook does not have np.float96 using np 1.3.0
         """
@@ -2542,16 +3192,51 @@ def rec2txt(r, header=None, padding=3, precision=3, fields=None):
         AttributeError                            Traceback (most recent call la
         """
         if ntype==np.float or ntype==np.float32 or ntype==np.float64 or (hasattr(np, 'float96') and (ntype==np.float96)) or ntype==np.float_:
+            return 'float'
+
+        return 'obj'
+
+    def format_column(column, kind, precision):
+        # the strings of a column, before justification
+        if kind == 'int':
+            return ['%d'%x for x in column.tolist()]
+        elif kind == 'float':
             fmt = "%." + str(precision) + "f"
-            length = max(len(colname),np.max(map(len,map(lambda x:fmt%x,column))))
-            return 1, length+padding, fmt   # right justify
+            return [fmt%x for x in column.tolist()]
+        elif kind == 'str':
+            return column.tolist()
+        return [str(x) for x in column]
 
-        return 0, max(len(colname),np.max(map(len,map(str,column))))+padding, "%s"
+    def blocks():
+        for start in range(0, len(r), chunksize):
+            block = r[start:start+chunksize]
+            yield [format_column(block[name], kind, prec) for name, kind, prec
+                   in zip(r.dtype.names, kinds, precision)]
 
     if header is None:
         header = r.dtype.names
 
-    justify_pad_prec = [get_justify(header[i],r.__getitem__(colname),precision[i]) for i, colname in enumerate(r.dtype.names)]
+    # strings are left justified in the width of their field, numbers
+    # and anything else in the width of their longest value, which
+    # takes a first pass over the rows
+    kinds = [get_kind(r[name]) for name in r.dtype.names]
+    widths = [len(colname) for colname in header]
+    for i, name in enumerate(r.dtype.names):
+        if kinds[i] == 'str':
+            widths[i] = max(widths[i], r[name].itemsize)
+    for columns in blocks():
+        for i, column in enumerate(columns):
+            if kinds[i] != 'str':
+                widths[i] = max([widths[i]] + map(len, column))
+
+    justify_pad_prec = []
+    for kind, width, prec in zip(kinds, widths, precision):
+        if kind == 'int':
+            justify_pad_prec.append((1, width+padding, "%d"))
+        elif kind == 'float':
+            justify_pad_prec.append((1, width+padding, "%." + str(prec) + "f"))
+        else:
+            justify_pad_prec.append((0, width+padding, "%s"))
 
     justify_pad_prec_spacer = []
     for i in range(len(justify_pad_prec)):
@@ -2579,20 +3264,52 @@ def rec2txt(r, header=None, padding=3, precision=3, fields=None):
 
             return item.rjust(pad)
 
-    textl = []
-    textl.append(''.join([format(colitem,justify_pad_prec_spacer[j]) for j, colitem in enumerate(header)]))
-    for i, row in enumerate(r):
-        textl.append(''.join([format(colitem,justify_pad_prec_spacer[j]) for j, colitem in enumerate(row)]))
-        if i==0:
-            textl[0] = textl[0].rstrip()
+    def justify_column(column, just_pad_prec_spacer):
+        just, pad, prec, spacer = just_pad_prec_spacer
+        if just == 0:
+            return [spacer*' ' + s.ljust(pad) for s in column]
+        return [s.rjust(pad) for s in column]
+
+    def lines():
+        line = ''.join([format(colitem,justify_pad_prec_spacer[j]) for j, colitem in enumerate(header)])
+        if len(r):
+            line = line.rstrip()
+        yield line
+        for columns in blocks():
+            columns = [justify_column(column, justify_pad_prec_spacer[j])
+                       for j, column in enumerate(columns)]
+            yield os.linesep.join([''.join(row) for row in zip(*columns)])
+
+    if fname is None:
+        return os.linesep.join(lines())
+
+    fh, opened = cbook.to_filehandle(fname, 'w', return_opened=True)
+    for i, text in enumerate(lines()):
+        if i:
+            fh.write(os.linesep)
+        fh.write(text)
+    if opened:
+        fh.close()
 
-    text = os.linesep.join(textl)
-    return text
 
 
+def _format_column(format, column, mval, ismasked):
+    """
+    Return the strings of a *column* of a record array formatted with
+    the :class:`FormatObj` *format*, with *mval* where it is masked.
+    """
+    if not ismasked:
+        return format.tostr_column(np.asarray(column))
+    mask = ma.getmaskarray(column)
+    data = ma.getdata(column)
+    strings = [mval] * len(data)
+    ind = np.nonzero(~mask)[0]
+    for i, s in zip(ind, format.tostr_column(data[ind])):
+        strings[i] = s
+    return strings
 
 def rec2csv(r, fname, delimiter=',', formatd=None, missing='',
-            missingd=None, withheader=True):
+            missingd=None, withheader=True, chunksize=10000):
     """
     Save the data from numpy recarray *r* into a
     comma-/space-/tab-delimited file.  The record array dtype names
@@ -2604,6 +3321,9 @@ def rec2csv(r, fname, delimiter=',', formatd=None, missing='',
     *withheader*: if withheader is False, do not write the attribute
       names in the first row
 
+    *chunksize*: the rows are formatted, a column at a time, and
+      written *chunksize* at a time
+
     for formatd type FormatFloat, we override the precision to store
     full precision floats in the CSV file
 
@@ -2618,21 +3338,13 @@ def rec2csv(r, fname, delimiter=',', formatd=None, missing='',
     if missingd is None:
         missingd = dict()
 
-    def with_mask(func):
-        def newfunc(val, mask, mval):
-            if mask:
-                return mval
-            else:
-                return func(val)
-        return newfunc
-
     if r.ndim != 1:
         raise ValueError('rec2csv only operates on 1 dimensional recarrays')
 
     formatd = get_formatd(r, formatd)
-    funcs = []
+    formats = []
     for i, name in enumerate(r.dtype.names):
-        funcs.append(with_mask(csvformat_factory(formatd[name]).tostr))
+        formats.append(csvformat_factory(formatd[name]))
 
     fh, opened = cbook.to_filehandle(fname, 'wb', return_opened=True)
     writer = csv.writer(fh, delimiter=delimiter)
@@ -2645,18 +3357,13 @@ def rec2csv(r, fname, delimiter=',', formatd=None, missing='',
     for name in header:
         mvals.append(missingd.get(name, missing))
 
-    ismasked = False
-    if len(r):
-        row = r[0]
-        ismasked = hasattr(row, '_fieldmask')
+    ismasked = isinstance(r, ma.MaskedArray)
 
-    for row in r:
-        if ismasked:
-            row, rowmask = row.item(), row._fieldmask.item()
-        else:
-            rowmask = [False] * len(row)
-        writer.writerow([func(val, mask, mval) for func, val, mask, mval
-                         in zip(funcs, row, rowmask, mvals)])
+    for start in range(0, len(r), chunksize):
+        block = r[start:start+chunksize]
+        columns = [_format_column(format, block[name], mval, ismasked)
+                   for format, name, mval in zip(formats, header, mvals)]
+        writer.writerows(zip(*columns))
     if opened:
         fh.close()
 
@@ -3112,6 +3819,159 @@ def cross_from_above(x, threshold):
     if len(ind): return ind+1
     else: return ind
 
+def _bincount(ind, n, weights=None):
+    """
+    :func:`numpy.bincount` of the integers *ind* in [0, *n*), always
+    returning *n* bins.
+    """
+    if not len(ind):
+        return np.zeros(n)
+    counts = np.bincount(ind, weights)
+    if len(counts) < n:
+        counts = np.concatenate((counts, np.zeros(n - len(counts))))
+    return counts
+
+
+class BinReducer:
+    """
+    Reduce the values falling in each of *n* bins with a function,
+    e.g., to color the cells of a 2-D histogram by the mean of a third
+    variable.  The values are added in chunks, so that data larger than
+    memory can be reduced from memory mapped arrays::
+
+        reducer = BinReducer(nbins, np.mean)
+        for start in range(0, len(x), chunksize):
+            sl = slice(start, start + chunksize)
+            reducer.add(bin_of(x[sl]), C[sl])
+        values = reducer.result()
+
+    Bin numbers outside [0, *n*) are ignored.
+
+    The reductions :func:`numpy.sum`, :func:`numpy.mean`,
+    :func:`numpy.min`, :func:`numpy.max`, :func:`numpy.median`,
+    :func:`numpy.std`, :func:`numpy.var`, their builtin equivalents
+    and :func:`len` are computed for all bins at once.  The sums,
+    extrema, variances and counts are merged chunk by chunk; for the
+    median and any other *func*, the binned values are kept until
+    :meth:`result`, which sorts them by bin and calls *func* once per
+    non-empty bin.
+    """
+    reductions = {np.sum: 'sum', sum: 'sum',
+                  np.mean: 'mean', np.average: 'mean',
+                  np.amin: 'min', np.min: 'min', min: 'min',
+                  np.amax: 'max', np.max: 'max', max: 'max',
+                  np.median: 'median',
+                  np.std: 'std', np.var: 'var',
+                  len: 'count', np.size: 'count'}
+
+    def __init__(self, n, func=np.mean):
+        self.n = n
+        self.func = func
+        self.kind = self.reductions.get(func)
+        self.counts = np.zeros(n, np.int_)
+        if self.kind in ('sum', 'mean'):
+            self._total = np.zeros(n)
+        elif self.kind == 'min':
+            self._extreme = np.empty(n)
+            self._extreme.fill(np.inf)
+        elif self.kind == 'max':
+            self._extreme = np.empty(n)
+            self._extreme.fill(-np.inf)
+        elif self.kind in ('std', 'var'):
+            self._mean = np.zeros(n)
+            self._m2 = np.zeros(n)
+        self._ind = []
+        self._values = []
+
+    def add(self, ind, values=None):
+        """
+        Add *values* (if None, ones) to the bins *ind*.
+        """
+        ind = np.asarray(ind, np.int_)
+        inside = (ind >= 0) & (ind < self.n)
+        ind = ind[inside]
+        if values is None:
+            values = np.ones(len(ind))
+        else:
+            values = np.asarray(values)[inside]
+
+        counts = _bincount(ind, self.n).astype(np.int_)
+        if self.kind in ('std', 'var'):
+            self._add_moments(ind, values, counts)
+        self.counts += counts
+        if self.kind in ('sum', 'mean'):
+            self._total += _bincount(ind, self.n, values)
+        elif self.kind in ('min', 'max'):
+            ind, values = self._sorted(ind, values)
+            if self.kind == 'min':
+                first = np.ones(len(ind), bool)
+                first[1:] = ind[1:] != ind[:-1]
+                ind, values = ind[first], values[first]
+                self._extreme[ind] = np.minimum(self._extreme[ind], values)
+            else:
+                last = np.ones(len(ind), bool)
+                last[:-1] = ind[1:] != ind[:-1]
+                ind, values = ind[last], values[last]
+                self._extreme[ind] = np.maximum(self._extreme[ind], values)
+        elif self.kind != 'count':
+            self._ind.append(ind)
+            self._values.append(values)
+
+    def _sorted(self, ind, values):
+        order = np.lexsort((values, ind))
+        return ind[order], values[order]
+
+    def _add_moments(self, ind, values, counts):
+        # merge the means and sums of squared deviations of the chunk
+        # into those of the previous chunks (Chan et al.)
+        filled = counts > 0
+        mean = np.zeros(self.n)
+        mean[filled] = _bincount(ind, self.n, values)[filled] / counts[filled]
+        m2 = _bincount(ind, self.n, (values - mean[ind])**2)
+        total = self.counts + counts
+        delta = mean - self._mean
+        self._mean[filled] += delta[filled] * counts[filled] / total[filled]
+        self._m2 += m2
+        self._m2[filled] += (delta[filled]**2 * self.counts[filled] *
+                             counts[filled] / total[filled])
+
+    def result(self, empty=np.nan):
+        """
+        Return the reduced value of every bin, and *empty* for the
+        bins with no values.
+        """
+        counts = self.counts
+        filled = counts > 0
+        out = np.empty(self.n)
+        out.fill(empty)
+        if self.kind == 'count':
+            out[filled] = counts[filled]
+        elif self.kind == 'sum':
+            out[filled] = self._total[filled]
+        elif self.kind == 'mean':
+            out[filled] = self._total[filled] / counts[filled]
+        elif self.kind in ('min', 'max'):
+            out[filled] = self._extreme[filled]
+        elif self.kind == 'var':
+            out[filled] = self._m2[filled] / counts[filled]
+        elif self.kind == 'std':
+            out[filled] = np.sqrt(self._m2[filled] / counts[filled])
+        elif filled.any():
+            ind = np.concatenate(self._ind)
+            values = np.concatenate(self._values)
+            start = np.cumsum(counts) - counts
+            if self.kind == 'median':
+                ind, values = self._sorted(ind, values)
+                lo = start + (counts - 1) // 2
+                hi = start + counts // 2
+                out[filled] = 0.5 * (values[lo[filled]] + values[hi[filled]])
+            else:
+                values = values[np.argsort(ind, kind='mergesort')]
+                func = self.func
+                for i in np.nonzero(filled)[0]:
+                    out[i] = func(values[start[i]:start[i] + counts[i]])
+        return out
+
 ##################################################
 # Vector and path length geometry calculations
 ##################################################
@@ -418,6 +418,8 @@ defaultParams = {
     'text.fontweight'     : ['normal', str],
     'text.fontsize'       : ['medium', validate_fontsize],
     'text.hinting'        : [True, validate_bool],
+    'text.layout_cache_size' : [1000, validate_int], # layouts kept for
+                                                     # all texts
 
     'mathtext.cal'        : ['cursive', validate_font_properties],
     'mathtext.rm'         : ['serif', validate_font_properties],
@@ -435,8 +437,12 @@ defaultParams = {
     'image.lut'           : [256, validate_int],  # lookup table
     'image.origin'        : ['upper', str],  # lookup table
     'image.resample'      : [False, validate_bool],
+    'image.rgba_cache.memory' : [256, validate_float], # megabytes of colors
+                                                     # kept per image
+    'image.resize_threads' : [1, validate_int],  # 0 for one per CPU
 
     'contour.negative_linestyle' : ['dashed', validate_negative_linestyle_legacy],
+    'contour.trace_threads' : [1, validate_int],  # 0 for one per CPU
 
     # axes props
     'axes.axisbelow'        : [False, validate_bool],
@@ -555,6 +561,9 @@ defaultParams = {
     'agg.path.chunksize' : [0, validate_int],       # 0 to disable chunking;
                                                     # recommend about 20000 to
                                                     # enable. Experimental.
+    'agg.renderer_pool.memory' : [64, validate_float], # megabytes of idle
+                                                    # renderers kept for
+                                                    # reuse; 0 to disable
     # key-mappings
     'keymap.fullscreen' : ['f', validate_stringlist],
     'keymap.home' : [['h', 'r', 'home'], validate_stringlist],
@@ -62,3 +62,156 @@ def report_memory(i):
 ##     # w/o text and w/o write_png: Average memory consumed per loop: 0.02
 ##     # w/o text and w/ write_png : Average memory consumed per loop: 0.3400
 ##     # w/ text and w/ write_png  : Average memory consumed per loop: 0.32
+
+def test_renderer_pool():
+    import gc
+    from nose.tools import assert_equal
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg, renderer_pool
+
+    renderer_pool.clear()
+    fig = Figure(figsize=(2, 2), dpi=50)
+    canvas = FigureCanvasAgg(fig)
+    first = canvas.get_renderer()
+
+    # a new size releases the old renderer to the pool ...
+    fig.set_dpi(100)
+    assert canvas.get_renderer() is not first
+    # ... and going back reuses it
+    fig.set_dpi(50)
+    assert canvas.get_renderer() is first
+
+    # renderers of collected canvases are reused too
+    del fig, canvas
+    gc.collect()
+    fig = Figure(figsize=(2, 2), dpi=50)
+    assert FigureCanvasAgg(fig).get_renderer() is first
+    assert_equal(len(renderer_pool._idle), 1)
+
+def test_renderer_pool_exports():
+    # a renderer whose buffer was exported must not be handed to
+    # another canvas, which would draw into the exported array
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg, renderer_pool
+
+    renderer_pool.clear()
+    fig = Figure(figsize=(2, 2), dpi=50)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    exported = canvas.get_renderer()
+    rgba = canvas.buffer_array()
+    copied = canvas.buffer_array('gbr')
+    assert copied.flags.owndata
+    fig.set_dpi(100)
+    canvas.draw()
+    assert len(renderer_pool._idle) == 0
+
+    other = FigureCanvasAgg(Figure(figsize=(2, 2), dpi=50))
+    assert other.get_renderer() is not exported
+
+    # copies alone do not keep a renderer out of the pool
+    fig.set_dpi(50)
+    canvas.draw()
+    canvas.buffer_array('gbr')
+    renderer = canvas.get_renderer()
+    fig.set_dpi(100)
+    canvas.get_renderer()
+    assert renderer_pool._idle[-1][1] is renderer
+
+def test_buffer_array():
+    import numpy as np
+    from numpy.testing import assert_array_equal, assert_equal
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(2, 1), dpi=50)
+    canvas = FigureCanvasAgg(fig)
+    fig.add_subplot(111).plot([0, 1], [1, 0], 'r')
+    canvas.draw()
+    w, h = canvas.get_width_height()
+
+    rgba = canvas.buffer_array()
+    assert_equal(rgba.shape, (h, w, 4))
+    # a view of the renderer's memory, not a copy
+    assert not rgba.flags.owndata
+    assert_array_equal(
+        canvas.buffer_array('rgb').ravel(),
+        np.fromstring(canvas.tostring_rgb(), np.uint8))
+
+    argb = np.fromstring(canvas.tostring_argb(), np.uint8).reshape(h, w, 4)
+    assert_array_equal(canvas.buffer_array('argb'), argb)
+    swizzled = canvas.buffer_array('argb', inplace=True)
+    assert_array_equal(swizzled, argb)
+    assert_array_equal(rgba, argb)
+
+def test_frame_writer():
+    import numpy as np
+    from numpy.testing import assert_array_equal
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.framesink import FrameSink
+
+    class ListSink(FrameSink):
+        def __init__(self):
+            FrameSink.__init__(self)
+            self.frames = []
+
+        def write(self, frame):
+            self.frames.append(frame.copy())
+
+    def render(y):
+        fig = Figure(figsize=(2, 1), dpi=50)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        # keep the line clear of the spines, which are drawn over it
+        ax.set_xlim(-1, 2)
+        ax.set_ylim(-1, 3)
+        line, = ax.plot([0, 1], [y, y])
+        return canvas, line
+
+    # frames drawn by restoring the background and redrawing the line
+    # match full draws
+    canvas, line = render(0)
+    sink = ListSink()
+    writer = canvas.frame_writer(sink, artists=[line])
+    for y in range(3):
+        line.set_ydata([y, y])
+        writer.grab_frame()
+    writer.close()
+    assert not line.get_animated()
+    assert len(sink.frames) == 3
+    for y, frame in enumerate(sink.frames):
+        canvas, line = render(y)
+        canvas.draw()
+        assert_array_equal(frame, canvas.buffer_array())
+
+def test_encoder_failure():
+    import sys
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.framesink import EncoderSink
+
+    class FailingSink(EncoderSink):
+        def get_command(self):
+            return [sys.executable, '-c', 'import sys; '
+                    'sys.stderr.write("unknown codec\\n"); sys.exit(3)']
+
+    # the frames overflow the pipe, so writing fails as well as the
+    # exit status; either way the encoder's own output is reported
+    for buffered in True, False:
+        fig = Figure(figsize=(2, 1), dpi=50)
+        canvas = FigureCanvasAgg(fig)
+        fig.add_subplot(111)
+        writer = canvas.frame_writer(FailingSink('out.avi'),
+                                     buffered=buffered)
+        try:
+            try:
+                for i in range(10):
+                    writer.grab_frame()
+            finally:
+                writer.close()
+        except RuntimeError, msg:
+            assert 'status 3' in str(msg), msg
+            assert 'unknown codec' in str(msg), msg
+        else:
+            assert False, 'no RuntimeError'
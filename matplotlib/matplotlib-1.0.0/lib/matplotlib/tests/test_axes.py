@@ -367,6 +367,37 @@ def test_hexbin_extent():
     ax.hexbin(x, y, extent=[.1, .3, .6, .7])
     fig.savefig('hexbin_extent')
 
+def test_hexbin_chunked():
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    np.random.seed(0)
+    x, y, C = np.random.randn(3, 5000)
+    x[::100] = np.nan
+    for func in np.mean, np.median, np.std:
+        whole = ax.hexbin(x, y, C, gridsize=15, reduce_C_function=func)
+        chunked = ax.hexbin(x, y, C, gridsize=15, reduce_C_function=func,
+                            chunksize=777)
+        assert np.allclose(whole.get_array(), chunked.get_array())
+    counts = ax.hexbin(x, y, gridsize=15, mincnt=1, chunksize=1000)
+    assert counts.get_array().sum() == np.isfinite(x).sum()
+
+def test_hexbin_one_chunk_nonfinite():
+    # a chunksize covering all the data must drop the masked points too
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    np.random.seed(1)
+    x, y = np.exp(np.random.randn(2, 1000))
+    x[::50] = np.nan
+    y[7] = np.inf
+    expected = ax.hexbin(x, y, gridsize=10, xscale='log', mincnt=1)
+    for chunksize in len(x), 10 * len(x):
+        counts = ax.hexbin(x, y, gridsize=10, xscale='log', mincnt=1,
+                           chunksize=chunksize)
+        assert np.all(np.isfinite(counts.get_offsets()))
+        assert np.all(counts.get_array() == expected.get_array())
+        assert counts.get_array().sum() == (np.isfinite(x) &
+                                            np.isfinite(y)).sum()
+
 @image_comparison(baseline_images=['nonfinite_limits'])
 def test_nonfinite_limits():
     x = np.arange(0., np.e, 0.01)
@@ -0,0 +1,18 @@
+from nose.tools import assert_equal
+import matplotlib.batch as batch
+
+def _draw(fig, n):
+    ax = fig.add_subplot(111)
+    ax.plot(range(n))
+    ax.set_title('figure %d' % n)
+
+def test_render_many():
+    specs = [batch.FigureSpec(_draw, (n,), figsize=(2, 2))
+             for n in range(1, 5)]
+    specs.append(batch.FigureSpec(_draw, (5,), format='pdf'))
+    for workers in (1, 2):
+        results = list(batch.render_many(specs, workers=workers))
+        assert_equal([i for i, data in results], range(5))
+        for i, data in results[:4]:
+            assert data.startswith('\x89PNG')
+        assert results[4][1].startswith('%PDF')
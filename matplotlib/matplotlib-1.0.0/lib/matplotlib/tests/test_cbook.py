@@ -12,3 +12,20 @@ def test_is_string_like():
 
     assert cbook.is_string_like( "hello world" )
     assert_equal( cbook.is_string_like(10), False )
+
+def test_lru_cache():
+    cache = cbook.LRUCache(3)
+    for i in range(5):
+        cache[i] = i * 10
+    assert_equal(len(cache), 3)
+    assert 1 not in cache
+    assert_equal(cache.get(2), 20)
+    cache[5] = 50
+    # 3 was the least recently used
+    assert 3 not in cache and 2 in cache
+    assert_equal(cache.get(3), None)
+    assert_equal((cache.hits, cache.misses), (1, 1))
+    cache.maxsize = 1
+    cache[6] = 60
+    assert_equal(len(cache), 1)
+    assert_equal(cache.get(6), 60)
@@ -0,0 +1,47 @@
+import numpy as np
+from numpy import ma
+import matplotlib.colors as mcolors
+import matplotlib.cm as cm
+
+def test_lut_index():
+    # the fused normalization must color exactly like norm + cmap
+    np.random.seed(0)
+    cmap = mcolors.LinearSegmentedColormap.from_list('rgb', ['r', 'g', 'b'],
+                                                     N=17)
+    cmap.set_over('w')
+    cmap.set_under('k')
+    cmap.set_bad('m', 0.3)
+    x = np.random.randn(30, 40)
+    x[0, :5] = np.nan
+    data = [x, ma.masked_greater(x, 1.5), np.arange(12).reshape(3, 4) + 1]
+    norms = [mcolors.Normalize(), mcolors.Normalize(-1, 1, clip=True),
+             mcolors.Normalize(-0.5, 0.7), mcolors.LogNorm(),
+             mcolors.LogNorm(0.1, 2), mcolors.LogNorm(0.1, 2, clip=True)]
+    for norm in norms:
+        for d in data:
+            for bytes in (False, True):
+                expected = cmap(norm(d), alpha=0.4, bytes=bytes)
+                sm = cm.ScalarMappable(norm, cmap)
+                assert np.all(sm.to_rgba(d, alpha=0.4, bytes=bytes) ==
+                              expected)
+
+    rgba = cmap(np.linspace(0, 1, 5), alpha=0.5, bytes=True)
+    assert np.all(rgba[:, 3] == 127)
+
+def test_boundary_norm():
+    bounds = [0, 1, 2, 5, 9]
+    x = ma.masked_greater(np.linspace(-2, 11, 200), 10)
+    xx = x.filled(11)
+    for ncolors in (4, 10):
+        norm = mcolors.BoundaryNorm(bounds, ncolors)
+        expected = np.zeros(x.shape, np.int16)
+        for i, b in enumerate(bounds):
+            expected[xx >= b] = i
+        if ncolors > 4:
+            expected = (expected * (float(ncolors-1)/3)).astype(np.int16)
+        expected[xx < 0] = -1
+        expected[xx >= 9] = ncolors
+        iret = norm(x)
+        assert np.all(ma.getdata(iret) == expected)
+        assert np.all(ma.getmaskarray(iret) == ma.getmaskarray(x))
+    assert mcolors.BoundaryNorm(bounds, 4)(3) == 2
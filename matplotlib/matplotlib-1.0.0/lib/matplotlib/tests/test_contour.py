@@ -0,0 +1,118 @@
+import numpy as np
+from numpy import ma
+
+import matplotlib.pyplot as plt
+from matplotlib import _cntr, mlab
+from numpy.testing import assert_array_equal
+
+def _contour_data(n=80):
+    np.random.seed(0)
+    y, x = np.mgrid[0:1:n*1j, 0:2:(n+3)*1j]
+    z = np.sin(6*x) * np.cos(5*y) + 0.3 * np.random.randn(*x.shape)
+    return x, y, z
+
+def test_trace_levels():
+    # tracing the levels in threads must give exactly what trace gives
+    x, y, z = _contour_data()
+    mask = (np.random.rand(*z.shape) < 0.05).astype(np.int8)
+    levels = np.linspace(-1, 1, 9)
+    for m in None, mask:
+        c = _cntr.Cntr(x, y, z, m)
+        lines = [c.trace(level) for level in levels]
+        polys = [c.trace(lower, upper)
+                 for lower, upper in zip(levels[:-1], levels[1:])]
+        for threads in 1, 3, 16:
+            for expected, result in [
+                    (lines, c.trace_levels(levels, threads=threads)),
+                    (polys, c.trace_levels(levels[:-1], levels[1:],
+                                           threads=threads))]:
+                assert len(result) == len(expected)
+                for nlist0, nlist1 in zip(expected, result):
+                    assert len(nlist0) == len(nlist1)
+                    for a0, a1 in zip(nlist0, nlist1):
+                        assert a0.dtype == a1.dtype
+                        assert_array_equal(a0, a1)
+    assert c.trace_levels([], threads=4) == []
+
+def test_contour_threads():
+    x, y, z = _contour_data()
+    z = ma.masked_greater(z, 1.2)
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    for contour in ax.contour, ax.contourf:
+        cs1 = contour(x, y, z, 12, threads=1)
+        cs4 = contour(x, y, z, 12, threads=4)
+        for segs1, segs4 in zip(cs1.allsegs, cs4.allsegs):
+            assert len(segs1) == len(segs4)
+            for seg1, seg4 in zip(segs1, segs4):
+                assert_array_equal(seg1, seg4)
+
+def test_set_z():
+    # contouring new values on the same grid must give what contouring
+    # them from scratch gives
+    x, y, z0 = _contour_data()
+    z1 = ma.masked_greater(z0[::-1] * 1.5, 1.2)
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    for contour in ax.contour, ax.contourf:
+        cs = contour(x, y, z0, 12)
+        cs.set_z(z1)
+        expected = contour(x, y, z1, 12)
+        assert_array_equal(cs.levels, expected.levels)
+        assert len(cs.collections) == len(expected.collections)
+        for segs, esegs in zip(cs.allsegs, expected.allsegs):
+            assert len(segs) == len(esegs)
+            for seg, eseg in zip(segs, esegs):
+                assert_array_equal(seg, eseg)
+
+        levels = cs.levels
+        cs.set_z(z0 * 3, freeze_levels=True)
+        assert_array_equal(cs.levels, levels)
+
+def test_label_scores_all():
+    # scoring the label positions on many contours at once must give
+    # what scoring them one by one gives
+    x, y, z = _contour_data()
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    cs = ax.contour(x, y, z, 12)
+    trans = ax.transData
+    for lw in 0.5, 7, 30.5:
+        slcs = [trans.transform(path.vertices)
+                for col in cs.collections for path in col.get_paths()]
+        for scores, slc in zip(cs._label_scores_all(slcs, lw), slcs):
+            for a0, a1 in zip(scores, cs._label_scores(slc, lw)):
+                assert_array_equal(a0, a1)
+
+def test_clabel_spacing():
+    # a label is at least 1.2 label widths from the labels placed
+    # before it whenever a candidate position on its contour is
+    x, y, z = _contour_data(40)
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    cs = ax.contour(x, y, z, 5)
+    cs.clabel(fmt='%1.1f', fontsize=6, inline=False)
+    xy = np.array(cs.labelXYs)
+    assert len(xy) == len(cs.labelTexts) > 1
+
+    # the contours in screen coordinates, as labels() sees them
+    slcs = []
+    for con in cs.collections:
+        for path in con.get_paths():
+            slc = ax.transData.transform(path.vertices)
+            if mlab.is_closed_polygon(path.vertices):
+                slc = np.r_[slc, slc[1:2]]
+            slcs.append(slc)
+
+    spaced = 0
+    for k, label in enumerate(cs.labelTexts):
+        lw = cs.get_label_width(label.get_text(), cs.labelFmt, 6)
+        r2 = (1.2 * lw) ** 2
+        slc = [slc for slc in slcs if (slc == xy[k]).all(axis=1).any()][0]
+        dist, XX, YY, ysize = cs._label_scores(slc, lw)
+        cand = np.column_stack((XX[:, ysize // 2], YY[:, ysize // 2]))
+        d2 = ((cand[:, np.newaxis] - xy[:k]) ** 2).sum(axis=-1)
+        if k and (d2 >= r2).all(axis=1).any():
+            assert (((xy[:k] - xy[k]) ** 2).sum(axis=-1) >= r2).all()
+            spaced += 1
+    assert spaced
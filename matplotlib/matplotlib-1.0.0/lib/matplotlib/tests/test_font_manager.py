@@ -0,0 +1,82 @@
+import os
+import copy
+import shutil
+import tempfile
+from nose.tools import assert_equal
+import matplotlib.font_manager as font_manager
+from matplotlib.font_manager import FontProperties, FontLookupCache
+
+def _fresh_manager():
+    fm = copy.copy(font_manager.fontManager)
+    fm.ttf_lookup_cache = {}
+    fm.afm_lookup_cache = {}
+    fm.lookup_store = None
+    return fm
+
+def test_family_index_matches_full_scan():
+    indexed = _fresh_manager()
+    scan = _fresh_manager()
+    # score every font, as findfont did before the family index
+    def all_fonts(families, fontext):
+        if fontext == 'afm':
+            return scan.afmlist
+        return scan.ttflist
+    scan._family_candidates = all_fonts
+    props = [FontProperties(family=family, style=style, weight=weight)
+             for family in ('sans-serif', 'serif', 'monospace', 'cursive',
+                            'Bitstream Vera Sans', 'Helvetica',
+                            'no such family')
+             for style in ('normal', 'italic')
+             for weight in ('normal', 'bold')]
+    for fontext in 'ttf', 'afm':
+        for prop in props:
+            assert_equal(indexed.findfont(prop, fontext),
+                         scan.findfont(prop, fontext))
+
+def test_lookup_cache_round_trip():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(tmpdir, 'fontLookup.cache')
+        cache = FontLookupCache(fname, ('sig', 1), batch=2)
+        cache.set('a', '/fonts/a.ttf')
+        # written once a batch is pending, or on flush
+        assert not os.path.exists(fname)
+        cache.set('b', '/fonts/b.ttf')
+        assert os.path.exists(fname)
+        cache.set('c', '/fonts/c.ttf')
+        cache.flush()
+
+        other = FontLookupCache(fname, ('sig', 1))
+        for key in 'abc':
+            assert_equal(other.get(key), '/fonts/%s.ttf' % key)
+        # writes merge with what other processes stored
+        other.set('d', '/fonts/d.ttf')
+        other.flush()
+        assert_equal(FontLookupCache(fname, ('sig', 1)).get('a'),
+                     '/fonts/a.ttf')
+
+        # a new signature invalidates the cache
+        changed = FontLookupCache(fname, ('sig', 2))
+        assert_equal(changed.get('a'), None)
+        changed.set('e', '/fonts/e.ttf')
+        changed.flush()
+        assert_equal(FontLookupCache(fname, ('sig', 2)).get('a'), None)
+    finally:
+        shutil.rmtree(tmpdir)
+
+def test_font_dir_mtimes_subdirectories():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        subdir = os.path.join(tmpdir, 'vendor', 'family')
+        os.makedirs(subdir)
+        before = font_manager.font_dir_mtimes([tmpdir])
+        assert subdir in dict(before)
+        # a font added in a subdirectory changes the signature
+        open(os.path.join(subdir, 'new.ttf'), 'w').close()
+        mtime = os.stat(subdir).st_mtime + 10
+        os.utime(subdir, (mtime, mtime))
+        after = font_manager.font_dir_mtimes([tmpdir])
+        assert before != after
+        assert_equal(dict(after)[subdir], mtime)
+    finally:
+        shutil.rmtree(tmpdir)
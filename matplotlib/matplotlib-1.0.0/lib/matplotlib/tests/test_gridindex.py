@@ -0,0 +1,52 @@
+import numpy as np
+from nose.tools import assert_equal
+from matplotlib.gridindex import GridIndex, PointGrid, point_extents, \
+     segment_extents
+
+def brute_query(extents, x0, y0, x1, y1):
+    e = extents
+    return np.nonzero((e[:, 0] <= x1) & (e[:, 2] >= x0) &
+                      (e[:, 1] <= y1) & (e[:, 3] >= y0))[0]
+
+def test_query_matches_brute_force():
+    np.random.seed(0)
+    x = np.random.randn(5000).cumsum()
+    y = np.random.randn(5000).cumsum()
+    x[::97] = np.nan
+    for extents in (point_extents(x, y, np.random.rand(5000)),
+                    segment_extents(x, y)):
+        index = GridIndex(extents)
+        for cx, cy, r in np.random.randn(50, 3) * 20:
+            r = abs(r)
+            assert np.all(index.query(cx - r, cy - r, cx + r, cy + r) ==
+                          brute_query(extents, cx - r, cy - r, cx + r, cy + r))
+
+def test_nearest():
+    np.random.seed(1)
+    xy = np.random.rand(2000, 2) * 100
+    index = GridIndex(point_extents(xy[:, 0], xy[:, 1]))
+    for cx, cy in np.random.rand(50, 2) * 120 - 10:
+        d = ((xy - (cx, cy))**2).sum(axis=1)
+        i, dmin = index.nearest(cx, cy)
+        assert_equal(d[i], d.min())
+        assert np.allclose(dmin, d.min())
+
+def test_empty():
+    index = GridIndex(point_extents([np.nan], [0]))
+    assert_equal(len(index.query(-1, -1, 1, 1)), 0)
+    assert_equal(index.nearest(0, 0), (None, None))
+
+def test_point_grid():
+    np.random.seed(2)
+    xy = np.random.rand(500, 2) * 100
+    grid = PointGrid(7)
+    grid.extend(xy[:250])
+    grid.add(np.nan, 3)
+    for x, y in xy[250:]:
+        grid.add(x, y)
+    assert_equal(grid.n, 501)
+    for cx, cy, r in np.random.rand(50, 3) * (120, 120, 40) - (10, 10, 0):
+        inside = ((xy[:, 0] >= cx - r) & (xy[:, 0] <= cx + r) &
+                  (xy[:, 1] >= cy - r) & (xy[:, 1] <= cy + r))
+        found = grid.query(cx - r, cy - r, cx + r, cy + r)
+        assert_equal(sorted(map(tuple, found)), sorted(map(tuple, xy[inside])))
@@ -95,6 +95,90 @@ def test_imsave():
 
     assert_array_equal(arr_dpi1, arr_dpi100)
 
+def test_column_ring_image():
+    from matplotlib.image import ColumnRingImage
+    from matplotlib.colors import Normalize
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    for scroll in True, False:
+        im = ColumnRingImage(ax, 3, 5, scroll=scroll, norm=Normalize(0, 9))
+        ax.add_image(im)
+        C = np.arange(21.).reshape((3, 7)) % 10
+        im.append_columns(C[:, :4])
+        im.append_columns(C[:, 4:])
+        expected = im.to_rgba(C[:, 2:], bytes=True)
+        if not scroll:
+            # columns 5 and 6 wrapped around to the left
+            expected = np.concatenate((expected[:, 3:], expected[:, :3]),
+                                      axis=1)
+        assert_array_equal(im.get_array(), expected)
+        fig.canvas.draw()
+        bbox = im.get_update_bbox()
+        assert bbox.width > 0 and bbox.height > 0
+
+def test_resize_threads():
+    from matplotlib import _image
+    np.random.seed(0)
+    A = (np.random.rand(50, 70, 4) * 255).astype(np.uint8)
+    for interpolation in _image.NEAREST, _image.BICUBIC, _image.HANNING:
+        for resample in False, True:
+            out = []
+            for threads in 1, 4:
+                im = _image.frombyte(A, 0)
+                im.set_interpolation(interpolation)
+                im.set_resample(resample)
+                im.apply_rotation(20)
+                im.apply_scaling(5.3, 4.1)
+                im.resize(400, 300, threads=threads)
+                out.append(im.as_rgba_str())
+            assert out[0] == out[1]
+
+def test_rgba_cache():
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    im = ax.imshow(np.arange(100.).reshape((10, 10)))
+    fig.canvas.draw()
+    rgba = im._rgbacache
+    ax.set_xlim(2, 5)
+    fig.canvas.draw()
+    assert im._rgbacache is rgba
+    im.norm.vmin = 50
+    fig.canvas.draw()
+    assert im._rgbacache is not rgba
+    assert_array_equal(im._rgbacache[:5], im.to_rgba(np.zeros((5, 10)),
+                                                     bytes=True))
+    im.set_alpha(0.5)
+    fig.canvas.draw()
+    assert np.all(im._rgbacache[..., 3] == 127)
+
+def test_tiled_image():
+    from matplotlib.image import ImagePyramid, TiledImage
+    A = np.arange(300*500.).reshape((300, 500))
+    A[0, 0] = np.nan
+    pyramid = ImagePyramid(A, tilesize=64)
+    assert_array_equal([L.shape for L in pyramid.levels],
+                       [(300, 500), (150, 250), (75, 125), (38, 63)])
+    assert_array_equal(pyramid.levels[1][0, :2],
+                       [(1 + 500 + 501) / 3., (2 + 3 + 502 + 503) / 4.])
+    assert_array_equal(pyramid.get_range(), (1, 300*500 - 1))
+    assert pyramid.get_level(1) == 0
+    assert pyramid.get_level(5) == 2
+
+    fig = plt.figure(figsize=(2, 2), dpi=50)
+    ax = fig.add_subplot(111)
+    im = TiledImage(ax, pyramid)
+    ax.add_image(im)
+    im.set_extent(im.get_extent())
+    fig.canvas.draw()
+    # the axes are about 77 pixels high and show 300 rows
+    assert im._window[0] == 1
+    ntiles = len(im._tiles)
+    ax.set_xlim(0, 50)
+    ax.set_ylim(0, 50)
+    fig.canvas.draw()
+    assert im._window[0] == 0
+    assert len(im._tiles) == ntiles + 1
+
 
 if __name__=='__main__':
     import nose
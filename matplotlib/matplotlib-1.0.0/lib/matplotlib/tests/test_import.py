@@ -0,0 +1,46 @@
+import subprocess
+import sys
+from nose.tools import assert_equal
+
+# modules that importing pyplot with a non-interactive backend should
+# leave for first use
+LAZY_MODULES = ['matplotlib.mathtext', 'matplotlib.pyparsing',
+                'matplotlib.texmanager', 'matplotlib.dates', 'dateutil',
+                'pytz', 'matplotlib.delaunay', 'matplotlib._tri']
+
+_script = """
+import sys
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+print ' '.join([m for m in %r if m in sys.modules])
+"""
+
+def _run(script):
+    pipe = subprocess.Popen([sys.executable, '-c', script],
+                            stdout=subprocess.PIPE)
+    output = pipe.communicate()[0]
+    assert_equal(pipe.returncode, 0)
+    return (output.split('\n') + [''])[:2]
+
+def test_pyplot_import_is_lazy():
+    # in a new process, as other tests import these modules
+    loaded = _run(_script % LAZY_MODULES)[0]
+    assert_equal(loaded.split(), [])
+
+_date_script = """
+import sys, datetime
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+import matplotlib.units as munits
+print 'matplotlib.dates' in sys.modules
+converter = munits.registry.get_converter(datetime.date(2010, 1, 1))
+print converter is not None and 'matplotlib.dates' in sys.modules
+"""
+
+def test_lazy_date_converter():
+    # in a new process, as other tests may have imported dates already
+    before, after = _run(_date_script)
+    assert_equal(before.strip(), 'False')
+    assert_equal(after.strip(), 'True')
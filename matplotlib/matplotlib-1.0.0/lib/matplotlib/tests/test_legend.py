@@ -0,0 +1,78 @@
+import numpy as np
+from nose.tools import assert_equal
+import matplotlib.pyplot as plt
+import matplotlib.gridindex as gridindex
+from matplotlib.legend import _LineOccupancy
+from matplotlib.path import Path
+from matplotlib.transforms import Bbox
+
+def test_line_occupancy():
+    np.random.seed(0)
+    t = np.linspace(0, 1, 20000)
+    xy = np.column_stack((t * 400 + 50, 150 + 100 * np.sin(12 * t) +
+                          np.random.randn(len(t))))
+    xy[5000:5100] = np.nan
+    region = Bbox.from_bounds(40, 20, 420, 260)
+    occupancy = _LineOccupancy(xy, region, 4.0)
+    assert len(occupancy.path.vertices) < len(xy) // 2
+    path = Path(xy)
+    for x0, y0, w, h in np.random.rand(200, 4) * (420, 260, 120, 80):
+        bbox = Bbox.from_bounds(x0 + 40, y0 + 20, w + 1, h + 1)
+        inside = ((xy[:, 0] > bbox.x0) & (xy[:, 0] < bbox.x1) &
+                  (xy[:, 1] > bbox.y0) & (xy[:, 1] < bbox.y1))
+        if occupancy.count_inside(bbox):
+            assert inside.any()
+        if inside.any():
+            assert occupancy.intersects_bbox(bbox)
+
+def test_line_occupancy_small_boxes():
+    # boxes about a cell across mostly cover cells in part, where
+    # the answer must still be that of the full path
+    np.random.seed(1)
+    t = np.linspace(0, 1, 20000)
+    xy = np.column_stack((t * 400 + 50, 150 + 100 * np.sin(12 * t) +
+                          3 * np.random.randn(len(t))))
+    xy[5000:5100] = np.nan
+    region = Bbox.from_bounds(40, 20, 420, 260)
+    occupancy = _LineOccupancy(xy, region, 4.0)
+    path = Path(xy)
+    hits = 0
+    for x0, y0, w, h in np.random.rand(500, 4) * (410, 250, 8, 8):
+        bbox = Bbox.from_bounds(x0 + 40, y0 + 20, w + 0.1, h + 0.1)
+        expected = path.intersects_bbox(bbox)
+        assert_equal(occupancy.intersects_bbox(bbox), expected)
+        hits += expected
+    assert 0 < hits < 500
+
+    # a run of vertices in one cell: a vertex in the box, a segment
+    # crossing it, and the run's chord crossing a box the line misses,
+    # with and without the box inside the line as a polygon
+    xy = np.array([(0.5, 1.0), (2.0, 3.5), (3.5, 1.0), (20.5, 20.5)])
+    occupancy = _LineOccupancy(xy, Bbox.from_bounds(0, 0, 40, 40), 4.0)
+    for bounds, expected in [((1.8, 3.2, 0.4, 0.4), True),
+                             ((1.2, 2.2, 0.2, 0.2), True),
+                             ((1.8, 0.8, 0.4, 0.4), False),
+                             ((1.9, 1.5, 0.2, 0.2), False)]:
+        bbox = Bbox.from_bounds(*bounds)
+        assert_equal(Path(xy).intersects_bbox(bbox), expected)
+        assert_equal(occupancy.intersects_bbox(bbox), expected)
+
+def test_best_location_large_line():
+    # a line big enough for _LineOccupancy must put the legend where
+    # its full path does
+    x = np.linspace(0, 1, 50000)
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    ax.plot(x, np.sin(5 * x), label='sin')
+    ax.plot(x, 0.3 * x - 0.8, label='line')
+    leg = ax.legend(loc='best')
+    fig.canvas.draw()
+    renderer = fig.canvas.get_renderer()
+    min_items = gridindex.min_items
+    try:
+        found = leg._find_best_position(100, 40, renderer)
+        assert leg._occupancy_cache
+        gridindex.min_items = len(x) + 1
+        assert_equal(leg._find_best_position(100, 40, renderer), found)
+    finally:
+        gridindex.min_items = min_items
@@ -0,0 +1,95 @@
+import numpy as np
+from nose.tools import assert_equal
+import matplotlib.lines as mlines
+
+def test_minmax_pyramid_matches_full_scan():
+    np.random.seed(0)
+    y = np.round(np.random.randn(100000).cumsum(), 1)
+    i0, i1 = 1234, 98765
+    bounds = np.linspace(i0, i1, 31).astype(int)[1:-1]
+
+    pyramid = mlines._MinMaxPyramid(y)
+    ind = pyramid.candidates(i0, i1, bounds)
+    assert len(ind) < (i1 - i0)
+    actual = mlines._column_extrema(ind, y[ind],
+                                    bounds.searchsorted(ind, 'right'))
+
+    full = np.arange(i0, i1)
+    expected = mlines._column_extrema(full, y[full],
+                                      bounds.searchsorted(full, 'right'))
+    assert np.all(actual == expected)
+
+def test_minmax_pyramid_nonfinite():
+    y = np.arange(1000, dtype=float)
+    y[10] = np.nan
+    assert_equal(mlines._MinMaxPyramid(y).valid, False)
+
+def test_append_data():
+    line = mlines.Line2D([0, 1], [0, 1])
+    x = np.arange(2, 1000, dtype=float)
+    for i in range(0, len(x), 7):
+        line.append_data(x[i:i+7], -x[i:i+7])
+    expected = np.concatenate(([0, 1], x))
+    assert np.all(line.get_xdata() == expected)
+    assert np.all(line.get_ydata()[2:] == -x)
+    assert np.all(line.get_path().vertices == line.get_xydata())
+
+def test_append_data_unsorted():
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.add_subplot(111)
+    line, = ax.plot(np.arange(200.), np.zeros(200))
+    line.recache_always()
+    assert line._xsorted and line._subslice
+
+    before = line.get_xdata()
+    line.append_data([300, 250], [5, -5])
+    assert not line._xsorted and not line._subslice
+    assert np.all(ax.dataLim.extents == (0, -5, 300, 5))
+    line.append_data([400], [1])
+    assert not line._xsorted
+    assert np.all(ax.dataLim.extents == (0, -5, 400, 5))
+
+    # the data handed out does not follow later appends, and writing
+    # to it does not change the line
+    assert_equal(len(before), 200)
+    x = line.get_xdata()
+    y = line.get_ydata()
+    line.append_data([500], [2])
+    assert_equal(len(x), 203)
+    assert_equal(x[-1], 400)
+    x[:] = -1
+    y[:] = -1
+    assert_equal(line.get_xdata()[0], 0)
+    assert_equal(line.get_ydata()[-1], 2)
+    assert np.all(line.get_path().vertices[:, 0] >= 0)
+
+def test_contains_indexed():
+    from matplotlib import gridindex
+    from matplotlib.figure import Figure
+    from matplotlib.backend_bases import MouseEvent
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    np.random.seed(0)
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    x = np.random.randn(5000).cumsum()
+    line, = ax.plot(x)
+    points, = ax.plot(x[::-1], 'o')
+    canvas.draw()
+
+    for xpix, ypix in np.random.rand(20, 2) * fig.bbox.size:
+        event = MouseEvent('motion_notify_event', canvas, xpix, ypix)
+        for artist in line, points:
+            artist._hit_cache = None
+            indexed = artist.contains(event)[1]['ind']
+            min_items = gridindex.min_items
+            gridindex.min_items = len(x) + 1
+            try:
+                artist._hit_cache = None
+                plain = artist.contains(event)[1]['ind']
+            finally:
+                gridindex.min_items = min_items
+            assert np.all(np.sort(indexed) == np.sort(plain))
@@ -25,6 +25,55 @@ def test_recarray_csv_roundtrip():
     assert np.allclose( expected['y'], actual['y'] )
     assert np.allclose( expected['t'], actual['t'] )
 
+def test_csv2rec_fast():
+    import os, shutil
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(tmpdir, 'data.csv')
+        fd = open(fname, 'w')
+        fd.write('# a comment\n'
+                 'Date,Count,Price,Flag,Name\n'
+                 '2010-01-03,3,1.5,True,a b\n'
+                 '2010-02-28,,2,False,\n'
+                 '# another\n'
+                 '2011-12-31,-2,1e3,True,q\n')
+        fd.close()
+        expected = mlab.csv2rec(fname)
+        actual = mlab.csv2rec(fname, fast=True)
+        assert actual.dtype.names == expected.dtype.names
+        for name in 'date', 'count', 'price', 'name':
+            assert list(actual[name]) == list(expected[name])
+
+        chunks = list(mlab.csv2rec_chunks(fname, chunksize=1, checkrows=1))
+        assert [len(c) for c in chunks] == [1, 1, 1]
+        assert [c.count[0] for c in chunks] == [3, -1, -2]
+
+        cached = mlab.csv2rec(fname, fast=True, cache=True)
+        assert os.path.exists(fname + '.npy')
+        cached = mlab.csv2rec(fname, fast=True, cache=True)
+        assert list(cached.price) == list(actual.price)
+        assert list(cached.date) == list(actual.date)
+    finally:
+        shutil.rmtree(tmpdir)
+
+def test_rec2csv_rec2txt_chunks():
+    import cStringIO
+    np.random.seed(0)
+    r = np.rec.fromarrays([np.array(['ab', 'c'])[np.random.randint(0, 2, 50)],
+                           np.random.randn(50), np.arange(50) - 25],
+                          names='name,x,i')
+    out = cStringIO.StringIO()
+    mlab.rec2txt(r, precision=2, fname=out, chunksize=7)
+    assert out.getvalue() == mlab.rec2txt(r, precision=2)
+
+    fd = tempfile.TemporaryFile(suffix='csv')
+    mlab.rec2csv(r, fd, chunksize=7)
+    fd.seek(0)
+    actual = mlab.csv2rec(fd)
+    assert list(actual.name) == list(r.name)
+    assert np.all(actual.x == r.x)
+    assert np.all(actual.i == r.i)
+
 @raises(ValueError)
 def test_rec2csv_bad_shape():
     bad = np.recarray((99,4),[('x',np.float),('y',np.float)])
@@ -55,3 +104,135 @@ def test_prctile():
     for pi, expectedi in zip(p,expected):
         actuali = mlab.prctile(ob1,pi)
         assert np.allclose( expectedi, actuali )
+
+def test_bin_reducer():
+    np.random.seed(0)
+    ind = np.random.randint(-2, 12, 1000)
+    values = np.random.randn(1000)
+    for func in (np.mean, np.sum, np.min, np.max, np.median, len, np.std,
+                 np.var, np.ptp):
+        reducer = mlab.BinReducer(10, func)
+        for start in range(0, 1000, 300):
+            reducer.add(ind[start:start+300], values[start:start+300])
+        expected = [func(values[ind==i]) for i in range(10)]
+        assert np.allclose(reducer.result(), expected)
+
+def test_rec_groupby():
+    np.random.seed(0)
+    r = np.rec.fromarrays([np.random.randint(0, 4, 500),
+                           np.array(['a', 'b', 'c'])[np.random.randint(0, 3, 500)],
+                           np.random.randn(500),
+                           np.random.randint(-50, 50, 500)],
+                          names='key,code,x,i')
+    funcs = (len, np.sum, np.mean, np.min, np.max, np.median, np.std, np.ptp)
+    stats = [(attr, func, '%s%d' % (attr, n))
+             for attr in ('x', 'i') for n, func in enumerate(funcs)]
+    g = mlab.rec_groupby(r, ('code', 'key'), stats)
+    keys = sorted(set(zip(r.code, r.key)))
+    assert zip(g.code, g.key) == keys
+    for row, (code, key) in zip(g, keys):
+        group = r[(r.code == code) & (r.key == key)]
+        for attr, func, outname in stats:
+            assert np.allclose(row[outname], func(group[attr]))
+
+def test_rec_groupby_dates():
+    # object keys, like the dates of csv2rec, can not be mergesorted by
+    # old numpy versions
+    import datetime
+    days = [datetime.date(2010, 1, d) for d in (5, 3, 5, 1, 3, 5)]
+    r = np.rec.fromarrays([days, [1., 2., 3., 4., 5., 6.]], names='date,x')
+    assert r.date.dtype.kind == 'O'
+    g = mlab.rec_groupby(r, ('date',), [('x', np.sum, 'total'),
+                                        ('x', len, 'n')])
+    assert list(g.date) == [datetime.date(2010, 1, d) for d in (1, 3, 5)]
+    assert list(g.total) == [4., 7., 10.]
+    assert list(g.n) == [1, 2, 3]
+
+def test_rec_join():
+    r1 = np.rec.fromarrays([[3, 1, 1, 2], [13, 10, 11, 12]], names='k,a')
+    r2 = np.rec.fromarrays([[4, 1, 3, 1], [.4, .1, .3, .2]], names='k,b')
+    r = mlab.rec_join('k', r1, r2)
+    assert r.dtype.names == ('k', 'a', 'b')
+    assert zip(r.k, r.a, r.b) == [(1, 10, .1), (1, 10, .2), (1, 11, .1),
+                                  (1, 11, .2), (3, 13, .3)]
+    r = mlab.rec_join('k', r1, r2, jointype='leftouter')
+    assert zip(r.k, r.a) == [(1, 10), (1, 10), (1, 11), (1, 11), (2, 12),
+                             (3, 13)]
+    r = mlab.rec_join('k', r1, r2, jointype='outer', defaults={'a': -1})
+    assert list(r.k) == [1, 1, 1, 1, 2, 3, 4]
+    assert list(r.a[-3:]) == [12, 13, -1]
+    assert list(r.b[-3:]) == [0, .3, .4]
+
+def test_join_dates():
+    import datetime
+    d = [datetime.date(2010, 1, i) for i in range(1, 7)]
+    r1 = np.rec.fromarrays([[d[3], d[1], d[2]], [3., 1., 2.]], names='date,a')
+    r2 = np.rec.fromarrays([[d[4], d[2], d[3]], [40., 20., 30.]],
+                           names='date,b')
+    assert r1.date.dtype.kind == 'O'
+    r = mlab.rec_join('date', r1, r2)
+    assert zip(r.date, r.a, r.b) == [(d[2], 2., 20.), (d[3], 3., 30.)]
+    r = mlab.rec_join('date', r1, r2, jointype='outer')
+    assert list(r.date) == d[1:5]
+    r3 = np.rec.fromarrays([r2.date, r2.b], names='date,a')
+    r = mlab.recs_join('date', 'a', [r1, r3], missing=-1.)
+    assert list(r.date) == d[1:5]
+    assert list(r.a0) == [1., 2., 3., -1.]
+    assert list(r.a1) == [-1., 20., 30., 40.]
+
+def test_recs_join():
+    r0 = np.rec.fromarrays([[1, 2, 4], [1., 2., 4.]], names='date,close')
+    r1 = np.rec.fromarrays([[2, 3, 4], [20., 30., 40.]], names='date,close')
+    r = mlab.recs_join('date', 'close', [r0, r1], missing=-1.)
+    assert r.dtype.names == ('date', 'close0', 'close1')
+    assert zip(r.date, r.close0, r.close1) == [(1, 1, -1), (2, 2, 20),
+                                               (3, -1, 30), (4, 4, 40)]
+    r = mlab.recs_join('date', 'close', [r0, r1], jointype='inner')
+    assert list(r.date) == [2, 4]
+
+def test_spectral_batches():
+    # the segments are transformed in batches; a tiny batch size must
+    # give the same spectra as one batch
+    np.random.seed(0)
+    x = np.random.randn(4000) + np.linspace(0, 2, 4000)
+    y = np.random.randn(4000)
+    batch_bytes = mlab.spectral_batch_bytes
+    for detrend in mlab.detrend_none, mlab.detrend_mean, mlab.detrend_linear:
+        kwargs = dict(NFFT=128, noverlap=32, detrend=detrend)
+        expected = [mlab.psd(x, **kwargs), mlab.csd(x, y, **kwargs),
+                    mlab.specgram(x, **kwargs)]
+        mlab.spectral_batch_bytes = 16 * 128 * 3
+        try:
+            actual = [mlab.psd(x, **kwargs), mlab.csd(x, y, **kwargs),
+                      mlab.specgram(x, **kwargs)]
+        finally:
+            mlab.spectral_batch_bytes = batch_bytes
+        for e, a in zip(expected, actual):
+            for e_arr, a_arr in zip(e, a):
+                assert np.allclose(e_arr, a_arr)
+
+    # detrending all segments at once matches detrending one at a time
+    segments = mlab._stride_windows(x, 128, 96)
+    for detrend in mlab.detrend_mean, mlab.detrend_linear:
+        assert np.allclose(mlab._detrend_segments(segments, detrend),
+                           [detrend(s) for s in segments])
+
+def test_spectrogram_stream():
+    # feeding a signal in blocks gives the columns of its spectrogram
+    np.random.seed(0)
+    x = np.random.randn(5000)
+    for sides, signal in [('default', x), ('twosided', x),
+                          ('default', x + 1j*x[::-1])]:
+        kwargs = dict(NFFT=256, Fs=10, noverlap=100, sides=sides,
+                      detrend=mlab.detrend_mean)
+        Pxx, freqs, t = mlab.specgram(signal, **kwargs)
+        stream = mlab.SpectrogramStream(**kwargs)
+        columns, times = [], []
+        for start in range(0, len(signal), 333):
+            Pxx_new, t_new = stream.add(signal[start:start+333])
+            assert Pxx_new.shape == (len(freqs), len(t_new))
+            columns.append(Pxx_new)
+            times.append(t_new)
+        assert np.allclose(stream.freqs, freqs)
+        assert np.allclose(np.concatenate(columns, axis=1), Pxx)
+        assert np.allclose(np.concatenate(times), t)
@@ -74,3 +74,21 @@ def test_multiline():
     ax.set_yticks([])
 
     fig.savefig('multiline')
+
+def test_shared_layout_cache():
+    import matplotlib.text as mtext
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    texts = [ax.text(0.1 * i, 0.5, "same", color='rgb'[i % 3])
+             for i in range(10)]
+    fig.canvas.draw()
+    renderer = fig.canvas.get_renderer()
+    misses = mtext.layout_cache.misses
+    hits = mtext.layout_cache.hits
+    extents = [t.get_window_extent(renderer) for t in texts]
+    assert mtext.layout_cache.misses == misses
+    assert mtext.layout_cache.hits == hits + len(texts)
+    widths = [e.width for e in extents]
+    assert widths == [widths[0]] * len(texts)
+    # the position still moves the extent
+    assert len(set([e.x0 for e in extents])) == len(texts)
@@ -10,7 +10,7 @@ from matplotlib import cbook
 from matplotlib import rcParams
 import matplotlib.artist as artist
 from matplotlib.artist import Artist
-from matplotlib.cbook import is_string_like, maxdict
+from matplotlib.cbook import is_string_like
 from matplotlib import docstring
 from matplotlib.font_manager import FontProperties
 from matplotlib.patches import bbox_artist, YAArrow, FancyBboxPatch, \
@@ -97,6 +97,26 @@ docstring.interpd.update(Text =  """
 
 
 
+#: The layouts of texts, shared by all the :class:`Text` instances
+#: (tick labels, :class:`~matplotlib.offsetbox.TextArea` etc.) so
+#: that texts that differ only in position or color are laid out
+#: once.  Its size is the text.layout_cache_size rc setting; its
+#: *hits* and *misses* attributes count the lookups.
+layout_cache = cbook.LRUCache(rcParams['text.layout_cache_size'])
+
+def _renderer_key(renderer):
+    """
+    What, beside the dpi and the font, the text metrics of *renderer*
+    depend on.
+    """
+    return (type(renderer), type(getattr(renderer, '_renderer', None)),
+            rcParams['text.usetex'], rcParams['text.hinting'])
+
+def _cache_layout(key, value):
+    layout_cache.maxsize = rcParams['text.layout_cache_size']
+    layout_cache[key] = value
+
+
 # TODO : This function may move into the Text class as a method. As a
 # matter of fact, The information from the _get_textbox function
 # should be available during the Text._get_layout() call, which is
@@ -168,7 +188,6 @@ class Text(Artist):
         """
 
         Artist.__init__(self)
-        self.cached = maxdict(5)
         self._x, self._y = x, y
 
         if color is None: color = rcParams['text.color']
@@ -264,9 +283,12 @@ class Text(Artist):
         return the extent (bbox) of the text together with
         multile-alignment information. Note that it returns a extent
         of a rotated text when necessary.
+
+        The layouts are kept in :data:`layout_cache`.
         """
-        key = self.get_prop_tup()
-        if key in self.cached: return self.cached[key]
+        key = self._get_layout_key(renderer)
+        ret = layout_cache.get(key)
+        if ret is not None: return ret
 
         horizLayout = []
 
@@ -407,7 +429,34 @@ class Text(Artist):
         xs, ys = xys[:, 0], xys[:, 1]
 
         ret = bbox, zip(lines, whs, xs, ys)
-        self.cached[key] = ret
+        _cache_layout(key, ret)
+        return ret
+
+    def _get_layout_key(self, renderer):
+        """
+        Return a hashable tuple of what the layout of the text depends
+        on; unlike :meth:`get_prop_tup`, not its position or color.
+        """
+        return ('layout', self.get_text(), hash(self._fontproperties),
+                self.get_rotation(), self.get_rotation_mode(),
+                self._verticalalignment, self._horizontalalignment,
+                self._get_multialignment(), self._linespacing,
+                bool(self.get_path_effects()),
+                self.figure.dpi, _renderer_key(renderer))
+
+    def _get_text_width_height_descent(self, renderer, s, ismath):
+        """
+        Return what the get_text_width_height_descent method of
+        *renderer* returns for the string *s* in the font of this
+        text, keeping it in :data:`layout_cache`.
+        """
+        key = ('extent', s, hash(self._fontproperties), ismath,
+               self.figure.dpi, _renderer_key(renderer))
+        ret = layout_cache.get(key)
+        if ret is None:
+            ret = renderer.get_text_width_height_descent(
+                s, self._fontproperties, ismath=ismath)
+            _cache_layout(key, ret)
         return ret
 
     def set_path_effects(self, path_effects):
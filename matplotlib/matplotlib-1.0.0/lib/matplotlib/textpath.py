@@ -6,7 +6,9 @@ import matplotlib.font_manager as font_manager
 
 from matplotlib.ft2font import FT2Font, KERNING_DEFAULT, LOAD_NO_HINTING, LOAD_TARGET_LIGHT
 
-from matplotlib.mathtext import MathTextParser
+from matplotlib.cbook import LazyModule
+
+mathtext = LazyModule('matplotlib.mathtext')
 
 import matplotlib.dviread as dviread
 
@@ -24,7 +26,7 @@ class TextToPath(object):
         """
         Initialization
         """
-        self.mathtext_parser = MathTextParser('path')
+        self._mathtext_parser = None
         self.tex_font_map = None
 
         from matplotlib.cbook import maxdict
@@ -32,6 +34,13 @@ class TextToPath(object):
 
         self._texmanager = None
 
+    def _get_mathtext_parser(self):
+        # mathtext is only imported once math text is actually used
+        if self._mathtext_parser is None:
+            self._mathtext_parser = mathtext.MathTextParser('path')
+        return self._mathtext_parser
+    mathtext_parser = property(_get_mathtext_parser)
+
     def _get_font(self, prop):
         """
         find a ttf font.
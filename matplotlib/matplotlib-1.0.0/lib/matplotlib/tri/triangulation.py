@@ -1,7 +1,10 @@
-import matplotlib.delaunay as delaunay
-import matplotlib._tri as _tri
+from matplotlib.cbook import LazyModule
 import numpy as np
 
+# the compiled modules are only loaded once a triangulation is made
+delaunay = LazyModule('matplotlib.delaunay')
+_tri = LazyModule('matplotlib._tri')
+
 class Triangulation(object):
     """
     An unstructured triangular grid consisting of npoints points and
@@ -1,8 +1,10 @@
 from matplotlib.contour import ContourSet
 from matplotlib.tri.triangulation import Triangulation
-import matplotlib._tri as _tri
+from matplotlib.cbook import LazyModule
 import numpy as np
 
+_tri = LazyModule('matplotlib._tri')
+
 
 class TriContourSet(ContourSet):
     """
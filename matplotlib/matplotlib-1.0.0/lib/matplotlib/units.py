@@ -42,6 +42,7 @@ datetime objects
     units.registry[datetime.date] = DateConverter()
 
 """
+import datetime
 import numpy as np
 from matplotlib.cbook import iterable, is_numlike, is_string_like
 
@@ -113,11 +114,27 @@ class Registry(dict):
     def __init__(self):
         dict.__init__(self)
         self._cached = {}
+        self._deferred = {}
+
+    def register_deferred(self, classx, modname):
+        """
+        Note that importing module *modname* registers a converter for
+        *classx*, so that the module need only be imported when data of
+        that type is first seen.
+        """
+        self._deferred[classx] = modname
+
+    def get(self, classx, default=None):
+        modname = self._deferred.pop(classx, None)
+        if modname is not None and classx not in self:
+            __import__(modname)
+        return dict.get(self, classx, default)
 
     def get_converter(self, x):
         'get the converter interface instance for x, or None'
 
-        if not len(self): return None # nothing registered
+        if not len(self) and not self._deferred:
+            return None # nothing registered
         #DISABLED idx = id(x)
         #DISABLED cached = self._cached.get(idx)
         #DISABLED if cached is not None: return cached
@@ -142,3 +159,6 @@ class Registry(dict):
 
 
 registry = Registry()
+# matplotlib.dates registers these on import
+registry.register_deferred(datetime.date, 'matplotlib.dates')
+registry.register_deferred(datetime.datetime, 'matplotlib.dates')
@@ -1334,6 +1334,9 @@ def build_image(ext_modules, packages):
         include_dirs=numpy_inc_dirs,
         define_macros=defines
         )
+    if sys.platform != 'win32':
+        # Image.resize renders in threads
+        module.libraries.append('pthread')
 
     add_numpy_flags(module)
     add_agg_flags(module)
@@ -1372,6 +1375,9 @@ def build_contour(ext_modules, packages):
         include_dirs=numpy_inc_dirs,
         define_macros=defines
         )
+    if sys.platform != 'win32':
+        # Cntr.trace_levels traces in threads
+        module.libraries.append('pthread')
     add_numpy_flags(module)
     add_base_flags(module)
     ext_modules.append(module)
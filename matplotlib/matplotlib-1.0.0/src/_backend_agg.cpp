@@ -2136,6 +2136,44 @@ RendererAgg::buffer_rgba(const Py::Tuple& args)
 }
 
 
+Py_ssize_t
+RendererAgg::buffer_getreadbuffer(Py_ssize_t segment, void** ptrptr)
+{
+    //"expose the whole rendered RGBA buffer as a single segment";
+
+    _VERBOSE("RendererAgg::buffer_getreadbuffer");
+
+    if (segment != 0)
+    {
+        throw Py::SystemError("RendererAgg has only one buffer segment");
+    }
+    *ptrptr = (void*)pixBuffer;
+    return NUMBYTES;
+}
+
+
+Py_ssize_t
+RendererAgg::buffer_getwritebuffer(Py_ssize_t segment, void** ptrptr)
+{
+    _VERBOSE("RendererAgg::buffer_getwritebuffer");
+
+    return buffer_getreadbuffer(segment, ptrptr);
+}
+
+
+Py_ssize_t
+RendererAgg::buffer_getsegcount(Py_ssize_t* lenp)
+{
+    _VERBOSE("RendererAgg::buffer_getsegcount");
+
+    if (lenp)
+    {
+        *lenp = NUMBYTES;
+    }
+    return 1;
+}
+
+
 Py::Object
 RendererAgg::tostring_rgba_minimized(const Py::Tuple& args)
 {
@@ -2342,6 +2380,7 @@ void RendererAgg::init_type()
 {
     behaviors().name("RendererAgg");
     behaviors().doc("The agg backend extension module");
+    behaviors().supportBufferType();
 
     add_varargs_method("draw_path", &RendererAgg::draw_path,
                        "draw_path(gc, path, transform, rgbFace)\n");
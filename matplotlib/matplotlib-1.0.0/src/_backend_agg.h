@@ -189,6 +189,11 @@ public:
     Py::Object buffer_rgba(const Py::Tuple & args);
     Py::Object clear(const Py::Tuple & args);
 
+    // the buffer protocol, exposing pixBuffer without a copy
+    virtual Py_ssize_t buffer_getreadbuffer(Py_ssize_t segment, void** ptrptr);
+    virtual Py_ssize_t buffer_getwritebuffer(Py_ssize_t segment, void** ptrptr);
+    virtual Py_ssize_t buffer_getsegcount(Py_ssize_t* lenp);
+
     Py::Object copy_from_bbox(const Py::Tuple & args);
     Py::Object restore_region(const Py::Tuple & args);
     Py::Object restore_region2(const Py::Tuple & args);
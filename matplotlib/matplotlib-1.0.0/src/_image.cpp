@@ -10,6 +10,15 @@
 #include <fstream>
 #include <cmath>
 #include <cstdio>
+#include <algorithm>
+#include <vector>
+
+#ifdef _WIN32
+#define NOMINMAX
+#include <windows.h>
+#else
+#include <pthread.h>
+#endif
 
 #include "numpy/arrayobject.h"
 
@@ -318,12 +327,180 @@ Image::get_matrix(const Py::Tuple& args)
     return ret;
 }
 
+typedef agg::wrap_mode_reflect reflect_type;
+typedef agg::image_accessor_wrap<pixfmt, reflect_type, reflect_type> img_accessor_type;
+typedef agg::span_allocator<agg::rgba8> span_alloc_type;
+
+// What the bands of one resize share; all of it is only read while the
+// bands are rendered.
+struct resample_args
+{
+    agg::rendering_buffer* rbufIn;
+    agg::rendering_buffer* rbufOut;
+    double colsIn, rowsIn;
+    int colsOut, rowsOut;
+    const agg::trans_affine* srcMatrix;
+    const agg::trans_affine* imageMatrix;
+    const agg::image_filter_lut* filter;
+};
+
+typedef void (*resample_func)(const resample_args&, rasterizer&, int, int);
+
+// Rasterize the outline of the transformed image.  Agg raises a
+// Py::Exception if the outline is too complex, so this is done with the
+// GIL held, before the bands are rendered.
+static void
+rasterize_image_box(rasterizer& ras, const resample_args& a)
+{
+    ras.clip_box(0, 0, a.colsOut, a.rowsOut);
+
+    // the image path
+    agg::path_storage path;
+    path.move_to(0.0, 0.0);
+    path.line_to(a.colsIn, 0.0);
+    path.line_to(a.colsIn, a.rowsIn);
+    path.line_to(0.0, a.rowsIn);
+    path.close_polygon();
+    agg::conv_transform<agg::path_storage> imageBox(path, *a.srcMatrix);
+    ras.add_path(imageBox);
+    ras.rewind_scanlines();
+}
+
+// Like agg::render_scanlines, but only for the scanlines y0 to y1 - 1.
+// The rasterizer covers the whole output, so the rows of a band are
+// exactly those of a serial render.
+template<class Rasterizer, class Scanline, class Renderer>
+static void
+render_scanlines_band(Rasterizer& ras, Scanline& sl, Renderer& ren,
+                      int y0, int y1)
+{
+    if (ras.rewind_scanlines() &&
+        ras.navigate_scanline(std::max(y0, ras.min_y())))
+    {
+        sl.reset(ras.min_x(), ras.max_x());
+        ren.prepare();
+        while (ras.sweep_scanline(sl) && sl.y() < y1)
+        {
+            ren.render(sl);
+        }
+    }
+}
+
+// Resample the output rows y0 to y1 - 1 with a span_gen_type.  Apart
+// from the rasterizer of the band, everything that changes while
+// rendering is local, so the bands can be rendered by concurrent threads.
+template<class span_gen_type>
+static void
+resample_rows(const resample_args& a, rasterizer& ras, int y0, int y1)
+{
+    pixfmt pixf(*a.rbufOut);
+    renderer_base rb(pixf);
+    agg::scanline_u8 sl;
+
+    pixfmt pixfmtin(*a.rbufIn);
+    img_accessor_type ia(pixfmtin);
+    interpolator_type interpolator(*a.imageMatrix);
+    span_alloc_type sa;
+    span_gen_type sg;
+    sg.attach(ia);
+    sg.interpolator(interpolator);
+    sg.filter(*a.filter);
+    sg.filter_offset(0.5);
+
+    typedef agg::renderer_scanline_aa<renderer_base, span_alloc_type, span_gen_type> renderer_type;
+    renderer_type ri(rb, sa, sg);
+    render_scanlines_band(ras, sl, ri, y0, y1);
+}
+
+struct resample_band
+{
+    resample_func func;
+    const resample_args* args;
+    rasterizer ras;
+    int y0, y1;
+    bool failed;
+};
+
+static void
+resample_band_run(resample_band* band)
+{
+    try
+    {
+        band->func(*band->args, band->ras, band->y0, band->y1);
+    }
+    catch (...)
+    {
+        band->failed = true;
+    }
+}
+
+#ifdef _WIN32
+static DWORD WINAPI
+resample_band_thread(LPVOID p)
+#else
+static void*
+resample_band_thread(void* p)
+#endif
+{
+    resample_band_run(static_cast<resample_band*>(p));
+    return 0;
+}
+
+// Render the bands in a thread each, the first one in the calling
+// thread.  A band whose thread cannot be started is done by the calling
+// thread too.  Nothing here may use the Python API.
+static void
+resample_bands(resample_band** bands, int nbands)
+{
+#ifdef _WIN32
+    std::vector<HANDLE> threads(nbands, (HANDLE)NULL);
+    for (int i = 1; i < nbands; ++i)
+    {
+        threads[i] = CreateThread(NULL, 0, resample_band_thread, bands[i], 0, NULL);
+    }
+#else
+    std::vector<pthread_t> threads(nbands);
+    std::vector<bool> started(nbands, false);
+    for (int i = 1; i < nbands; ++i)
+    {
+        started[i] = pthread_create(&threads[i], NULL, resample_band_thread, bands[i]) == 0;
+    }
+#endif
+
+    resample_band_run(bands[0]);
+
+    for (int i = 1; i < nbands; ++i)
+    {
+#ifdef _WIN32
+        if (threads[i] != NULL)
+        {
+            WaitForSingleObject(threads[i], INFINITE);
+            CloseHandle(threads[i]);
+            continue;
+        }
+#else
+        if (started[i])
+        {
+            pthread_join(threads[i], NULL);
+            continue;
+        }
+#endif
+        resample_band_run(bands[i]);
+    }
+}
+
+// the smallest band worth a thread
+static const int min_band_rows = 32;
+
 char Image::resize__doc__[] =
-    "resize(width, height, norm=1, radius=4.0)\n"
+    "resize(width, height, norm=1, radius=4.0, threads=1)\n"
     "\n"
     "Resize the image to width, height using interpolation\n"
     "norm and radius are optional args for some of the filters and must be\n"
     "passed as kwargs\n"
+    "\n"
+    "With threads > 1, horizontal bands of the output are resampled by up\n"
+    "to that many threads, with the GIL released; the result is the same.\n"
     ;
 
 Py::Object
@@ -345,6 +522,12 @@ Image::resize(const Py::Tuple& args, const Py::Dict& kwargs)
         radius = Py::Float(kwargs["radius"]);
     }
 
+    int nthreads = 1;
+    if (kwargs.hasKey("threads"))
+    {
+        nthreads = Py::Int(kwargs["threads"]);
+    }
+
     if (bufferIn == NULL)
     {
         throw Py::RuntimeError("You must first load the image");
@@ -373,66 +556,24 @@ Image::resize(const Py::Tuple& args, const Py::Dict& kwargs)
     pixfmt pixf(*rbufOut);
     renderer_base rb(pixf);
     rb.clear(bg);
-    rasterizer ras;
-    agg::scanline_u8 sl;
-
-    ras.clip_box(0, 0, numcols, numrows);
 
     //srcMatrix *= resizingMatrix;
     //imageMatrix *= resizingMatrix;
     imageMatrix.invert();
-    interpolator_type interpolator(imageMatrix);
-
-    typedef agg::span_allocator<agg::rgba8> span_alloc_type;
-    span_alloc_type sa;
-    agg::rgba8 background(agg::rgba8(int(255*bg.r),
-                                     int(255*bg.g),
-                                     int(255*bg.b),
-                                     int(255*bg.a)));
-
-    // the image path
-    agg::path_storage path;
-    agg::int8u *bufferPad = NULL;
-    agg::rendering_buffer rbufPad;
 
-    double x0, y0, x1, y1;
-
-    x0 = 0.0;
-    x1 = colsIn;
-    y0 = 0.0;
-    y1 = rowsIn;
-
-    path.move_to(x0, y0);
-    path.line_to(x1, y0);
-    path.line_to(x1, y1);
-    path.line_to(x0, y1);
-    path.close_polygon();
-    agg::conv_transform<agg::path_storage> imageBox(path, srcMatrix);
-    ras.add_path(imageBox);
-
-    typedef agg::wrap_mode_reflect reflect_type;
-    typedef agg::image_accessor_wrap<pixfmt, reflect_type, reflect_type> img_accessor_type;
-
-    pixfmt pixfmtin(*rbufIn);
-    img_accessor_type ia(pixfmtin);
+    agg::image_filter_lut filter;
+    resample_func func = NULL;
     switch (interpolation)
     {
 
     case NEAREST:
-    {
-        typedef agg::span_image_filter_rgba_nn<img_accessor_type, interpolator_type> span_gen_type;
-        typedef agg::renderer_scanline_aa<renderer_base, span_alloc_type, span_gen_type> renderer_type;
-        span_gen_type sg(ia, interpolator);
-        renderer_type ri(rb, sa, sg);
-        agg::render_scanlines(ras, sl, ri);
-    }
-    break;
+        func = &resample_rows<agg::span_image_filter_rgba_nn<img_accessor_type, interpolator_type> >;
+        break;
 
     case HANNING:
     case HAMMING:
     case HERMITE:
     {
-        agg::image_filter_lut filter;
         switch (interpolation)
         {
         case HANNING:
@@ -447,19 +588,11 @@ Image::resize(const Py::Tuple& args, const Py::Dict& kwargs)
         }
         if (resample)
         {
-            typedef agg::span_image_resample_rgba_affine<img_accessor_type> span_gen_type;
-            typedef agg::renderer_scanline_aa<renderer_base, span_alloc_type, span_gen_type> renderer_type;
-            span_gen_type sg(ia, interpolator, filter);
-            renderer_type ri(rb, sa, sg);
-            agg::render_scanlines(ras, sl, ri);
+            func = &resample_rows<agg::span_image_resample_rgba_affine<img_accessor_type> >;
         }
         else
         {
-            typedef agg::span_image_filter_rgba_2x2<img_accessor_type, interpolator_type> span_gen_type;
-            typedef agg::renderer_scanline_aa<renderer_base, span_alloc_type, span_gen_type> renderer_type;
-            span_gen_type sg(ia, interpolator, filter);
-            renderer_type ri(rb, sa, sg);
-            agg::render_scanlines(ras, sl, ri);
+            func = &resample_rows<agg::span_image_filter_rgba_2x2<img_accessor_type, interpolator_type> >;
         }
     }
     break;
@@ -477,7 +610,6 @@ Image::resize(const Py::Tuple& args, const Py::Dict& kwargs)
     case LANCZOS:
     case BLACKMAN:
     {
-        agg::image_filter_lut filter;
         switch (interpolation)
         {
         case BILINEAR:
@@ -522,26 +654,77 @@ Image::resize(const Py::Tuple& args, const Py::Dict& kwargs)
         }
         if (resample)
         {
-            typedef agg::span_image_resample_rgba_affine<img_accessor_type> span_gen_type;
-            typedef agg::renderer_scanline_aa<renderer_base, span_alloc_type, span_gen_type> renderer_type;
-            span_gen_type sg(ia, interpolator, filter);
-            renderer_type ri(rb, sa, sg);
-            agg::render_scanlines(ras, sl, ri);
+            func = &resample_rows<agg::span_image_resample_rgba_affine<img_accessor_type> >;
         }
         else
         {
-            typedef agg::span_image_filter_rgba<img_accessor_type, interpolator_type> span_gen_type;
-            typedef agg::renderer_scanline_aa<renderer_base, span_alloc_type, span_gen_type> renderer_type;
-            span_gen_type sg(ia, interpolator, filter);
-            renderer_type ri(rb, sa, sg);
-            agg::render_scanlines(ras, sl, ri);
+            func = &resample_rows<agg::span_image_filter_rgba<img_accessor_type, interpolator_type> >;
         }
     }
     break;
 
     }
 
-    delete [] bufferPad;
+    if (func != NULL)
+    {
+        resample_args a;
+        a.rbufIn = rbufIn;
+        a.rbufOut = rbufOut;
+        a.colsIn = colsIn;
+        a.rowsIn = rowsIn;
+        a.colsOut = numcols;
+        a.rowsOut = numrows;
+        a.srcMatrix = &srcMatrix;
+        a.imageMatrix = &imageMatrix;
+        a.filter = &filter;
+
+        int nbands = std::max(1, std::min(nthreads, numrows / min_band_rows));
+        std::vector<resample_band*> bands(nbands, (resample_band*)NULL);
+        bool failed = false;
+        try
+        {
+            for (int i = 0; i < nbands; ++i)
+            {
+                bands[i] = new resample_band;
+                bands[i]->func = func;
+                bands[i]->args = &a;
+                bands[i]->y0 = (int)((double)numrows * i / nbands);
+                bands[i]->y1 = (int)((double)numrows * (i + 1) / nbands);
+                bands[i]->failed = false;
+                rasterize_image_box(bands[i]->ras, a);
+            }
+        }
+        catch (...)
+        {
+            for (int i = 0; i < nbands; ++i)
+            {
+                delete bands[i];
+            }
+            throw;
+        }
+
+        if (nbands > 1)
+        {
+            Py_BEGIN_ALLOW_THREADS
+            resample_bands(&bands[0], nbands);
+            Py_END_ALLOW_THREADS
+        }
+        else
+        {
+            resample_band_run(bands[0]);
+        }
+
+        for (int i = 0; i < nbands; ++i)
+        {
+            failed = failed || bands[i]->failed;
+            delete bands[i];
+        }
+        if (failed)
+        {
+            throw Py::MemoryError("Image::resize could not allocate memory");
+        }
+    }
+
     return Py::Object();
 
 }
@@ -20,6 +20,12 @@
 #include <stdio.h>
 #include "numerix.h"
 
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <pthread.h>
+#endif
+
 /* Note that all arrays in these routines are Fortran-style,
    in the sense that the "i" index varies fastest; the dimensions
    of the corresponding C array are z[jmax][imax] in the notation
@@ -1587,36 +1593,69 @@ __build_cntr_list_v2(long *np, double *xp, double *yp, short *kp,
 #endif  /* preprocessing out the old version for now */
 
 
-/* cntr_trace is called once per contour level or level pair.
-   If nlevels is 1, a set of contour lines will be returned; if nlevels
-   is 2, the set of polygons bounded by the levels will be returned.
-   If points is True, the lines will be returned as a list of list
-   of points; otherwise, as a list of tuples of vectors.
+/* The curves of one contour level or level pair, traced into
+   plain C arrays.  Tracing a Ctrace does not use the Python API, so
+   it can be done with the GIL released; see cntr_trace_levels.
 */
-
-PyObject *
-cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
+typedef struct
 {
-    PyObject *c_list = NULL;
+    double levels[2];
+    int nlevels;
     double *xp0;
     double *yp0;
     short *kp0;
     long *nseg0;
-    int iseg;
+    long nparts;
+    long ntotal;
+    int nomem;                  /* set if an allocation failed */
+    const char *error;          /* set if tracing failed */
+} Ctrace;
 
-    /* long nchunk = 30; was hardwired */
+static void
+ctrace_init(Ctrace *t, double levels[], int nlevels)
+{
+    t->levels[0] = levels[0];
+    t->levels[1] = levels[0];
+    if (nlevels == 2)
+        t->levels[1] = levels[1];
+    t->nlevels = nlevels;
+    t->xp0 = NULL;
+    t->yp0 = NULL;
+    t->kp0 = NULL;
+    t->nseg0 = NULL;
+    t->nparts = t->ntotal = 0;
+    t->nomem = 0;
+    t->error = NULL;
+}
+
+static void
+ctrace_free(Ctrace *t)
+{
+    free(t->xp0);
+    free(t->yp0);
+    free(t->kp0);
+    free(t->nseg0);
+    t->xp0 = NULL;
+    t->yp0 = NULL;
+    t->kp0 = NULL;
+    t->nseg0 = NULL;
+}
+
+/* Trace the curves of t->levels on site.  Returns 0, or -1 with
+   t->nomem or t->error set.  Nothing here may use the Python API.
+*/
+static int
+cntr_trace_c(Csite *site, Ctrace *t, long nchunk)
+{
     long n;
     long nparts = 0;
     long ntotal = 0;
     long nparts2 = 0;
     long ntotal2 = 0;
+    int iseg;
 
-    site->zlevel[0] = levels[0];
-    site->zlevel[1] = levels[0];
-    if (nlevels == 2)
-    {
-        site->zlevel[1] = levels[1];
-    }
+    site->zlevel[0] = t->levels[0];
+    site->zlevel[1] = t->levels[1];
     site->n = site->count = 0;
     data_init (site, nchunk);
 
@@ -1637,24 +1676,29 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
             ntotal -= n;
         }
     }
-    xp0 = (double *) PyMem_Malloc(ntotal * sizeof(double));
-    yp0 = (double *) PyMem_Malloc(ntotal * sizeof(double));
-    kp0 = (short *) PyMem_Malloc(ntotal * sizeof(short));
-    nseg0 = (long *) PyMem_Malloc(nparts * sizeof(long));
-    if (xp0 == NULL || yp0 == NULL || kp0 == NULL || nseg0 == NULL) goto error;
+    /* malloc(0) may return NULL */
+    t->xp0 = (double *) malloc((ntotal + 1) * sizeof(double));
+    t->yp0 = (double *) malloc((ntotal + 1) * sizeof(double));
+    t->kp0 = (short *) malloc((ntotal + 1) * sizeof(short));
+    t->nseg0 = (long *) malloc((nparts + 1) * sizeof(long));
+    if (t->xp0 == NULL || t->yp0 == NULL || t->kp0 == NULL
+        || t->nseg0 == NULL)
+    {
+        t->nomem = 1;
+        goto error;
+    }
 
     /* second pass */
-    site->xcp = xp0;
-    site->ycp = yp0;
-    site->kcp = kp0;
+    site->xcp = t->xp0;
+    site->ycp = t->yp0;
+    site->kcp = t->kp0;
     iseg = 0;
     for (;;iseg++)
     {
         n = curve_tracer (site, 1);
         if (ntotal2 + n > ntotal)
         {
-            PyErr_SetString(PyExc_RuntimeError,
-                "curve_tracer: ntotal2, pass 2 exceeds ntotal, pass 1");
+            t->error = "curve_tracer: ntotal2, pass 2 exceeds ntotal, pass 1";
             goto error;
         }
         if (n == 0)
@@ -1662,7 +1706,7 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
         if (n > 0)
         {
             /* could add array bounds checking */
-            nseg0[iseg] = n;
+            t->nseg0[iseg] = n;
             site->xcp += n;
             site->ycp += n;
             site->kcp += n;
@@ -1671,33 +1715,293 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
         }
         else
         {
-            PyErr_SetString(PyExc_RuntimeError,
-                "Negative n from curve_tracer in pass 2");
+            t->error = "Negative n from curve_tracer in pass 2";
             goto error;
         }
     }
-
-    c_list = build_cntr_list_v2(nseg0, xp0, yp0, kp0, nparts, ntotal);
-
-    PyMem_Free(xp0);
-    PyMem_Free(yp0);
-    PyMem_Free(kp0);
-    PyMem_Free(nseg0);
+    t->nparts = nparts;
+    t->ntotal = ntotal;
     site->xcp = NULL;
     site->ycp = NULL;
     site->kcp = NULL;
-    return c_list;
+    return 0;
 
     error:
-    PyMem_Free(xp0);
-    PyMem_Free(yp0);
-    PyMem_Free(kp0);
-    PyMem_Free(nseg0);
+    ctrace_free(t);
     site->xcp = NULL;
     site->ycp = NULL;
     site->kcp = NULL;
-    Py_XDECREF(c_list);
-    return NULL;
+    return -1;
+}
+
+/* Build the Python list of a traced Ctrace, or set the exception it
+   failed with, and free its arrays.
+*/
+static PyObject *
+ctrace_result(Ctrace *t)
+{
+    PyObject *c_list = NULL;
+
+    if (t->nomem)
+        PyErr_SetString(PyExc_MemoryError,
+            "Memory allocation failed in cntr_trace.");
+    else if (t->error != NULL)
+        PyErr_SetString(PyExc_RuntimeError, t->error);
+    else
+        c_list = build_cntr_list_v2(t->nseg0, t->xp0, t->yp0, t->kp0,
+                                    t->nparts, t->ntotal);
+    ctrace_free(t);
+    return c_list;
+}
+
+/* cntr_trace is called once per contour level or level pair.
+   If nlevels is 1, a set of contour lines will be returned; if nlevels
+   is 2, the set of polygons bounded by the levels will be returned.
+   If points is True, the lines will be returned as a list of list
+   of points; otherwise, as a list of tuples of vectors.
+*/
+
+PyObject *
+cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
+{
+    Ctrace t;
+
+    ctrace_init(&t, levels, nlevels);
+    cntr_trace_c(site, &t, nchunk);
+    return ctrace_result(&t);
+}
+
+/* Tracing changes site->data and site->saddle, so each thread
+   tracing levels needs a site of its own.  A copy shares the mesh,
+   the function values and the region array of the original, and has
+   its own work arrays.
+*/
+static Csite *
+cntr_copy(Csite *site)
+{
+    Csite *copy;
+    long ijmax = site->imax * site->jmax;
+    long nreg = ijmax + site->imax + 1;
+
+    copy = (Csite *) PyMem_Malloc(sizeof(Csite));
+    if (copy == NULL) return NULL;
+    *copy = *site;
+    copy->data = (Cdata *) PyMem_Malloc(sizeof(Cdata) * nreg);
+    copy->saddle = (Saddle *) PyMem_Malloc(sizeof(Saddle) * ijmax);
+    if (copy->data == NULL || copy->saddle == NULL)
+    {
+        PyMem_Free(copy->data);
+        PyMem_Free(copy->saddle);
+        PyMem_Free(copy);
+        return NULL;
+    }
+    return copy;
+}
+
+static void
+cntr_copy_del(Csite *copy)
+{
+    PyMem_Free(copy->saddle);
+    PyMem_Free(copy->data);
+    PyMem_Free(copy);
+}
+
+#ifdef _WIN32
+typedef CRITICAL_SECTION trace_lock;
+#define trace_lock_init(l) InitializeCriticalSection(l)
+#define trace_lock_del(l) DeleteCriticalSection(l)
+#define trace_lock_acquire(l) EnterCriticalSection(l)
+#define trace_lock_release(l) LeaveCriticalSection(l)
+#else
+typedef pthread_mutex_t trace_lock;
+#define trace_lock_init(l) pthread_mutex_init(l, NULL)
+#define trace_lock_del(l) pthread_mutex_destroy(l)
+#define trace_lock_acquire(l) pthread_mutex_lock(l)
+#define trace_lock_release(l) pthread_mutex_unlock(l)
+#endif
+
+/* The levels still to trace, shared by the tracing threads. */
+typedef struct
+{
+    Ctrace *traces;
+    int ntraces;
+    int next;
+    long nchunk;
+    trace_lock lock;
+} Ctrace_queue;
+
+typedef struct
+{
+    Ctrace_queue *queue;
+    Csite *site;
+} Ctracer;
+
+/* Trace levels from the queue until it is empty. */
+static void
+tracer_run(Ctracer *tracer)
+{
+    Ctrace_queue *queue = tracer->queue;
+    int i;
+
+    for (;;)
+    {
+        trace_lock_acquire(&queue->lock);
+        i = queue->next++;
+        trace_lock_release(&queue->lock);
+        if (i >= queue->ntraces)
+            break;
+        cntr_trace_c(tracer->site, queue->traces + i, queue->nchunk);
+    }
+}
+
+#ifdef _WIN32
+static DWORD WINAPI
+tracer_thread(LPVOID p)
+#else
+static void *
+tracer_thread(void *p)
+#endif
+{
+    tracer_run((Ctracer *) p);
+    return 0;
+}
+
+/* Trace the levels with a thread for each tracer, the first one in
+   the calling thread.  The levels of a tracer whose thread cannot be
+   started are taken by the others.  Nothing here may use the Python
+   API.
+*/
+static void
+cntr_trace_threads(Ctracer *tracers, int ntracers)
+{
+    int i;
+#ifdef _WIN32
+    HANDLE *threads;
+    threads = (HANDLE *) malloc(ntracers * sizeof(HANDLE));
+    if (threads == NULL)
+        ntracers = 1;
+    for (i = 1; i < ntracers; i++)
+        threads[i] = CreateThread(NULL, 0, tracer_thread, tracers + i,
+                                  0, NULL);
+#else
+    pthread_t *threads;
+    int *started;
+    threads = (pthread_t *) malloc(ntracers * sizeof(pthread_t));
+    started = (int *) malloc(ntracers * sizeof(int));
+    if (threads == NULL || started == NULL)
+        ntracers = 1;
+    for (i = 1; i < ntracers; i++)
+        started[i] = pthread_create(threads + i, NULL, tracer_thread,
+                                    tracers + i) == 0;
+#endif
+
+    tracer_run(tracers);
+
+    for (i = 1; i < ntracers; i++)
+    {
+#ifdef _WIN32
+        if (threads[i] != NULL)
+        {
+            WaitForSingleObject(threads[i], INFINITE);
+            CloseHandle(threads[i]);
+        }
+#else
+        if (started[i])
+            pthread_join(threads[i], NULL);
+#endif
+    }
+    free(threads);
+#ifndef _WIN32
+    free(started);
+#endif
+}
+
+/* Trace each of the ntraces levels or level pairs in lowers and
+   uppers (NULL for contour lines) with up to nthreads threads, and
+   return a list of what cntr_trace returns for each.  With one
+   thread the levels are traced on site itself, as cntr_trace would;
+   with more, on copies of it and with the GIL released.
+*/
+static PyObject *
+cntr_trace_levels(Csite *site, double *lowers, double *uppers,
+                  int ntraces, long nchunk, int nthreads)
+{
+    PyObject *result = NULL;
+    PyObject *c_list;
+    Ctrace_queue queue;
+    Ctracer *tracers = NULL;
+    int ntracers = 0;
+    int i;
+    double levels[2];
+
+    queue.traces = (Ctrace *) PyMem_Malloc((ntraces + 1) * sizeof(Ctrace));
+    if (queue.traces == NULL)
+        return PyErr_NoMemory();
+    for (i = 0; i < ntraces; i++)
+    {
+        levels[0] = lowers[i];
+        levels[1] = uppers == NULL ? -1e100 : uppers[i];
+        ctrace_init(queue.traces + i, levels,
+                    (uppers == NULL || levels[1] <= levels[0]) ? 1 : 2);
+    }
+    queue.ntraces = ntraces;
+    queue.next = 0;
+    queue.nchunk = nchunk;
+
+    if (nthreads > ntraces)
+        nthreads = ntraces;
+    if (nthreads > 1)
+    {
+        tracers = (Ctracer *) PyMem_Malloc(nthreads * sizeof(Ctracer));
+        /* with too little memory for a site per thread, use fewer */
+        for (; tracers != NULL && ntracers < nthreads; ntracers++)
+        {
+            tracers[ntracers].queue = &queue;
+            tracers[ntracers].site = cntr_copy(site);
+            if (tracers[ntracers].site == NULL)
+                break;
+        }
+        if (ntracers < 2)
+            nthreads = 1;
+    }
+
+    if (nthreads > 1)
+    {
+        trace_lock_init(&queue.lock);
+        Py_BEGIN_ALLOW_THREADS
+        cntr_trace_threads(tracers, ntracers);
+        Py_END_ALLOW_THREADS
+        trace_lock_del(&queue.lock);
+    }
+    else
+    {
+        for (i = 0; i < ntraces; i++)
+            cntr_trace_c(site, queue.traces + i, nchunk);
+    }
+
+    for (i = 0; i < ntracers; i++)
+        cntr_copy_del(tracers[i].site);
+    PyMem_Free(tracers);
+
+    result = PyList_New(ntraces);
+    for (i = 0; i < ntraces; i++)
+    {
+        if (result == NULL)
+        {
+            ctrace_free(queue.traces + i);
+            continue;
+        }
+        c_list = ctrace_result(queue.traces + i);
+        if (c_list == NULL)
+        {
+            Py_DECREF(result);
+            result = NULL;
+            continue;
+        }
+        PyList_SET_ITEM(result, i, c_list);
+    }
+    PyMem_Free(queue.traces);
+    return result;
 }
 
 /******* Make an extension type.  Based on the tutorial.************/
@@ -1711,6 +2015,7 @@ typedef struct {
     PyObject_HEAD
     PyArrayObject *xpa, *ypa, *zpa, *mpa;
     Csite *site;
+    int tracing;    /* set while threads without the GIL use the arrays */
 } Cntr;
 
 
@@ -1766,6 +2071,7 @@ Cntr_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
         self->ypa = NULL;
         self->zpa = NULL;
         self->mpa = NULL;
+        self->tracing = 0;
     }
 
     return (PyObject *)self;
@@ -1868,6 +2174,134 @@ Cntr_trace(Cntr *self, PyObject *args, PyObject *kwds)
     return cntr_trace(self->site, levels, nlevels, nchunk);
 }
 
+static PyObject *
+Cntr_trace_levels(Cntr *self, PyObject *args, PyObject *kwds)
+{
+    PyObject *larg, *uarg = NULL;
+    PyArrayObject *lpa = NULL, *upa = NULL;
+    PyObject *result = NULL;
+    long nchunk = 0L;
+    int nthreads = 1;
+    static char *kwlist[] = {"levels", "levels_upper", "nchunk", "threads",
+                             NULL};
+
+    if (! PyArg_ParseTupleAndKeywords(args, kwds, "O|Oli", kwlist,
+                                      &larg, &uarg, &nchunk, &nthreads))
+    {
+        return NULL;
+    }
+    if (uarg == Py_None)
+        uarg = NULL;
+
+    lpa = (PyArrayObject *) PyArray_ContiguousFromObject(larg,
+                                                      PyArray_DOUBLE, 1, 1);
+    if (lpa == NULL)
+        goto error;
+    if (uarg)
+    {
+        upa = (PyArrayObject *) PyArray_ContiguousFromObject(uarg,
+                                                      PyArray_DOUBLE, 1, 1);
+        if (upa == NULL)
+            goto error;
+        if (upa->dimensions[0] != lpa->dimensions[0])
+        {
+            PyErr_SetString(PyExc_ValueError,
+                "levels and levels_upper must have the same length.");
+            goto error;
+        }
+    }
+    self->tracing++;
+    result = cntr_trace_levels(self->site, (double *)lpa->data,
+                               upa ? (double *)upa->data : NULL,
+                               (int)lpa->dimensions[0], nchunk, nthreads);
+    self->tracing--;
+
+    error:
+    Py_XDECREF(lpa);
+    Py_XDECREF(upa);
+    return result;
+}
+
+static PyObject *
+Cntr_set_z(Cntr *self, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"z", "mask", NULL};
+    PyObject *zarg, *marg = NULL;
+    PyArrayObject *zpa, *mpa = NULL, *tmp;
+    Csite *site = self->site;
+    long nreg = site->imax * site->jmax + site->imax + 1;
+
+    if (! PyArg_ParseTupleAndKeywords(args, kwds, "O|O", kwlist,
+                                      &zarg, &marg))
+        return NULL;
+    if (marg == Py_None)
+        marg = NULL;
+    if (self->tracing)
+    {
+        PyErr_SetString(PyExc_RuntimeError,
+            "Cannot set z while the contours are being traced.");
+        return NULL;
+    }
+
+    zpa = (PyArrayObject *) PyArray_ContiguousFromObject(zarg,
+                                                      PyArray_DOUBLE, 2, 2);
+    if (marg)
+        mpa = (PyArrayObject *) PyArray_ContiguousFromObject(marg,
+                                                      PyArray_SBYTE, 2, 2);
+    if (zpa == NULL || (marg && mpa == NULL))
+    {
+        PyErr_SetString(PyExc_ValueError,
+            "Arguments z, mask (if present) must be 2D arrays.\n"
+            "z must be castable to double.");
+        goto error;
+    }
+    if (zpa->dimensions[0] != site->jmax || zpa->dimensions[1] != site->imax
+        || (mpa && (mpa->dimensions[0] != site->jmax ||
+                    mpa->dimensions[1] != site->imax)))
+    {
+        PyErr_SetString(PyExc_ValueError,
+            "Arguments z, mask (if present) must have the dimensions"
+            " of the original z.");
+        goto error;
+    }
+
+    /* the mesh and the work arrays are kept; only the region array
+       needs to be set up again */
+    if (mpa)
+    {
+        if (site->reg == NULL)
+        {
+            site->reg = (char *) PyMem_Malloc(sizeof(char) * nreg);
+            if (site->reg == NULL)
+            {
+                PyErr_SetString(PyExc_MemoryError,
+                    "Memory allocation failure in set_z");
+                goto error;
+            }
+        }
+        mask_zones(site->imax, site->jmax, mpa->data, site->reg);
+    }
+    else
+    {
+        PyMem_Free(site->reg);
+        site->reg = NULL;
+    }
+    site->z = (double *)zpa->data;
+
+    tmp = self->zpa;
+    self->zpa = zpa;
+    Py_XDECREF(tmp);
+    tmp = self->mpa;
+    self->mpa = mpa;
+    Py_XDECREF(tmp);
+    Py_RETURN_NONE;
+
+    error:
+    Py_XDECREF(zpa);
+    Py_XDECREF(mpa);
+    return NULL;
+}
+
 /* The following will not normally be called.  It is experimental,
    and intended for future debugging.  It may go away at any time.
 */
@@ -1903,6 +2337,24 @@ static PyMethodDef Cntr_methods[] = {
      "    Optional argument: nchunk; approximate number of grid points\n"
      "        per chunk. 0 (default) for no chunking.\n"
     },
+    {"trace_levels", (PyCFunction)Cntr_trace_levels,
+     METH_VARARGS | METH_KEYWORDS,
+     "Return a list with what trace returns for each of several levels.\n\n"
+     "    Required argument: levels, a sequence of contour levels\n"
+     "    Optional argument: levels_upper, a sequence of the same length;\n"
+     "        if given, the polygons between levels[i] and levels_upper[i]\n"
+     "        are traced, as by trace(levels[i], levels_upper[i]).\n"
+     "    Optional argument: nchunk, as for trace.\n"
+     "    Optional argument: threads; if more than 1 (default 1), the\n"
+     "        levels are traced by up to that many threads, with the GIL\n"
+     "        released.  The result is the same.\n"
+    },
+    {"set_z", (PyCFunction)Cntr_set_z, METH_VARARGS | METH_KEYWORDS,
+     "Replace the function values, to trace the contours of new data on\n"
+     "the same mesh.  The mesh and the work arrays are reused.\n\n"
+     "    Required argument: z, an array of the shape of the original z\n"
+     "    Optional argument: mask, as for the constructor\n"
+    },
     {"get_cdata", (PyCFunction)Cntr_get_cdata, METH_NOARGS,
      "Returns a copy of the mesh array with contour calculation codes.\n\n"
      "Experimental and incomplete; we are not returning quite all of\n"